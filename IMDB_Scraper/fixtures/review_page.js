@@ -0,0 +1,64 @@
+// Behaviour of the IMDb review page that the scraper relies on:
+// cookie banner, spoiler buttons that reveal hidden text, and a
+// "See all" button that adds the remaining reviews to the page, either from
+// a <template> or from the next "load more" page (.load-more-data).
+// <body data-delay="ms"> (or ?delay=ms in the URL) delays every reaction, to
+// exercise the scraper's waits. <body data-late-banner> adds the cookie
+// banner after the delay instead of serving it with the page, as IMDb's
+// consent script does.
+var delay = Number(new URLSearchParams(location.search).get("delay") || document.body.dataset.delay || 0);
+
+function later(fn) {
+  setTimeout(fn, delay);
+}
+
+if ("lateBanner" in document.body.dataset) {
+  later(function () {
+    document.body.insertAdjacentHTML(
+      "afterbegin",
+      '<div id="cookie-banner"><button data-testid="accept-button">Accept</button></div>'
+    );
+  });
+}
+
+document.addEventListener("click", function (event) {
+  var button = event.target.closest("button");
+  if (!button) {
+    return;
+  }
+  if (button.matches('[data-testid="accept-button"]')) {
+    later(function () {
+      document.getElementById("cookie-banner").remove();
+    });
+  } else if (button.matches(".review-spoiler-button")) {
+    var card = button.closest('[data-testid="review-card-parent"]');
+    later(function () {
+      card.querySelector(".ipc-html-content-inner-div").style.display = "";
+      button.setAttribute("aria-expanded", "true");
+    });
+  } else if (button.matches(".ipc-see-more__button")) {
+    var reviews = document.getElementById("reviews");
+    var more = document.getElementById("more-reviews");
+    var loadMore = document.querySelector(".load-more-data");
+    if (more) {
+      more.remove();
+      later(function () {
+        reviews.appendChild(more.content.cloneNode(true));
+        button.remove();
+      });
+    } else if (loadMore) {
+      var url = loadMore.dataset.ajaxurl + "?paginationKey=" + loadMore.dataset.key;
+      loadMore.remove();
+      new Promise(later).then(function () {
+        return fetch(url);
+      }).then(function (response) {
+        return response.text();
+      }).then(function (html) {
+        reviews.appendChild(document.createRange().createContextualFragment(html));
+        if (!document.querySelector(".load-more-data")) {
+          button.remove();
+        }
+      });
+    }
+  }
+});
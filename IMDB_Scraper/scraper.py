@@ -6,11 +6,339 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 import time
 import os
 import re
 import random
 import hashlib
+import sys
+import argparse
+import contextlib
+import functools
+import json
+import queue
+import threading
+from urllib.parse import urlencode, urljoin, urlparse
+
+# 共享的表格读写模块 (CSV / Parquet / Feather) 位于上一级目录
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from table_io import append_table, read_table, write_table
+
+IMDB_BASE_URL = "https://www.imdb.com"
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# 浏览器和 HTTP 两种后端共用的选择器
+REVIEW_SELECTORS = [
+    '[data-testid="review-card-parent"]',
+    'div[class*="review-container"]',
+    '.lister-item-content',
+    '.user-review-item',
+    '.imdb-user-review',
+    'article[class*="review"]'
+]
+HASH_TITLE_SELECTOR = '.ipc-title.ipc-title--title, h3[class*="title"]'
+HASH_CONTENT_SELECTOR = '.ipc-html-content-inner-div, .text.show-more__control, .content .text, .review-text'
+TITLE_SELECTORS = [
+    '.ipc-title.ipc-title--base.ipc-title--title.ipc-title--on-textPrimary.sc-b8d6d2b6-7.fUoiwh',
+    '.ipc-title.ipc-title--title',
+    'h3[class*="title"]',
+    '.title'
+]
+CONTENT_SELECTORS = [
+    '.ipc-html-content-inner-div',
+    '.text.show-more__control',
+    '.content .text',
+    '.review-text'
+]
+SPOILER_BUTTON_SELECTOR = '.review-spoiler-button, button[aria-label*="spoiler"]'
+COOKIE_BUTTON_SELECTOR = 'button[data-testid="accept-button"]'
+RATING_SELECTORS = ['.rating-other-user-rating span', '.ipc-rating-star']
+
+# 批量提取: 一次 execute_script 取回所有评论卡片中每个选择器的文字
+BULK_TEXT_SELECTORS = list(dict.fromkeys(
+    [HASH_TITLE_SELECTOR, HASH_CONTENT_SELECTOR]
+    + TITLE_SELECTORS + CONTENT_SELECTORS + RATING_SELECTORS
+))
+BULK_EXTRACT_SCRIPT = """
+var reviewSelectors = arguments[0], textSelectors = arguments[1], matchSelectors = arguments[2];
+
+// Like WebElement.text: rendered text only, empty for hidden elements
+function visibleText(el) {
+  if (!el || !el.getClientRects().length || getComputedStyle(el).visibility === "hidden") {
+    return "";
+  }
+  return el.innerText;
+}
+
+function first(card, selector) {
+  try {
+    return card.querySelector(selector);
+  } catch (e) {
+    return null;
+  }
+}
+
+var cards = [];
+reviewSelectors.forEach(function (selector) {
+  var nodes;
+  try {
+    nodes = document.querySelectorAll(selector);
+  } catch (e) {
+    return;
+  }
+  nodes.forEach(function (card) {
+    var texts = {}, has = {};
+    textSelectors.forEach(function (s) { texts[s] = visibleText(first(card, s)); });
+    matchSelectors.forEach(function (s) { has[s] = first(card, s) !== null; });
+    cards.push({texts: texts, has: has});
+  });
+});
+return cards;
+"""
+
+
+class Throttled(Exception):
+    """The site refused a request for being too frequent (HTTP 429/503, block page)"""
+    
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """
+    Space out requests to each host; shared by all browser sessions.
+    backoff() adds an extra delay for a host that throttled us, doubled on
+    each further throttle, and relax() halves it again after a success.
+    """
+    
+    def __init__(self, min_interval=4.0, jitter=2.0, backoff_base=5.0, max_backoff=300.0):
+        self.min_interval = min_interval
+        self.jitter = jitter
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._next_slot = {}
+        self._penalty = {}
+    
+    def wait(self, url):
+        """Block until the next request slot for url's host"""
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = (slot + self.min_interval + self._penalty.get(host, 0.0)
+                                     + random.uniform(0, self.jitter))
+        if slot > now:
+            time.sleep(slot - now)
+    
+    def backoff(self, url, retry_after=None):
+        """Throttling detected: hold back url's host; returns the extra delay"""
+        host = urlparse(url).netloc
+        with self._lock:
+            penalty = min(max(self._penalty.get(host, 0.0) * 2, self.backoff_base), self.max_backoff)
+            if retry_after:
+                penalty = max(penalty, retry_after)
+            self._penalty[host] = penalty
+            # 所有会话都暂停到惩罚时间结束
+            self._next_slot[host] = max(self._next_slot.get(host, 0.0), time.monotonic() + penalty)
+        return penalty
+    
+    def relax(self, url):
+        """A request went through: halve the host's extra delay"""
+        host = urlparse(url).netloc
+        with self._lock:
+            penalty = self._penalty.get(host, 0.0) / 2
+            if penalty < 1.0:
+                self._penalty.pop(host, None)
+            else:
+                self._penalty[host] = penalty
+
+
+# 被限流时的页面标题
+THROTTLE_MARKERS = ['too many requests', 'service unavailable', 'captcha', 'access denied', 'request blocked']
+
+def is_throttled_page(page_title):
+    page_title = (page_title or '').lower()
+    return any(marker in page_title for marker in THROTTLE_MARKERS)
+
+def load_with_backoff(load, url, rate_limiter, attempts=4):
+    """
+    load(url) in url's rate limiter slot. If it raises Throttled the host
+    is backed off and the load retried, up to attempts times.
+    """
+    for attempt in range(attempts):
+        rate_limiter.wait(url)
+        try:
+            result = load(url)
+        except Throttled as e:
+            if attempt == attempts - 1:
+                raise
+            delay = rate_limiter.backoff(url, e.retry_after)
+            print(f"Throttled ({e}), backing off {delay:.0f}s")
+            continue
+        rate_limiter.relax(url)
+        return result
+
+
+# 单线程模式下默认的限速器 (与原来 4-6 秒的间隔相同)
+default_rate_limiter = RateLimiter()
+
+class ScrapeTrace:
+    """
+    Where one title's scrape spends its time: wall time per phase, WebDriver
+    (or HTTP) round-trips, selector fallbacks (selectors tried after the
+    first one of a fallback chain) and bytes of text read from the page.
+    Time inside a nested phase counts only towards the inner phase.
+    """
+    PHASES = ['load', 'cookie', 'see_all', 'spoilers', 'scroll', 'dedup', 'extract']
+    
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.seconds = {}
+        self.round_trips = {}
+        self.counters = {'round_trips': 0, 'selector_fallbacks': 0, 'text_bytes': 0}
+        self.events = []
+        self._stack = []
+        self._since = self.start
+    
+    def _charge(self, now):
+        if self._stack:
+            name = self._stack[-1]
+            self.seconds[name] = self.seconds.get(name, 0.0) + now - self._since
+        self._since = now
+    
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        self._charge(start)
+        self._stack.append(name)
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._charge(end)
+            self._stack.pop()
+            self.events.append({'phase': name, 'start': round(start - self.start, 4),
+                                'seconds': round(end - start, 4)})
+    
+    def count(self, counter, n=1):
+        self.counters[counter] += n
+        if counter == 'round_trips':
+            name = self._stack[-1] if self._stack else 'other'
+            self.round_trips[name] = self.round_trips.get(name, 0) + n
+    
+    def text(self, text):
+        """Count text read from the page; returns it unchanged"""
+        self.counters['text_bytes'] += len(text.encode('utf-8'))
+        return text
+    
+    def attach(self, session):
+        """
+        Count every command a WebDriver (execute) or HttpSession (get)
+        sends; returns a function that removes the counting again
+        """
+        name = 'execute' if hasattr(session, 'execute') else 'get'
+        patched = name in vars(session)
+        original = getattr(session, name)
+        
+        def counted(*args, **kwargs):
+            self.count('round_trips')
+            return original(*args, **kwargs)
+        
+        setattr(session, name, counted)
+        
+        def detach():
+            if patched:
+                setattr(session, name, original)
+            else:
+                delattr(session, name)
+        return detach
+    
+    def columns(self):
+        """stats.csv columns: <Phase>_Seconds, Round_Trips, Selector_Fallbacks, Text_Bytes"""
+        row = {f"{name.title()}_Seconds": round(self.seconds.get(name, 0.0), 3) for name in self.PHASES}
+        row.update(
+            Round_Trips=self.counters['round_trips'],
+            Selector_Fallbacks=self.counters['selector_fallbacks'],
+            Text_Bytes=self.counters['text_bytes'],
+        )
+        return row
+    
+    def to_dict(self, **info):
+        """JSON trace record: info, totals, per-phase time and round-trips, and the phase events"""
+        return dict(
+            info,
+            seconds=round(time.perf_counter() - self.start, 4),
+            phases={
+                name: {'seconds': round(self.seconds.get(name, 0.0), 4),
+                       'round_trips': self.round_trips.get(name, 0)}
+                for name in sorted(set(self.seconds) | set(self.round_trips))
+            },
+            counters=dict(self.counters),
+            events=self.events,
+        )
+
+
+# 基于页面状态的等待 (代替固定的 sleep)
+REVIEW_CARD_COUNT_SCRIPT = """
+var count = 0;
+arguments[0].forEach(function (selector) {
+  try {
+    count += document.querySelectorAll(selector).length;
+  } catch (e) {}
+});
+return count;
+"""
+HIDDEN_SPOILER_COUNT_SCRIPT = """
+var cardSelectors = arguments[0], buttonSelector = arguments[1], contentSelector = arguments[2];
+var hidden = 0;
+cardSelectors.forEach(function (selector) {
+  try {
+    document.querySelectorAll(selector).forEach(function (card) {
+      var content = card.querySelector(contentSelector);
+      if (card.querySelector(buttonSelector) && content && !content.getClientRects().length) {
+        hidden += 1;
+      }
+    });
+  } catch (e) {}
+});
+return hidden;
+"""
+NETWORK_STATE_SCRIPT = "return [document.readyState, performance.getEntriesByType('resource').length];"
+
+def wait_until(driver, condition, timeout=10, poll=0.1):
+    """Poll condition(driver) until it is truthy; its value, or False on timeout"""
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=poll).until(condition)
+    except TimeoutException:
+        return False
+
+def review_card_count(driver):
+    """Review cards on the page, duplicates included (cheap, one script call)"""
+    return driver.execute_script(REVIEW_CARD_COUNT_SCRIPT, REVIEW_SELECTORS)
+
+def review_count_above(count):
+    return lambda driver: review_card_count(driver) > count
+
+def spoilers_revealed(driver):
+    """No card with a spoiler button still has its content hidden"""
+    return driver.execute_script(
+        HIDDEN_SPOILER_COUNT_SCRIPT, REVIEW_SELECTORS, SPOILER_BUTTON_SELECTOR, HASH_CONTENT_SELECTOR
+    ) == 0
+
+def network_idle(quiet=0.5):
+    """Page loaded and no new resource requests finished for quiet seconds"""
+    state = {'count': None, 'since': 0.0}
+    
+    def condition(driver):
+        ready_state, resources = driver.execute_script(NETWORK_STATE_SCRIPT)
+        now = time.monotonic()
+        if resources != state['count']:
+            state['count'], state['since'] = resources, now
+        return ready_state == 'complete' and now - state['since'] >= quiet
+    return condition
 
 def clean_review_content(content_text, title_text=""):
     """Clean review content, remove ratings and duplicate titles"""
@@ -37,8 +365,10 @@ def clean_review_content(content_text, title_text=""):
     return content_text.strip()
 
 
-def click_see_all_button(driver):
+def click_see_all_button(driver, rate_limiter=None, trace=None):
     """Click 'See All' button to expand all reviews"""
+    rate_limiter = rate_limiter or default_rate_limiter
+    trace = trace if trace is not None else ScrapeTrace()
     print("\nAttempting to find 'See All' button...")
     
     see_all_selectors = [
@@ -51,148 +381,233 @@ def click_see_all_button(driver):
         'button:has(span.ipc-see-more_text)',
     ]
     
-    clicked = False
-    
-    for selector in see_all_selectors:
-        try:
-            elements = driver.find_elements(By.CSS_SELECTOR, selector)
-            
-            for element in elements:
-                try:
-                    element_text = element.text.strip().lower()
-                    
-                    if any(keyword in element_text for keyword in ['see all', 'see more', 'all reviews', 'view all']):
-                        print(f"Found 'See All' button: {element_text}")
-                        
-                        driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", element)
-                        time.sleep(0.5)
+    with trace.phase('see_all'):
+        clicked = False
+        
+        for i, selector in enumerate(see_all_selectors):
+            try:
+                elements = driver.find_elements(By.CSS_SELECTOR, selector)
+                
+                for element in elements:
+                    try:
+                        element_text = trace.text(element.text).strip().lower()
                         
-                        if element.is_displayed() and element.is_enabled():
-                            current_url = driver.current_url
-                            element.click()
-                            print("Clicked 'See All' button")
-                            clicked = True
+                        if any(keyword in element_text for keyword in ['see all', 'see more', 'all reviews', 'view all']):
+                            print(f"Found 'See All' button: {element_text}")
                             
-                            wait_time = random.uniform(3, 5)
-                            time.sleep(wait_time)
+                            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
                             
-                            new_url = driver.current_url
-                            if new_url != current_url:
-                                print(f"Warning: URL changed from {current_url} to {new_url}")
+                            if element.is_displayed() and element.is_enabled():
+                                current_url = driver.current_url
+                                # 点击会加载更多评论，按站点限速
+                                rate_limiter.wait(current_url)
+                                element.click()
+                                print("Clicked 'See All' button")
+                                clicked = True
+                                
+                                new_url = driver.current_url
+                                if new_url != current_url:
+                                    print(f"Warning: URL changed from {current_url} to {new_url}")
+                                
+                                break
                             
-                            break
-                        
-                except Exception:
-                    continue
-            
-            if clicked:
-                break
+                    except Exception:
+                        continue
                 
-        except Exception:
-            continue
-    
-    if not clicked:
-        print("'See All' button not found or not clickable")
-    
+                if clicked:
+                    # 前面的选择器都没找到按钮
+                    trace.count('selector_fallbacks', i)
+                    break
+                    
+            except Exception:
+                continue
+        
+        if not clicked:
+            trace.count('selector_fallbacks', len(see_all_selectors) - 1)
+            print("'See All' button not found or not clickable")
+        
     return clicked
 
-def expand_all_spoilers(driver):
-    """Expand all spoiler buttons on the page"""
+SPOILER_SELECTORS = [
+    'button.review-spoiler-button',
+    'button[class*="review-spoiler-button"]',
+    'button[aria-label*="Expand Spoiler"]',
+    'button[aria-label*="spoiler"]',
+    'button[aria-label*="Spoiler"]',
+]
+# 一次性点击所有 (去重后的) 可见剧透按钮
+EXPAND_SPOILERS_SCRIPT = """
+var buttons = new Set();
+arguments[0].forEach(function (selector) {
+  try {
+    document.querySelectorAll(selector).forEach(function (button) { buttons.add(button); });
+  } catch (e) {}
+});
+var counts = {found: buttons.size, clicked: 0, failed: 0};
+buttons.forEach(function (button) {
+  // Hidden or already open (a second click would collapse it again)
+  if (!button.getClientRects().length || button.getAttribute("aria-expanded") === "true") {
+    return;
+  }
+  try {
+    button.click();
+    counts.clicked += 1;
+  } catch (e) {
+    counts.failed += 1;
+  }
+});
+return counts;
+"""
+
+def _spoiler_counts(driver, found, clicked, failed, timeout):
+    # 只等待一次, 等所有展开的内容显示出来; 超时后仍隐藏的算失败
+    still_hidden = 0
+    if clicked and not wait_until(driver, spoilers_revealed, timeout):
+        still_hidden = min(clicked, driver.execute_script(
+            HIDDEN_SPOILER_COUNT_SCRIPT, REVIEW_SELECTORS, SPOILER_BUTTON_SELECTOR, HASH_CONTENT_SELECTOR
+        ))
+    return {'found': found, 'expanded': clicked - still_hidden, 'failed': failed + still_hidden}
+
+def expand_all_spoilers(driver, timeout=10, trace=None):
+    """
+    Expand all spoiler buttons on the page, then wait for their content.
+    Returns counts of unique buttons found, expanded and failed.
+    """
+    trace = trace if trace is not None else ScrapeTrace()
+    with trace.phase('spoilers'):
+        return _expand_all_spoilers(driver, timeout)
+
+def _expand_all_spoilers(driver, timeout):
     try:
-        spoiler_selectors = [
-            'button.review-spoiler-button',
-            'button[class*="review-spoiler-button"]',
-            'button[aria-label*="Expand Spoiler"]',
-            'button[aria-label*="spoiler"]',
-            'button[aria-label*="Spoiler"]',
-        ]
-        
-        spoiler_buttons = []
-        for selector in spoiler_selectors:
+        spoiler_buttons = {}
+        for selector in SPOILER_SELECTORS:
             try:
-                buttons = driver.find_elements(By.CSS_SELECTOR, selector)
-                if buttons:
-                    spoiler_buttons.extend(buttons)
+                for button in driver.find_elements(By.CSS_SELECTOR, selector):
+                    spoiler_buttons.setdefault(button.id, button)
             except:
                 continue
         
         expanded_count = 0
-        for button in spoiler_buttons:
+        failed_count = 0
+        for button in spoiler_buttons.values():
             try:
-                if not button.is_displayed():
+                if not button.is_displayed() or button.get_attribute('aria-expanded') == 'true':
                     continue
                 driver.execute_script("arguments[0].click();", button)
                 expanded_count += 1
-                time.sleep(0.3)
             except Exception:
+                failed_count += 1
                 continue
         
-        time.sleep(1)
+        return _spoiler_counts(driver, len(spoiler_buttons), expanded_count, failed_count, timeout)
         
     except Exception as e:
         print(f"Error finding spoiler buttons: {e}")
+        return {'found': 0, 'expanded': 0, 'failed': 0}
 
-def get_unique_reviews(driver):
-    """Get unique reviews, avoid duplicates using hash of title + content"""
-    review_selectors = [
-        '[data-testid="review-card-parent"]',
-        'div[class*="review-container"]',
-        '.lister-item-content',
-        '.user-review-item',
-        '.imdb-user-review',
-        'article[class*="review"]'
-    ]
-    
-    review_elements = []
-    for selector in review_selectors:
+def expand_all_spoilers_batch(driver, timeout=10, trace=None):
+    """expand_all_spoilers with every click in one execute_script call"""
+    trace = trace if trace is not None else ScrapeTrace()
+    with trace.phase('spoilers'):
         try:
-            elements = driver.find_elements(By.CSS_SELECTOR, selector)
-            if elements:
-                review_elements.extend(elements)
-        except Exception:
-            continue
-    
-    unique_reviews = []
-    seen_hashes = set()
-    
-    for review in review_elements:
-        try:
-            # 提取标题和内容作为哈希依据
+            counts = driver.execute_script(EXPAND_SPOILERS_SCRIPT, SPOILER_SELECTORS)
+            return _spoiler_counts(driver, counts['found'], counts['clicked'], counts['failed'], timeout)
+        except Exception as e:
+            print(f"Error expanding spoilers: {e}")
+            return {'found': 0, 'expanded': 0, 'failed': 0}
+
+def review_hash(title, content):
+    """
+    md5 of title + content, used to skip duplicate review cards. Runs of
+    whitespace are collapsed first: the browser's .text keeps line breaks
+    and lxml's text does not, and both backends must give the same key.
+    """
+    text = ' '.join(title.split()) + ' '.join(content.split())
+    return hashlib.md5(text.encode('utf-8')).hexdigest()
+
+def get_unique_reviews(driver, with_hashes=False, trace=None):
+    """
+    Get unique reviews, avoid duplicates using hash of title + content.
+    With with_hashes, (hash, element) pairs are returned.
+    """
+    trace = trace if trace is not None else ScrapeTrace()
+    with trace.phase('dedup'):
+        review_elements = []
+        for selector in REVIEW_SELECTORS:
             try:
-                title_element = review.find_element(By.CSS_SELECTOR, 
-                    '.ipc-title.ipc-title--title, h3[class*="title"]')
-                title = title_element.text.strip()
-            except:
-                title = ""
-            
+                elements = driver.find_elements(By.CSS_SELECTOR, selector)
+                if elements:
+                    review_elements.extend(elements)
+            except Exception:
+                continue
+        
+        unique_reviews = []
+        seen_hashes = set()
+        
+        for review in review_elements:
             try:
-                content_element = review.find_element(By.CSS_SELECTOR, 
-                    '.ipc-html-content-inner-div, .text.show-more__control, .content .text, .review-text')
-                content = content_element.text.strip()
-            except:
-                content = ""
-            
-            # 生成唯一 hash
-            hash_input = (title + content).encode('utf-8')
-            review_hash = hashlib.md5(hash_input).hexdigest()
-            
-            if review_hash not in seen_hashes:
-                seen_hashes.add(review_hash)
-                unique_reviews.append(review)
+                # 提取标题和内容作为哈希依据
+                try:
+                    title_element = review.find_element(By.CSS_SELECTOR, HASH_TITLE_SELECTOR)
+                    title = trace.text(title_element.text).strip()
+                except:
+                    title = ""
                 
-        except Exception:
-            unique_reviews.append(review)
-    
-    return unique_reviews
+                try:
+                    content_element = review.find_element(By.CSS_SELECTOR, HASH_CONTENT_SELECTOR)
+                    content = trace.text(content_element.text).strip()
+                except:
+                    content = ""
+                
+                # 生成唯一 hash
+                key = review_hash(title, content)
+                
+                if key not in seen_hashes:
+                    seen_hashes.add(key)
+                    unique_reviews.append((key, review))
+                    
+            except Exception:
+                unique_reviews.append((None, review))
+        
+    return unique_reviews if with_hashes else [review for _, review in unique_reviews]
 
-def check_and_click_see_all_after_scroll(driver):
+def get_unique_reviews_bulk(driver, with_hashes=False, trace=None):
+    """
+    get_unique_reviews in one execute_script round-trip. Returns one dict per
+    unique card with the text of each selector's first match and whether
+    the spoiler button selector matches, for extract_review.
+    """
+    trace = trace if trace is not None else ScrapeTrace()
+    with trace.phase('dedup'):
+        cards = driver.execute_script(
+            BULK_EXTRACT_SCRIPT, REVIEW_SELECTORS, BULK_TEXT_SELECTORS, [SPOILER_BUTTON_SELECTOR]
+        )
+        
+        unique_reviews = []
+        seen_hashes = set()
+        for card in cards:
+            card['texts'] = {selector: trace.text(text or '').strip() for selector, text in card['texts'].items()}
+            key = review_hash(card['texts'][HASH_TITLE_SELECTOR], card['texts'][HASH_CONTENT_SELECTOR])
+            if key not in seen_hashes:
+                seen_hashes.add(key)
+                unique_reviews.append((key, card))
+    return unique_reviews if with_hashes else [card for _, card in unique_reviews]
+
+def _card_text(card, selector):
+    return card['texts'].get(selector, "")
+
+def _card_has(card, selector):
+    return card['has'].get(selector, False)
+
+def check_and_click_see_all_after_scroll(driver, rate_limiter=None, timeout=10):
     """Check for See All button after scrolling to bottom and click it"""
     initial_review_count = len(get_unique_reviews(driver))
+    card_count = review_card_count(driver)
     
-    clicked = click_see_all_button(driver)
+    clicked = click_see_all_button(driver, rate_limiter)
     
     if clicked:
-        time.sleep(3)
+        wait_until(driver, review_count_above(card_count), timeout)
         
         new_review_count = len(get_unique_reviews(driver))
         if new_review_count > initial_review_count:
@@ -200,55 +615,378 @@ def check_and_click_see_all_after_scroll(driver):
     
     return clicked
 
-def get_review_data(driver, movie_url, movie_id):
+def extract_review(review, first_text, has_match, trace=None):
     """
-    Main function: Get review data without vote counts
+    Title, content, spoiler flag and rating of one review card.
+    first_text(review, selector) returns the text of the first match ("" if
+    none) and has_match(review, selector) whether anything matches, so the
+    browser and HTTP backends share the same extraction rules.
+    Selectors tried after the first of each chain are counted in trace.
     """
+    trace = trace if trace is not None else ScrapeTrace()
+    
+    # 提取标题
+    title = ""
+    for i, selector in enumerate(TITLE_SELECTORS):
+        title = first_text(review, selector)
+        if title:
+            break
+    trace.count('selector_fallbacks', i)
+    
+    # 提取内容
+    content = ""
+    for i, selector in enumerate(CONTENT_SELECTORS):
+        text = first_text(review, selector)
+        if text:
+            content = clean_review_content(text, title)
+            break
+    trace.count('selector_fallbacks', i)
+    
+    # 是否包含剧透
+    has_spoiler = "No"
+    if content and 'spoiler' in content.lower()[:200]:
+        has_spoiler = "Yes"
+    if has_match(review, SPOILER_BUTTON_SELECTOR):
+        has_spoiler = "Yes"
+    
+    # 提取评分
+    rating = "No rating"
+    for i, selector in enumerate(RATING_SELECTORS):
+        match = re.search(r'(\d+)(?:\s*/\s*10)?', first_text(review, selector))
+        if match:
+            rating = f"{match.group(1)}/10"
+            break
+    trace.count('selector_fallbacks', i)
+    
+    return title, content, has_spoiler, rating
+
+def _webelement_text(element, selector):
+    try:
+        return element.find_element(By.CSS_SELECTOR, selector).text.strip()
+    except Exception:
+        return ""
+
+def _webelement_has(element, selector):
+    try:
+        return bool(element.find_elements(By.CSS_SELECTOR, selector))
+    except Exception:
+        return False
+
+def _load_page(driver, url):
+    driver.get(url)
+    if is_throttled_page(driver.title):
+        raise Throttled(driver.title)
+    return driver.title
+
+def get_review_data(driver, movie_url, movie_id, rate_limiter=None, bulk=False, checkpoint=None,
+                    wait_timeout=10, spoiler_batch=True, stats=None, trace=None, stop_at_known=True,
+                    cookie_timeout=5):
+    """
+    Main function: Get review data without vote counts.
+    With bulk=True every review's fields are read in one execute_script call
+    instead of one find_element round-trip per selector. With a
+    ReviewCheckpoint, reviews it has already saved are skipped and new ones
+    are saved to it in batches; only the new reviews are returned.
+    Reviews are listed newest first, so unless stop_at_known=False no
+    more reviews are loaded (See All, spoilers, scrolling) once every
+    review on the page is in the checkpoint: a re-scrape only costs
+    finding the new reviews.
+    Each step waits for the page to change (at most wait_timeout seconds)
+    instead of sleeping for a fixed time. Spoilers are expanded in one
+    script call unless spoiler_batch=False. The cookie banner is injected
+    after the reviews, so it gets its own wait of up to cookie_timeout
+    seconds (skipped once a session has accepted it).
+    
+    Counters (spoiler buttons found, expanded and failed) and the
+    ScrapeTrace columns (time per phase, round-trips, selector fallbacks,
+    text bytes) are added to the stats dict if one is given.
+    """
+    stats = {} if stats is None else stats
+    trace = trace if trace is not None else ScrapeTrace()
+    detach = trace.attach(driver)
+    try:
+        return _get_review_data(driver, movie_url, rate_limiter or default_rate_limiter, bulk,
+                                checkpoint, wait_timeout, spoiler_batch, stats, trace, stop_at_known,
+                                cookie_timeout)
+    finally:
+        detach()
+        stats.update(trace.columns())
+
+def _get_review_data(driver, movie_url, rate_limiter, bulk, checkpoint, wait_timeout,
+                     spoiler_batch, stats, trace, stop_at_known, cookie_timeout):
+    expand_spoilers = expand_all_spoilers_batch if spoiler_batch else expand_all_spoilers
+    if bulk:
+        unique_reviews, first_text, has_match = get_unique_reviews_bulk, _card_text, _card_has
+    else:
+        unique_reviews, has_match = get_unique_reviews, _webelement_has
+        first_text = lambda element, selector: trace.text(_webelement_text(element, selector))
     print(f"Accessing: {movie_url}")
-    driver.get(movie_url)
+    with trace.phase('load'):
+        page_title = load_with_backoff(lambda url: _load_page(driver, url), movie_url, rate_limiter)
+        print(f"Page title: {page_title}")
+        
+        # 等到评论或 cookie 按钮出现
+        wait_until(driver, lambda d: review_card_count(d) > 0 or d.find_elements(By.CSS_SELECTOR, COOKIE_BUTTON_SELECTOR),
+                   wait_timeout)
+    
+    # 点击 cookie 按钮: 同意框比评论晚出现, 单独等它 (会话里同意过就不再等)
+    with trace.phase('cookie'):
+        accept_cookies(driver, cookie_timeout, wait_timeout)
+    
+    # 重新抓取时, 页面上全是已保存的评论就不再加载更多
+    def all_known():
+        if not stop_at_known or checkpoint is None or not checkpoint.seen_hashes:
+            return False
+        keys = [key for key, _ in unique_reviews(driver, with_hashes=True, trace=trace)]
+        if _all_known(checkpoint, keys):
+            print("Every review on the page was saved by an earlier run; not loading more")
+            return True
+        return False
     
-    time.sleep(random.uniform(4, 6))
-    page_title = driver.title
-    print(f"Page title: {page_title}")
+    spoilers, more_spoilers = _load_more_reviews(driver, rate_limiter, unique_reviews, expand_spoilers,
+                                                 wait_timeout, trace, all_known)
+    stats.update(
+        Spoilers_Found=more_spoilers['found'],
+        Spoilers_Expanded=spoilers['expanded'] + more_spoilers['expanded'],
+        Spoilers_Failed=more_spoilers['failed'],
+    )
+    print(f"Spoilers: {stats['Spoilers_Found']} found, {stats['Spoilers_Expanded']} expanded, "
+          f"{stats['Spoilers_Failed']} failed")
     
-    # 点击 cookie 按钮
+    # 获取所有评论元素
+    review_elements = unique_reviews(driver, with_hashes=True, trace=trace)
+    if not review_elements:
+        print("Error: No reviews found!")
+        # 返回空列表而不是 None, None
+        return [], [], [], [], page_title
+    
+    title_list = []
+    content_list = []
+    has_spoiler_list = []
+    rating_list = []
+    
+    print(f"Processing {len(review_elements)} reviews...")
+    
+    skipped = failed = 0
+    with trace.phase('extract'):
+        for i, (key, review) in enumerate(review_elements):
+            # 已经保存过的评论不再提取
+            if checkpoint is not None and checkpoint.seen(key):
+                skipped += 1
+                continue
+            
+            try:
+                title, content, has_spoiler, rating = extract_review(review, first_text, has_match, trace)
+                extracted = True
+            except Exception as e:
+                title, content, has_spoiler, rating = "", "", "Error", "Error"
+                extracted = False
+                failed += 1
+            
+            title_list.append(title)
+            content_list.append(content)
+            has_spoiler_list.append(has_spoiler)
+            rating_list.append(rating)
+            # 提取失败的评论不写入 checkpoint, 下次运行时重试
+            if checkpoint is not None and extracted:
+                checkpoint.add(key or review_hash(title, content), title, content, has_spoiler, rating)
+    
+    _report_extraction(len(review_elements), skipped, failed, checkpoint)
+    return title_list, content_list, has_spoiler_list, rating_list, page_title
+
+def _report_extraction(total, skipped, failed, checkpoint):
+    if skipped:
+        print(f"Skipped {skipped} reviews saved by an earlier run")
+    if failed:
+        retry = " (not saved, retried on the next run)" if checkpoint is not None else ""
+        print(f"Could not extract {failed} reviews{retry}")
+    print(f"\nDone! Processed total {total} reviews")
+
+def accept_cookies(driver, timeout=5, wait_timeout=10):
+    """
+    Wait up to timeout seconds for the cookie consent button, click it and
+    wait until the banner is gone. Returns whether it was clicked. Consent
+    lasts for the browser session, so later pages of the same driver are
+    not waited on.
+    """
+    if getattr(driver, 'cookies_accepted', False):
+        return False
     try:
-        cookie_button = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, 'button[data-testid="accept-button"]'))
-        )
-        cookie_button.click()
-        time.sleep(1)
-    except:
-        pass
+        button = wait_until(driver, EC.element_to_be_clickable((By.CSS_SELECTOR, COOKIE_BUTTON_SELECTOR)),
+                            timeout)
+        if not button:
+            return False
+        button.click()
+        wait_until(driver, EC.invisibility_of_element_located((By.CSS_SELECTOR, COOKIE_BUTTON_SELECTOR)),
+                   wait_timeout)
+        driver.cookies_accepted = True
+        return True
+    except Exception as e:
+        print(f"Error accepting cookies: {e}")
+        return False
+
+def _load_more_reviews(driver, rate_limiter, unique_reviews, expand_spoilers, wait_timeout, trace,
+                       all_known):
+    """
+    See All, spoilers, scroll and See All again; stops early once
+    all_known() says the page has no new reviews. Returns the spoiler
+    counts of the first and second expansion.
+    """
+    none = {'found': 0, 'expanded': 0, 'failed': 0}
+    # 剧透评论展开前内容为空, hash 对不上, 所以这里只在没有剧透时生效
+    if all_known():
+        return none, none
     
-    # 点击 See All 按钮
-    if click_see_all_button(driver):
-        time.sleep(3)
+    # 点击 See All 按钮, 等评论数增加
+    with trace.phase('see_all'):
+        card_count = review_card_count(driver)
+        if click_see_all_button(driver, rate_limiter, trace):
+            wait_until(driver, review_count_above(card_count), wait_timeout)
     
     # 展开剧透
-    expand_all_spoilers(driver)
+    spoilers = expand_spoilers(driver, wait_timeout, trace)
+    if all_known():
+        return spoilers, dict(spoilers, expanded=0)
     
     # 滚动并再次检查是否需要点击
-    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    time.sleep(2)
+    with trace.phase('scroll'):
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        wait_until(driver, network_idle(), wait_timeout)
     
     # 检查是否有更多内容需要加载
-    initial_count = len(get_unique_reviews(driver))
-    if click_see_all_button(driver):
-        time.sleep(3)
-        new_count = len(get_unique_reviews(driver))
+    initial_count = len(unique_reviews(driver, trace=trace))
+    with trace.phase('see_all'):
+        card_count = review_card_count(driver)
+        clicked = click_see_all_button(driver, rate_limiter, trace)
+        if clicked:
+            wait_until(driver, review_count_above(card_count), wait_timeout)
+    if clicked:
+        new_count = len(unique_reviews(driver, trace=trace))
         if new_count > initial_count:
             print(f"Loaded more reviews: {initial_count} → {new_count}")
     
-    # 再次展开剧透
-    expand_all_spoilers(driver)
-    time.sleep(2)
+    # 再次展开剧透 (See All 之后新加载的评论)
+    return spoilers, expand_spoilers(driver, wait_timeout, trace)
+
+class HttpSession:
+    """Pooled HTTP connections used in place of a browser session"""
     
-    # 获取所有评论元素
-    review_elements = get_unique_reviews(driver)
+    def __init__(self, timeout=30, retries=3):
+        import urllib3
+        self.pool = urllib3.PoolManager(
+            maxsize=4,
+            headers={'User-Agent': USER_AGENT, 'Accept-Language': 'en-US,en;q=0.9'},
+            timeout=urllib3.Timeout(total=timeout),
+            retries=urllib3.Retry(total=retries, backoff_factor=1,
+                                  status_forcelist=[500, 502, 504],
+                                  respect_retry_after_header=False),
+        )
+    
+    def get(self, url):
+        response = self.pool.request('GET', url)
+        # 429/503 交给 RateLimiter 退避
+        if response.status in (429, 503):
+            retry_after = response.headers.get('Retry-After', '')
+            raise Throttled(f"HTTP {response.status}",
+                            float(retry_after) if retry_after.isdigit() else None)
+        if response.status >= 400:
+            raise IOError(f"HTTP {response.status} for {url}")
+        return response.data
+    
+    def quit(self):
+        self.pool.clear()
+
+def _parse_page(data):
+    from lxml import html as lxml_html
+    page = lxml_html.document_fromstring(data)
+    # <br> 变成换行，和浏览器里的 .text 一样分隔文字
+    for br in page.iter('br'):
+        br.tail = '\n' + (br.tail or '')
+    return page
+
+def _node_text(element, selector):
+    matches = element.cssselect(selector)
+    return ' '.join(matches[0].text_content().split()) if matches else ""
+
+def _node_has(element, selector):
+    return bool(element.cssselect(selector))
+
+def _next_page_url(page, movie_url):
+    """Continuation URL of a "load more" block, or None on the last page"""
+    nodes = page.cssselect('.load-more-data[data-key]')
+    if not nodes:
+        return None
+    ajax_url = urljoin(movie_url, nodes[0].get('data-ajaxurl') or '_ajax')
+    return f"{ajax_url}?{urlencode({'paginationKey': nodes[0].get('data-key')})}"
+
+def get_unique_reviews_html(pages, with_hashes=False, trace=None):
+    """Review cards of parsed pages, deduplicated as in get_unique_reviews"""
+    trace = trace if trace is not None else ScrapeTrace()
+    with trace.phase('dedup'):
+        review_elements = []
+        for selector in REVIEW_SELECTORS:
+            for page in pages:
+                review_elements.extend(page.cssselect(selector))
+        
+        unique_reviews = []
+        seen_hashes = set()
+        for review in review_elements:
+            key = review_hash(trace.text(_node_text(review, HASH_TITLE_SELECTOR)),
+                              trace.text(_node_text(review, HASH_CONTENT_SELECTOR)))
+            if key not in seen_hashes:
+                seen_hashes.add(key)
+                unique_reviews.append((key, review))
+    return unique_reviews if with_hashes else [review for _, review in unique_reviews]
+
+def get_review_data_http(session, movie_url, movie_id, rate_limiter=None, max_pages=None,
+                         checkpoint=None, stats=None, trace=None, stop_at_known=True):
+    """
+    get_review_data without a browser: fetch the review page and its
+    "load more" continuations over HTTP, parse them with lxml and return
+    the same tuple (checkpoint, stats, trace and stop_at_known as in
+    get_review_data; spoiler text is already in the HTML, so there is
+    nothing to expand)
+    """
+    stats = {} if stats is None else stats
+    trace = trace if trace is not None else ScrapeTrace()
+    detach = trace.attach(session)
+    try:
+        return _get_review_data_http(session, movie_url, rate_limiter or default_rate_limiter,
+                                     max_pages, checkpoint, trace, stop_at_known)
+    finally:
+        detach()
+        stats.update(trace.columns())
+
+def _all_known(checkpoint, keys):
+    """Every key is in a non-empty checkpoint index (so nothing on the page is new)"""
+    return bool(checkpoint is not None and checkpoint.seen_hashes and keys
+                and all(checkpoint.seen(key) for key in keys))
+
+def _get_review_data_http(session, movie_url, rate_limiter, max_pages, checkpoint, trace,
+                          stop_at_known):
+    print(f"Accessing: {movie_url}")
+    with trace.phase('load'):
+        pages = [_parse_page(load_with_backoff(session.get, movie_url, rate_limiter))]
+        page_title = ' '.join((pages[0].findtext('.//title') or '').split())
+        print(f"Page title: {page_title}")
+        
+        # 依次读取 "load more" 的后续页面
+        seen_urls = {movie_url}
+        next_url = _next_page_url(pages[-1], movie_url)
+        while next_url and next_url not in seen_urls and (max_pages is None or len(pages) < max_pages):
+            # 评论从新到旧排列: 一页全是已保存的评论时, 后面的页面也都保存过了
+            if stop_at_known:
+                keys = [key for key, _ in get_unique_reviews_html([pages[-1]], with_hashes=True)]
+                if _all_known(checkpoint, keys):
+                    print(f"Page {len(pages)} has only saved reviews; not loading more")
+                    break
+            seen_urls.add(next_url)
+            pages.append(_parse_page(load_with_backoff(session.get, next_url, rate_limiter)))
+            next_url = _next_page_url(pages[-1], movie_url)
+    
+    review_elements = get_unique_reviews_html(pages, with_hashes=True, trace=trace)
     if not review_elements:
         print("Error: No reviews found!")
-        # 返回空列表而不是 None, None
         return [], [], [], [], page_title
     
     title_list = []
@@ -256,85 +994,144 @@ def get_review_data(driver, movie_url, movie_id):
     has_spoiler_list = []
     rating_list = []
     
-    print(f"Processing {len(review_elements)} reviews...")
+    print(f"Processing {len(review_elements)} reviews from {len(pages)} page(s)...")
     
-    for i, review in enumerate(review_elements):
-        try:
-            # 提取标题
-            title = ""
-            title_selectors = [
-                '.ipc-title.ipc-title--base.ipc-title--title.ipc-title--on-textPrimary.sc-b8d6d2b6-7.fUoiwh',
-                '.ipc-title.ipc-title--title',
-                'h3[class*="title"]',
-                '.title'
-            ]
-            for selector in title_selectors:
-                try:
-                    title_element = review.find_element(By.CSS_SELECTOR, selector)
-                    if title_element.text.strip():
-                        title = title_element.text.strip()
-                        break
-                except:
-                    continue
-            
-            # 提取内容
-            content = ""
-            content_selectors = [
-                '.ipc-html-content-inner-div',
-                '.text.show-more__control',
-                '.content .text',
-                '.review-text'
-            ]
-            for selector in content_selectors:
-                try:
-                    content_element = review.find_element(By.CSS_SELECTOR, selector)
-                    if content_element.text.strip():
-                        content = clean_review_content(content_element.text.strip(), title)
-                        break
-                except:
-                    continue
-            
-            # 是否包含剧透
-            has_spoiler = "No"
-            if content and 'spoiler' in content.lower()[:200]:
-                has_spoiler = "Yes"
+    first_text = lambda element, selector: trace.text(_node_text(element, selector))
+    skipped = failed = 0
+    with trace.phase('extract'):
+        for key, review in review_elements:
+            if checkpoint is not None and checkpoint.seen(key):
+                skipped += 1
+                continue
             try:
-                spoiler_button = review.find_element(By.CSS_SELECTOR, '.review-spoiler-button, button[aria-label*="spoiler"]')
-                if spoiler_button:
-                    has_spoiler = "Yes"
-            except:
-                pass
-            
-            # 提取评分
-            rating = "No rating"
-            rating_selectors = ['.rating-other-user-rating span', '.ipc-rating-star']
-            for selector in rating_selectors:
-                try:
-                    rating_element = review.find_element(By.CSS_SELECTOR, selector)
-                    match = re.search(r'(\d+)(?:\s*/\s*10)?', rating_element.text.strip())
-                    if match:
-                        rating = f"{match.group(1)}/10"
-                        break
-                except:
-                    continue
-            
+                title, content, has_spoiler, rating = extract_review(review, first_text, _node_has, trace)
+                extracted = True
+            except Exception:
+                title, content, has_spoiler, rating = "", "", "Error", "Error"
+                extracted = False
+                failed += 1
             title_list.append(title)
             content_list.append(content)
             has_spoiler_list.append(has_spoiler)
             rating_list.append(rating)
-            
-        except Exception as e:
-            title_list.append("")
-            content_list.append("")
-            has_spoiler_list.append("Error")
-            rating_list.append("Error")
-            continue
+            if checkpoint is not None and extracted:
+                checkpoint.add(key, title, content, has_spoiler, rating)
     
-    print(f"\nDone! Processed total {len(review_elements)} reviews")
+    _report_extraction(len(review_elements), skipped, failed, checkpoint)
     return title_list, content_list, has_spoiler_list, rating_list, page_title
 
-def save_results(data, movie_id, movie_url, folder_name='reviews'):
-    """Save results without vote counts or scrape time"""
+def _fsync(path):
+    with open(path, 'rb+') as f:
+        os.fsync(f.fileno())
+
+class ReviewCheckpoint:
+    """
+    Reviews of one title, appended to folder_name/reviews.<format> in
+    batches as they are extracted. The hash of every saved review (the
+    review_hash used for de-duplication) goes to review_hashes.txt, so a
+    restarted or repeated scrape appends only reviews it has not seen.
+    
+    A reviews file without a hash index (from an older run, or with
+    fresh=True) is replaced on the first write, as save_results did.
+    """
+    
+    def __init__(self, folder_name, movie_id, output_format='csv', batch_size=50, fresh=False):
+        self.data_file = f'{folder_name}/reviews.{output_format}'
+        self.index_file = f'{folder_name}/review_hashes.txt'
+        self.movie_id = movie_id
+        self.batch_size = batch_size
+        self._pending = []
+        os.makedirs(folder_name, exist_ok=True)
+        
+        if fresh and os.path.exists(self.index_file):
+            os.remove(self.index_file)
+        hashes = []
+        if os.path.exists(self.index_file):
+            with open(self.index_file, encoding='utf-8') as f:
+                hashes = [line.strip() for line in f if line.strip()]
+        self._replace = os.path.exists(self.data_file) and not os.path.exists(self.index_file)
+        self.count = 0 if self._replace else self._reconcile(hashes)
+        self.seen_hashes = set(hashes[:self.count])
+    
+    def _reconcile(self, hashes):
+        # 数据先于 hash 写入; 中途崩溃时丢弃没有记录 hash 的行
+        rows = len(read_table(self.data_file, columns=['Review_Index'])) if os.path.exists(self.data_file) else 0
+        if rows > len(hashes):
+            write_table(read_table(self.data_file).head(len(hashes)), self.data_file)
+            rows = len(hashes)
+        if len(hashes) > rows:
+            with open(self.index_file, 'w', encoding='utf-8') as f:
+                f.write(''.join(key + '\n' for key in hashes[:rows]))
+        return rows
+    
+    def seen(self, key):
+        return key in self.seen_hashes
+    
+    def add(self, key, title, content, has_spoiler, rating):
+        self.seen_hashes.add(key)
+        self._pending.append((key, title, content, has_spoiler, rating))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        """Append pending reviews, then record their hashes"""
+        if not self._pending:
+            return
+        keys, titles, contents, spoilers, ratings = (list(column) for column in zip(*self._pending))
+        start = self.count + 1
+        df = pd.DataFrame({
+            'Review_Index': list(range(start, start + len(keys))),
+            'Review_Title': titles,
+            'Review_Content': contents,
+            'Has_Spoiler': spoilers,
+            'Rating': ratings,
+            'movie_id': [self.movie_id]*len(keys)
+        })
+        if self._replace:
+            write_table(df, self.data_file)
+            self._replace = False
+        else:
+            append_table(df, self.data_file)
+        _fsync(self.data_file)
+        
+        with open(self.index_file, 'a', encoding='utf-8') as f:
+            f.write(''.join(key + '\n' for key in keys))
+            f.flush()
+            os.fsync(f.fileno())
+        self.count += len(keys)
+        self._pending = []
+    
+    def data(self, page_title=""):
+        """Every saved review as a get_review_data tuple"""
+        self.flush()
+        if self._replace or not os.path.exists(self.data_file):
+            return [], [], [], [], page_title
+        df = read_table(self.data_file, dtype=str)
+        columns = ['Review_Title', 'Review_Content', 'Has_Spoiler', 'Rating']
+        return tuple(df[column].fillna('').tolist() for column in columns) + (page_title,)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        # 出错时也保存已经提取的评论
+        self.flush()
+
+def review_stats(data, movie_id, movie_url):
+    """Summary statistics of one movie's scraped reviews"""
+    title_list, content_list, has_spoiler_list, rating_list, page_title = data
+    return {
+        'Total_Reviews': len(content_list),
+        'Reviews_with_Title': sum(1 for t in title_list if t),
+        'Reviews_with_Content': sum(1 for c in content_list if c and len(c) > 10),
+        'Reviews_with_Spoiler': sum(1 for s in has_spoiler_list if s == 'Yes'),
+        'Movie_ID': movie_id,
+        'URL': movie_url,
+        'Page_Title': page_title
+    }
+
+def save_results(data, movie_id, movie_url, folder_name='reviews', output_format='csv'):
+    """Save results without vote counts or scrape time (output_format: csv, parquet or feather)"""
     title_list, content_list, has_spoiler_list, rating_list, page_title = data
     
     if not os.path.exists(folder_name):
@@ -349,56 +1146,315 @@ def save_results(data, movie_id, movie_url, folder_name='reviews'):
         'Rating': rating_list,
         'movie_id': [movie_id]*len(content_list)
     })
-    output_file = f'{folder_name}/reviews.csv'
-    df.to_csv(output_file, index=False, encoding='utf-8')
+    output_file = f'{folder_name}/reviews.{output_format}'
+    write_table(df, output_file)
     print(f"✓ Data saved to: {output_file}")
     
+    return output_file, save_stats(data, movie_id, movie_url, folder_name, output_format)
+
+def save_stats(data, movie_id, movie_url, folder_name='reviews', output_format='csv', extra=None):
+    """Save review_stats of data, plus any extra columns, to folder_name/stats.<format>"""
     # 统计 CSV
-    stats = {
-        'Total_Reviews': len(content_list),
-        'Reviews_with_Title': sum(1 for t in title_list if t),
-        'Reviews_with_Content': sum(1 for c in content_list if c and len(c) > 10),
-        'Reviews_with_Spoiler': sum(1 for s in has_spoiler_list if s == 'Yes'),
-        'Movie_ID': movie_id,
-        'URL': movie_url,
-        'Page_Title': page_title
-    }
-    stats_df = pd.DataFrame([stats])
-    stats_file = f'{folder_name}/stats.csv'
-    stats_df.to_csv(stats_file, index=False, encoding='utf-8')
+    stats_df = pd.DataFrame([dict(review_stats(data, movie_id, movie_url), **(extra or {}))])
+    stats_file = f'{folder_name}/stats.{output_format}'
+    write_table(stats_df, stats_file)
     print(f"✓ Statistics saved to: {stats_file}")
+    return stats_file
+
+def make_driver(driver_path, headless=False):
+    """Start a Chrome session with the scraper's browser options"""
+    os.system(f"chmod +x {driver_path}")
     
-    return output_file, stats_file
+    options = webdriver.ChromeOptions()
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    options.add_argument('--start-maximized')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument(f'--user-agent={USER_AGENT}')
+    if headless:
+        options.add_argument('--headless=new')
+    
+    service = Service(driver_path)
+    return webdriver.Chrome(service=service, options=options)
+
+def review_url(title_id, base_url=IMDB_BASE_URL):
+    """User review page of an IMDb title, e.g. tt2948356"""
+    return f"{base_url.rstrip('/')}/title/{title_id}/reviews/"
+
+def read_title_ids(path):
+    """One IMDb title ID per line; blank lines and # comments are skipped"""
+    with open(path, encoding='utf-8') as f:
+        lines = [line.split('#', 1)[0].strip() for line in f]
+    return [line for line in lines if line]
+
+MOVIE_IDS_FILE = 'movie_ids.csv'
+
+def _saved_movie_id(title_folder, output_format):
+    """movie_id of the reviews already saved for a title, or None"""
+    data_file = f'{title_folder}/reviews.{output_format}'
+    if not os.path.exists(data_file):
+        return None
+    saved = read_table(data_file, columns=['movie_id'])['movie_id'].dropna()
+    return int(saved.iloc[0]) if len(saved) else None
+
+def assign_movie_ids(folder_name, title_ids, output_format='csv'):
+    """
+    Movie ID of each title, kept in folder_name/movie_ids.csv. A title's
+    reviews are appended to the same file on every run and keyed by
+    (movie_id, Review_Index), so its ID must not depend on its position
+    in the current job list. Titles saved before this file existed keep
+    the movie_id of their saved reviews; new titles get the next free IDs
+    in list order.
+    """
+    path = os.path.join(folder_name, MOVIE_IDS_FILE)
+    ids = {}
+    if os.path.exists(path):
+        known = pd.read_csv(path, dtype={'Title_ID': str})
+        ids = dict(zip(known['Title_ID'], known['Movie_ID'].astype(int)))
+    for title_id in title_ids:
+        if title_id not in ids:
+            saved = _saved_movie_id(os.path.join(folder_name, title_id), output_format)
+            if saved is not None and saved not in ids.values():
+                ids[title_id] = saved
+    next_id = max(ids.values(), default=0) + 1
+    for title_id in title_ids:
+        if title_id not in ids:
+            ids[title_id] = next_id
+            next_id += 1
+    
+    os.makedirs(folder_name, exist_ok=True)
+    tmp = path + '.tmp'
+    pd.DataFrame(list(ids.items()), columns=['Title_ID', 'Movie_ID']).to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    return {title_id: ids[title_id] for title_id in title_ids}
+
+def scrape_titles(title_ids, driver_factory, sessions=2, base_url=IMDB_BASE_URL,
+                  folder_name='raw', output_format='csv', rate_limiter=None,
+                  fetch=get_review_data, checkpoint_batch=50, fresh=False, trace_file=None):
+    """
+    Scrape many titles with a pool of sessions: browsers from driver_factory
+    with fetch=get_review_data, or HttpSession with get_review_data_http
+    (anything with quit() that fetch accepts). Each title is saved
+    to folder_name/<title_id>/ through a ReviewCheckpoint, so titles scraped
+    before only get their new reviews appended, and one row per title
+    (including failures) to a combined folder_name/stats file, which is
+    returned as a DataFrame. Movie IDs come from assign_movie_ids, so a
+    title keeps its ID in later runs. With trace_file, each title's ScrapeTrace is appended
+    to it as one line of JSON.
+    """
+    rate_limiter = rate_limiter or default_rate_limiter
+    jobs = queue.Queue()
+    movie_ids = assign_movie_ids(folder_name, title_ids, output_format)
+    for title_id in title_ids:
+        jobs.put((movie_ids[title_id], title_id))
+    
+    rows = []
+    rows_lock = threading.Lock()
+    
+    def worker():
+        driver = None
+        try:
+            while True:
+                try:
+                    movie_id, title_id = jobs.get_nowait()
+                except queue.Empty:
+                    return
+                
+                movie_url = review_url(title_id, base_url)
+                row = {'Title_ID': title_id, 'Movie_ID': movie_id, 'URL': movie_url}
+                title_folder = os.path.join(folder_name, title_id)
+                counters = {}
+                trace = ScrapeTrace()
+                try:
+                    if driver is None:
+                        driver = driver_factory()
+                    checkpoint = ReviewCheckpoint(title_folder, movie_id, output_format,
+                                                  checkpoint_batch, fresh)
+                    start = time.perf_counter()
+                    with checkpoint:
+                        new_data = fetch(driver, movie_url, movie_id, rate_limiter,
+                                         checkpoint=checkpoint, stats=counters, trace=trace)
+                    row['Scrape_Seconds'] = round(time.perf_counter() - start, 2)
+                    data = checkpoint.data(new_data[4])
+                    if len(data[0]) > 0:
+                        print(f"✓ {title_id}: {len(new_data[0])} new reviews appended to "
+                              f"{checkpoint.data_file} in {row['Scrape_Seconds']}s")
+                        save_stats(data, movie_id, movie_url, title_folder, output_format, counters)
+                        row.update(review_stats(data, movie_id, movie_url),
+                                   New_Reviews=len(new_data[0]), Status='ok')
+                    else:
+                        row.update(Total_Reviews=0, New_Reviews=0, Status='no reviews')
+                except Exception as e:
+                    print(f"\n✗ {title_id}: {e}")
+                    row.update(Status=f'error: {e}')
+                    # 出错后换一个新的浏览器会话
+                    if driver is not None:
+                        try:
+                            driver.quit()
+                        except Exception:
+                            pass
+                        driver = None
+                row.update(counters)
+                
+                with rows_lock:
+                    rows.append(row)
+                    if trace_file:
+                        with open(trace_file, 'a', encoding='utf-8') as f:
+                            f.write(json.dumps(trace.to_dict(title_id=title_id, movie_id=movie_id,
+                                                             status=row['Status'])) + '\n')
+        finally:
+            if driver is not None:
+                driver.quit()
+    
+    threads = [threading.Thread(target=worker) for _ in range(max(1, min(sessions, len(title_ids))))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    # 汇总所有电影的统计
+    os.makedirs(folder_name, exist_ok=True)
+    trace_columns = list(ScrapeTrace().columns())
+    stats_df = pd.DataFrame(rows, columns=[
+        'Title_ID', 'Movie_ID', 'Total_Reviews', 'New_Reviews', 'Reviews_with_Title',
+        'Reviews_with_Content', 'Reviews_with_Spoiler', 'Spoilers_Found', 'Spoilers_Expanded',
+        'Spoilers_Failed', 'Scrape_Seconds'
+    ] + trace_columns + ['URL', 'Page_Title', 'Status']).sort_values('Movie_ID')
+    # 失败的电影没有统计数字，保持整数列
+    count_columns = ['Total_Reviews', 'New_Reviews', 'Reviews_with_Title', 'Reviews_with_Content',
+                     'Reviews_with_Spoiler', 'Spoilers_Found', 'Spoilers_Expanded', 'Spoilers_Failed',
+                     'Round_Trips', 'Selector_Fallbacks', 'Text_Bytes']
+    stats_df[count_columns] = stats_df[count_columns].astype('Int64')
+    stats_file = f'{folder_name}/stats.{output_format}'
+    write_table(stats_df, stats_file)
+    print(f"✓ Combined statistics saved to: {stats_file}")
+    return stats_df
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="IMDb user review scraper")
+    parser.add_argument('--titles', nargs='+', default=None,
+                        help="IMDb title IDs to scrape in job mode, e.g. tt2948356")
+    parser.add_argument('--titles-file', default=None,
+                        help="file with one IMDb title ID per line (job mode)")
+    parser.add_argument('--sessions', type=int, default=2,
+                        help="browser/HTTP sessions scraping in parallel (job mode)")
+    parser.add_argument('--backend', choices=['browser', 'http'], default='browser',
+                        help="Chrome via Selenium, or plain HTTP requests parsed with lxml")
+    parser.add_argument('--extraction', choices=['elements', 'bulk'], default='elements',
+                        help="browser backend: find_element per field, or one script call per page")
+    parser.add_argument('--spoiler-expansion', choices=['batch', 'elements'], default='batch',
+                        help="browser backend: click all spoiler buttons in one script call, or one by one")
+    parser.add_argument('--base-url', default=IMDB_BASE_URL,
+                        help="site root, e.g. http://127.0.0.1:8000 for local fixtures")
+    parser.add_argument('--output-dir', default='raw',
+                        help="output folder (job mode: one subfolder per title)")
+    parser.add_argument('--format', choices=['csv', 'parquet', 'feather'], default='csv',
+                        help="output file format")
+    parser.add_argument('--checkpoint-batch', type=int, default=50,
+                        help="reviews appended to reviews.csv per checkpoint write")
+    parser.add_argument('--fresh', action='store_true',
+                        help="replace earlier output instead of appending new reviews to it")
+    parser.add_argument('--full-rescan', action='store_true',
+                        help="load every review page even after reaching reviews saved by an earlier run")
+    parser.add_argument('--min-interval', type=float, default=4.0,
+                        help="minimum seconds between requests to the same host")
+    parser.add_argument('--jitter', type=float, default=2.0,
+                        help="random extra seconds added to each request interval")
+    parser.add_argument('--backoff', type=float, default=5.0,
+                        help="extra seconds per request after the host throttles us (doubled on repeats)")
+    parser.add_argument('--max-backoff', type=float, default=300.0,
+                        help="upper limit of the throttling backoff")
+    parser.add_argument('--wait-timeout', type=float, default=10.0,
+                        help="browser backend: longest wait for the page to change after an action")
+    parser.add_argument('--cookie-timeout', type=float, default=5.0,
+                        help="browser backend: longest wait for the cookie banner to appear")
+    parser.add_argument('--driver', default="IMDB_Scraper/ChromeDrive/chromedriver/chromedriver",
+                        help="ChromeDriver executable")
+    parser.add_argument('--trace', default=None,
+                        help="append a JSON line per title with phase timings and counters to this file")
+    parser.add_argument('--headless', action='store_true',
+                        help="run Chrome without a window")
+    return parser.parse_args()
+
+def make_rate_limiter(args):
+    return RateLimiter(args.min_interval, args.jitter, args.backoff, args.max_backoff)
+
+def run_jobs(args):
+    """Job mode: scrape every title in --titles / --titles-file"""
+    title_ids = list(args.titles or [])
+    if args.titles_file:
+        title_ids += read_title_ids(args.titles_file)
+    
+    print("=" * 60)
+    print(f"IMDb Review Scraper v2.0 - {len(title_ids)} titles, {args.sessions} sessions")
+    print("=" * 60)
+    
+    if args.backend == 'http':
+        session_factory = HttpSession
+        fetch = functools.partial(get_review_data_http, stop_at_known=not args.full_rescan)
+    else:
+        session_factory = lambda: make_driver(args.driver, args.headless)
+        fetch = functools.partial(get_review_data, bulk=args.extraction == 'bulk',
+                                  wait_timeout=args.wait_timeout,
+                                  cookie_timeout=args.cookie_timeout,
+                                  spoiler_batch=args.spoiler_expansion == 'batch',
+                                  stop_at_known=not args.full_rescan)
+    
+    stats_df = scrape_titles(
+        title_ids,
+        session_factory,
+        sessions=args.sessions,
+        base_url=args.base_url,
+        folder_name=args.output_dir,
+        output_format=args.format,
+        rate_limiter=make_rate_limiter(args),
+        fetch=fetch,
+        checkpoint_batch=args.checkpoint_batch,
+        fresh=args.fresh,
+        trace_file=args.trace,
+    )
+    ok = (stats_df['Status'] == 'ok').sum()
+    print(f"\n✓ Scraped {ok}/{len(title_ids)} titles, "
+          f"{int(stats_df['Total_Reviews'].fillna(0).sum())} reviews")
 
 def main():
     """Main function"""
-    folder_name = 'raw'
+    args = parse_args()
+    folder_name = args.output_dir
     if not os.path.exists(folder_name):
         os.makedirs(folder_name)
     
-    PATH = "IMDB_Scraper/ChromeDrive/chromedriver/chromedriver"
+    PATH = args.driver
     
-    if not os.path.exists(PATH):
+    if args.backend == 'browser' and not os.path.exists(PATH):
         print(f"Error: ChromeDriver file does not exist: {PATH}")
         return
     
-    os.system(f"chmod +x {PATH}")
-    
-    options = webdriver.ChromeOptions()
-    options.add_argument('--disable-blink-features=AutomationControlled')
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-    options.add_argument('--start-maximized')
-    options.add_argument('--disable-gpu')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+    # 多部电影: 浏览器会话池
+    if args.titles or args.titles_file:
+        run_jobs(args)
+        return
     
-    service = Service(PATH)
-    driver = webdriver.Chrome(service=service, options=options)
+    if args.backend == 'http':
+        driver = HttpSession()
+        fetch = functools.partial(get_review_data_http, stop_at_known=not args.full_rescan)
+    else:
+        driver = make_driver(PATH, args.headless)
+        fetch = functools.partial(get_review_data, bulk=args.extraction == 'bulk',
+                                  wait_timeout=args.wait_timeout,
+                                  cookie_timeout=args.cookie_timeout,
+                                  spoiler_batch=args.spoiler_expansion == 'batch',
+                                  stop_at_known=not args.full_rescan)
+    rate_limiter = make_rate_limiter(args)
     
     try:
-        movie_url = "https://www.imdb.com/title/tt2948356/reviews/?ref_=tt_ov_ururv"
+        if args.base_url == IMDB_BASE_URL:
+            movie_url = "https://www.imdb.com/title/tt2948356/reviews/?ref_=tt_ov_ururv"
+        else:
+            movie_url = review_url("tt2948356", args.base_url)
         movie_id = 1
         
         print("=" * 60)
@@ -407,18 +1463,29 @@ def main():
         print(f"Target URL: {movie_url}")
         print(f"Movie ID: {movie_id}")
         
-        data = get_review_data(driver, movie_url, movie_id)
+        # 每批评论提取后立即追加保存, 重新运行时跳过已保存的评论
+        checkpoint = ReviewCheckpoint(folder_name, movie_id, args.format,
+                                      args.checkpoint_batch, args.fresh)
+        counters = {}
+        trace = ScrapeTrace()
+        start = time.perf_counter()
+        with checkpoint:
+            new_data = fetch(driver, movie_url, movie_id, rate_limiter, checkpoint=checkpoint,
+                             stats=counters, trace=trace)
+        print(f"Scraped in {time.perf_counter() - start:.1f}s "
+              f"({counters['Round_Trips']} round-trips, {counters['Selector_Fallbacks']} selector fallbacks)")
+        if args.trace:
+            with open(args.trace, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(trace.to_dict(title_id=movie_url, movie_id=movie_id)) + '\n')
+        data = checkpoint.data(new_data[4])
         
         # 检查是否成功获取了数据
-        if data and len(data[0]) > 0:  # 检查 title_list 是否非空
-            data_file, stats_file = save_results(data, movie_id, movie_url, folder_name)
+        if len(data[0]) > 0:  # 检查 title_list 是否非空
+            stats_file = save_stats(data, movie_id, movie_url, folder_name, args.format, counters)
             
-            if data_file:
-                print(f"\n✓ Scraping completed!")
-                print(f"   Data file: {data_file}")
-                print(f"   Statistics file: {stats_file}")
-            else:
-                print("\n✗ Scraping failed, no data saved")
+            print(f"\n✓ Scraping completed! {len(new_data[0])} new reviews")
+            print(f"   Data file: {checkpoint.data_file}")
+            print(f"   Statistics file: {stats_file}")
         else:
             print("\n✗ Failed to retrieve review data or no reviews found")
             
@@ -429,7 +1496,7 @@ def main():
         
     finally:
         driver.quit()
-        print("\nBrowser closed")
+        print("\nSession closed")
 
 if __name__ == '__main__':
     main()
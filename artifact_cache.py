@@ -0,0 +1,138 @@
+# Content-addressed cache for pipeline artifacts
+#
+# Each artifact is stored in its own directory under the cache root, named
+# by a hash of everything it was built from (input file contents, config,
+# and the keys of upstream artifacts). A hit is reused as-is; entries are
+# evicted oldest-first by total size and/or age.
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+# Bump to invalidate every cached artifact after an incompatible change
+CACHE_VERSION = 1
+
+
+def hash_file(path, h=None, block_size=1 << 20):
+    h = h or hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h
+
+
+def hash_inputs(*paths):
+    """Hash the contents of files, or of every file in a directory"""
+    h = hashlib.sha256()
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                h.update(name.encode("utf-8"))
+                hash_file(os.path.join(path, name), h)
+        else:
+            hash_file(path, h)
+    return h.hexdigest()
+
+
+def make_key(kind, *parts):
+    """Key for an artifact of `kind` built from JSON-serialisable parts"""
+    payload = json.dumps([CACHE_VERSION, kind, parts], sort_keys=True, default=str)
+    return f"{kind}-{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:24]}"
+
+
+def _dir_size(path):
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path)
+        for name in names
+    )
+
+
+class ArtifactCache:
+    """Directory of artifacts keyed by content hash"""
+
+    def __init__(self, root=".lda_cache", max_bytes=None, max_age=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        # Seconds since last use
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        # Keys used by this run are never evicted by it
+        self.used = set()
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.root, key)
+
+    def get_or_build(self, key, build, save, load):
+        """
+        Return the artifact stored under key, or build it and store it.
+        save(obj, directory) writes the artifact into a directory and
+        load(directory) reads it back.
+        """
+        path = self.path(key)
+        self.used.add(key)
+        if os.path.isdir(path):
+            self.hits += 1
+            # Mark as recently used for age/size eviction
+            os.utime(path)
+            return load(path)
+
+        self.misses += 1
+        obj = build()
+
+        # Write to a temporary directory first so readers never see a
+        # partially written artifact
+        tmp = tempfile.mkdtemp(prefix=f".{key}-", dir=self.root)
+        try:
+            save(obj, tmp)
+            os.replace(tmp, path)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not os.path.isdir(path):
+                raise
+
+        self.evict()
+        return obj
+
+    def entries(self):
+        """[(key, last_used, size_bytes)] of complete entries, oldest first"""
+        entries = []
+        for key in os.listdir(self.root):
+            path = self.path(key)
+            if key.startswith(".") or not os.path.isdir(path):
+                continue
+            entries.append((key, os.path.getmtime(path), _dir_size(path)))
+        return sorted(entries, key=lambda entry: entry[1])
+
+    def evict(self):
+        """
+        Remove entries unused for more than max_age, then least recently
+        used entries until the cache fits in max_bytes
+        """
+        entries = self.entries()
+        now = time.time()
+        removed = []
+
+        if self.max_age is not None:
+            for entry in entries:
+                if entry[0] not in self.used and now - entry[1] > self.max_age:
+                    removed.append(entry)
+            entries = [entry for entry in entries if entry not in removed]
+
+        if self.max_bytes is not None:
+            total = sum(size for _, _, size in entries)
+            for entry in list(entries):
+                if total <= self.max_bytes:
+                    break
+                if entry[0] in self.used:
+                    continue
+                removed.append(entry)
+                total -= entry[2]
+
+        for key, _, _ in removed:
+            shutil.rmtree(self.path(key), ignore_errors=True)
+        return [key for key, _, _ in removed]
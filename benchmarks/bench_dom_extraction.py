@@ -0,0 +1,138 @@
+# Benchmark: per-element vs bulk extraction of review cards in the scraper.
+#
+# Builds a review page from the saved fixture (IMDB_Scraper/fixtures) with
+# --cards cards (every tenth one a duplicate), serves it locally, loads it in
+# headless Chrome and extracts every review both ways:
+#   elements  get_unique_reviews + extract_review on WebElements, one
+#             WebDriver command per find_element / .text
+#   bulk      get_unique_reviews_bulk, one execute_script for the whole page
+# WebDriver round-trips are counted by wrapping driver.execute. Both modes must
+# return the same reviews.
+#
+# Usage: python benchmarks/bench_dom_extraction.py [--cards 200] [--repeat 3]
+#            [--driver IMDB_Scraper/ChromeDrive/chromedriver/chromedriver]
+import argparse
+import functools
+import http.server
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "IMDB_Scraper"))
+
+import pandas as pd
+import scraper
+
+FIXTURES = os.path.join(ROOT, "IMDB_Scraper", "fixtures")
+SOURCE_PAGE = os.path.join(FIXTURES, "title", "tt0000001", "reviews", "index.html")
+
+
+def build_page(directory, cards):
+    """Write review_page.js and an index.html with `cards` review cards"""
+    with open(SOURCE_PAGE, encoding="utf-8") as f:
+        page = f.read()
+    templates = re.findall(r"<article.*?</article>", page, flags=re.S)
+
+    articles = []
+    for i in range(cards):
+        # Every tenth card repeats the previous one, as IMDb's lists sometimes do
+        n = i - 1 if i % 10 == 9 else i
+        article = templates[n % len(templates)]
+        article = re.sub(r"(</h3>)", f" #{n}\\1", article)
+        article = re.sub(r'(class="ipc-html-content-inner-div"[^>]*>)', f"\\1#{n} ", article)
+        articles.append(article)
+
+    section = '<section id="reviews">\n' + "\n".join(articles) + "\n</section>"
+    page = re.sub(r'<section id="reviews">.*?</section>', lambda _: section, page, flags=re.S)
+    page = re.sub(r"<template.*?</template>", "", page, flags=re.S)
+    with open(os.path.join(directory, "index.html"), "w", encoding="utf-8") as f:
+        f.write(page)
+    shutil.copy(os.path.join(FIXTURES, "review_page.js"), directory)
+
+
+def serve(directory):
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=directory)
+    handler.log_message = lambda *args: None
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def count_round_trips(driver):
+    """Wrap driver.execute; returns a one-item list holding the count"""
+    counter = [0]
+    execute = driver.execute
+
+    def counted(command, params=None):
+        counter[0] += 1
+        return execute(command, params)
+
+    driver.execute = counted
+    return counter
+
+
+def extract_elements(driver):
+    return [
+        scraper.extract_review(review, scraper._webelement_text, scraper._webelement_has)
+        for review in scraper.get_unique_reviews(driver)
+    ]
+
+
+def extract_bulk(driver):
+    return [
+        scraper.extract_review(card, scraper._card_text, scraper._card_has)
+        for card in scraper.get_unique_reviews_bulk(driver)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", type=int, default=200,
+                        help="review cards on the generated page")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="timing runs per mode (best is reported)")
+    parser.add_argument("--driver", default=os.path.join(
+        ROOT, "IMDB_Scraper", "ChromeDrive", "chromedriver", "chromedriver"),
+                        help="ChromeDriver executable")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        build_page(tmp, args.cards)
+        server = serve(tmp)
+        driver = scraper.make_driver(args.driver, headless=True)
+        try:
+            driver.get(f"http://127.0.0.1:{server.server_port}/index.html")
+            counter = count_round_trips(driver)
+
+            rows = []
+            results = {}
+            for mode, extract in [("elements", extract_elements), ("bulk", extract_bulk)]:
+                times = []
+                for _ in range(args.repeat):
+                    counter[0] = 0
+                    start = time.perf_counter()
+                    results[mode] = extract(driver)
+                    times.append(time.perf_counter() - start)
+                rows.append({
+                    "Mode": mode,
+                    "Cards": args.cards,
+                    "Reviews": len(results[mode]),
+                    "Round_Trips": counter[0],
+                    "Time_s": round(min(times), 4),
+                })
+        finally:
+            driver.quit()
+            server.shutdown()
+
+    print(pd.DataFrame(rows).to_string(index=False))
+    if results["elements"] != results["bulk"]:
+        sys.exit("Extraction modes returned different reviews")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# Benchmark: single-core LdaModel (alpha="auto", eta="auto") vs LdaMulticore
+# on the RQ1/2 cleaned reviews, comparing wall time and topic coherence.
+#
+# Usage: python benchmarks/bench_lda_trainers.py [cleaned.csv] [workers ...]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from gensim.models import CoherenceModel
+from lda_pipeline import build_corpus, train_lda
+
+cleaned_csv = (
+    sys.argv[1] if len(sys.argv) > 1
+    else "data/rq1_rq2_lda/rq1_2_cleaned_reviews.csv"
+)
+worker_counts = [int(w) for w in sys.argv[2:]] or [2, 4]
+
+
+def coherence(lda, texts, dictionary, corpus):
+    c_v = CoherenceModel(model=lda, texts=texts, dictionary=dictionary,
+                         coherence="c_v", processes=1).get_coherence()
+    u_mass = CoherenceModel(model=lda, corpus=corpus, dictionary=dictionary,
+                            coherence="u_mass").get_coherence()
+    return c_v, u_mass
+
+
+if __name__ == "__main__":
+    df_clean = pd.read_csv(cleaned_csv)
+    tokenized_corpus = [text.split() for text in df_clean["clean_text"].fillna("").tolist()]
+    _, texts, dictionary, doc_term_matrix = build_corpus(tokenized_corpus)
+
+    runs = [("single", None)] + [("multicore", w) for w in worker_counts]
+    results = []
+    for trainer, workers in runs:
+        start = time.perf_counter()
+        lda = train_lda(doc_term_matrix, dictionary, trainer=trainer, workers=workers)
+        elapsed = time.perf_counter() - start
+        c_v, u_mass = coherence(lda, texts, dictionary, doc_term_matrix)
+        results.append({
+            "Trainer": trainer,
+            "Workers": workers or 1,
+            "Wall_Time_s": round(elapsed, 2),
+            "Coherence_c_v": round(c_v, 4),
+            "Coherence_u_mass": round(u_mass, 4),
+        })
+
+    print(f"Documents: {len(doc_term_matrix)}, vocabulary: {len(dictionary)}")
+    print(pd.DataFrame(results).to_string(index=False))
@@ -0,0 +1,332 @@
+# Benchmark: every pipeline stage on synthetic review tables of growing size.
+#
+# For each --sizes N a reviews.csv with N reviews is generated from the real
+# scrape (data/raw/reviews.csv):
+#   lengths   (title, content) word counts, Rating and Has_Spoiler are drawn
+#             together from real rows, so their joint distribution is kept
+#   words     drawn from the real word frequencies; with the probability of a
+#             word occurring only once, a new word is drawn instead from an
+#             open Zipf-distributed vocabulary, so the vocabulary keeps growing
+#             with corpus size as real text does
+# Without a source table a Zipf vocabulary and log-normal lengths are used.
+#
+# The stages are the ones pipeline.py runs (same commands and paths, see
+# pipeline.build_stages), run one at a time in dependency order. Each stage
+# is a separate process, so wall time, CPU time and peak RSS come from
+# os.wait4. lda_rq1_2.py runs with --no-cache and writes --timings for its
+# load / phrases / dictionary / bow / train / infer / write steps.
+#
+# Stages run with NLTK_OFFLINE=1: NLTK data must already be installed, nothing
+# is downloaded. Results go to benchmarks/results/pipeline-<time>.json.
+#
+# Usage: python benchmarks/bench_pipeline.py [--sizes 10000 100000 1000000]
+#            [--stages rq1_2_clean rq3_ngrams ...] [--passes 1] [--work-dir DIR]
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+import pipeline
+from nltk_resources import missing_nltk_data
+from step_timer import maxrss_mb
+from table_io import TableWriter, read_table
+
+NLTK_PACKAGES = ["stopwords", "wordnet", "omw-1.4"]
+GENERATE_CHUNK = 50000
+LETTERS = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+
+# On Linux a process's peak RSS carries over from its parent through fork and
+# exec, so a stage started from this process would report at least this
+# process's own peak. Stages are started from a small launcher instead, which
+# times the stage and writes its exit code and resource usage to argv[1].
+LAUNCHER = """
+import json, os, subprocess, sys, time
+start = time.perf_counter()
+proc = subprocess.Popen(sys.argv[2:])
+_, status, usage = os.wait4(proc.pid, 0)
+with open(sys.argv[1], "w") as f:
+    json.dump([os.waitstatus_to_exitcode(status), time.perf_counter() - start,
+               usage.ru_utime, usage.ru_stime, usage.ru_maxrss], f)
+"""
+
+
+class ReviewModel:
+    """Length, label and word distributions fitted to a reviews table"""
+
+    def __init__(self, source=None):
+        if source is not None and os.path.exists(source):
+            df = read_table(source)
+            self.titles = df["Review_Title"].fillna("").astype(str).tolist()
+            contents = df["Review_Content"].fillna("").astype(str).tolist()
+            self.lengths = np.array([
+                (len(title.split()), len(content.split()))
+                for title, content in zip(self.titles, contents)
+            ])
+            self.ratings = df["Rating"].to_numpy(dtype=object)
+            self.spoilers = df["Has_Spoiler"].to_numpy(dtype=object)
+
+            counts = Counter(
+                word for text in self.titles + contents for word in text.split()
+            )
+            self.words = np.array(list(counts), dtype=object)
+            freq = np.array(list(counts.values()), dtype=float)
+            self.probs = freq / freq.sum()
+            # Probability that the next word has not been seen before
+            self.new_word_rate = sum(1 for c in counts.values() if c == 1) / freq.sum()
+        else:
+            self.lengths = None
+            self.words = np.array([], dtype=object)
+            self.probs = None
+            self.new_word_rate = 1.0
+
+    def sample_rows(self, rng, n):
+        """(title lengths, content lengths, ratings, spoilers) for n reviews"""
+        if self.lengths is None:
+            titles = np.maximum(1, rng.lognormal(np.log(6), 0.5, n).astype(int))
+            contents = np.maximum(1, rng.lognormal(np.log(150), 0.8, n).astype(int))
+            ratings = np.array([f"{r}/10" for r in rng.integers(1, 11, n)], dtype=object)
+            ratings[rng.random(n) < 0.1] = None
+            spoilers = np.where(rng.random(n) < 0.1, "Yes", "No").astype(object)
+            return titles, contents, ratings, spoilers
+        rows = rng.integers(0, len(self.lengths), n)
+        return (self.lengths[rows, 0], self.lengths[rows, 1],
+                self.ratings[rows], self.spoilers[rows])
+
+    def sample_words(self, rng, n):
+        if len(self.words):
+            words = self.words[rng.choice(len(self.words), n, p=self.probs)]
+        else:
+            words = np.empty(n, dtype=object)
+        new = rng.random(n) < self.new_word_rate
+        words[new] = [_encode_word(rank) for rank in rng.zipf(1.3, new.sum())]
+        return words
+
+
+def _encode_word(rank):
+    # Letters only, so the cleaners keep it; frequent ranks give short words
+    letters = []
+    while True:
+        rank, digit = divmod(rank, 26)
+        letters.append(LETTERS[digit])
+        if rank == 0:
+            break
+    return "q" + "".join(letters)
+
+
+def _join(words, lengths):
+    bounds = np.cumsum(lengths)[:-1]
+    return [" ".join(chunk) for chunk in np.split(words, bounds)]
+
+
+def generate_reviews(model, path, size, seed):
+    """Write a reviews table with `size` synthetic reviews"""
+    rng = np.random.default_rng(seed)
+    with TableWriter(path) as writer:
+        for start in range(0, size, GENERATE_CHUNK):
+            n = min(GENERATE_CHUNK, size - start)
+            title_len, content_len, ratings, spoilers = model.sample_rows(rng, n)
+            lengths = np.column_stack([title_len, content_len]).ravel()
+            texts = _join(model.sample_words(rng, int(lengths.sum())), lengths)
+            index = np.arange(start + 1, start + n + 1)
+            writer.write(pd.DataFrame({
+                "Review_Index": index,
+                "Review_Title": texts[0::2],
+                "Review_Content": texts[1::2],
+                "Has_Spoiler": spoilers,
+                "Rating": ratings,
+                # Reviews per title roughly as in a real scrape
+                "movie_id": (index - 1) // 1000 + 1,
+            }))
+
+
+def measure(command, log_path, env):
+    """Run command; returns (exit code, wall seconds, user CPU, system CPU, peak RSS MB)"""
+    usage_path = log_path + ".usage"
+    with open(log_path, "w", encoding="utf-8") as log:
+        subprocess.run(
+            [sys.executable, "-S", "-c", LAUNCHER, usage_path, *command],
+            stdout=log, stderr=subprocess.STDOUT, env=env,
+            cwd=os.path.dirname(log_path), check=True,
+        )
+    with open(usage_path, encoding="utf-8") as f:
+        code, elapsed, user, system, maxrss = json.load(f)
+    os.remove(usage_path)
+    return code, elapsed, user, system, maxrss_mb(maxrss)
+
+
+def tail(path, lines=5):
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return "".join(f.readlines()[-lines:]).rstrip()
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_size(args, model, size, work_dir, env):
+    size_dir = os.path.join(work_dir, str(size))
+    log_dir = os.path.join(size_dir, "logs")
+    os.makedirs(log_dir, exist_ok=True)
+    raw = os.path.join(size_dir, "raw", f"reviews.{args.format}")
+    os.makedirs(os.path.dirname(raw), exist_ok=True)
+
+    results = []
+    if os.path.exists(raw):
+        print(f"[{size}] reusing {raw}")
+    else:
+        start = time.perf_counter()
+        generate_reviews(model, raw, size, args.seed)
+        elapsed = time.perf_counter() - start
+        print(f"[{size}] generated {raw} in {elapsed:.1f}s")
+        results.append({"size": size, "stage": "generate", "status": "ok",
+                        "seconds": round(elapsed, 3),
+                        "raw_mb": round(os.path.getsize(raw) / 2**20, 1)})
+
+    stages = pipeline.build_stages(argparse.Namespace(
+        raw=raw, data_dir=size_dir, format=args.format,
+        stopwords=args.stopwords, num_topics=args.num_topics,
+        workers=args.workers, shared_clean=args.shared_clean,
+    ))
+    deps = pipeline.dependencies(stages)
+    stages = pipeline.select(stages, deps, args.stages)
+
+    failed = set()
+    for stage in stages:
+        row = {"size": size, "stage": stage.name}
+        results.append(row)
+        if deps[stage.name] & failed:
+            print(f"[{size}] [{stage.name}] not run: upstream stage failed")
+            row["status"] = "skipped"
+            failed.add(stage.name)
+            continue
+
+        timings = None
+        if stage.script == "lda_rq1_2.py":
+            timings = os.path.join(log_dir, f"{stage.name}_steps.json")
+            stage.args += ["--no-cache", "--passes", str(args.passes),
+                           "--timings", timings]
+        for path in stage.outputs:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        log_path = os.path.join(log_dir, f"{stage.name}.log")
+        code, elapsed, user, system, peak = measure(stage.command(), log_path, env)
+        row.update({
+            "status": "ok" if code == 0 else "failed",
+            "seconds": round(elapsed, 3),
+            "user_cpu": round(user, 3),
+            "system_cpu": round(system, 3),
+            "peak_rss_mb": peak,
+        })
+        if code != 0:
+            failed.add(stage.name)
+            print(f"[{size}] [{stage.name}] failed (exit {code}), see {log_path}:")
+            print(tail(log_path))
+            continue
+        print(f"[{size}] [{stage.name}] {elapsed:.1f}s, peak {peak} MB")
+        if timings is not None and os.path.exists(timings):
+            with open(timings, encoding="utf-8") as f:
+                row["steps"] = json.load(f)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[10000, 100000, 1000000],
+                        help="number of synthetic reviews per run")
+    parser.add_argument("--source", default=os.path.join(ROOT, "data", "raw", "reviews.csv"),
+                        help="real reviews the synthetic ones are modelled on")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stages", nargs="*", default=[],
+                        help="stages to run, with their upstream stages (default: all)")
+    parser.add_argument("--shared-clean", action="store_true",
+                        help="use the single clean_all.py stage")
+    parser.add_argument("--format", choices=["csv", "parquet", "feather"], default="csv",
+                        help="format of the synthetic and intermediate tables")
+    parser.add_argument("--stopwords", default=os.path.join(ROOT, "stopwords.json"))
+    parser.add_argument("--num-topics", type=int, default=20)
+    parser.add_argument("--passes", type=int, default=1,
+                        help="LDA training passes (the analysis uses 10)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes for each cleaning stage")
+    parser.add_argument("--work-dir", default=None,
+                        help="keep generated tables and outputs here; existing "
+                             "tables are reused (default: a temporary directory)")
+    parser.add_argument("--output", default=None,
+                        help="results JSON (default: benchmarks/results/pipeline-<time>.json)")
+    args = parser.parse_args()
+
+    missing = missing_nltk_data(*NLTK_PACKAGES)
+    if missing:
+        print(f"NLTK data not installed: {', '.join(missing)}; "
+              "cleaning stages that need it will fail (nothing is downloaded)")
+    env = dict(os.environ, NLTK_OFFLINE="1")
+
+    now = datetime.now(timezone.utc)
+    output = args.output or os.path.join(
+        ROOT, "benchmarks", "results", f"pipeline-{now:%Y%m%dT%H%M%SZ}.json"
+    )
+    work_dir = os.path.abspath(args.work_dir or tempfile.mkdtemp(prefix="bench_pipeline_"))
+
+    model = ReviewModel(args.source)
+    if model.lengths is None:
+        print(f"{args.source} not found: using a Zipf vocabulary and log-normal lengths")
+
+    results = []
+    try:
+        for size in args.sizes:
+            results += bench_size(args, model, size, work_dir, env)
+    finally:
+        if args.work_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "time": now.isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "source": args.source if model.lengths is not None else None,
+            "seed": args.seed,
+            "format": args.format,
+            "passes": args.passes,
+            "num_topics": args.num_topics,
+            "workers": args.workers,
+            "nltk_missing": missing,
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    table = pd.DataFrame([
+        {key: value for key, value in row.items() if key != "steps"}
+        for row in results
+    ])
+    print(table.to_string(index=False))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# Microbenchmark: per-review RQ3 cleaning time with the stopword set rebuilt
+# on every call (old rq3_clean.clean_text) vs the frozen, prebuilt config.
+#
+# Usage: python benchmarks/bench_stopwords.py [reviews.csv] [repeat]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nltk.corpus import stopwords
+from cleaning import read_review_chunks
+from stopword_config import load_stopwords
+from tokenizer import tokenize
+
+input_csv = sys.argv[1] if len(sys.argv) > 1 else "data/raw/reviews.csv"
+repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+
+# Before: stopword set rebuilt per review
+def clean_text_rebuild(text):
+    tokens = tokenize(text)
+
+    stop_words = set(stopwords.words("english"))
+    negations = {"not", "no", "nor"}
+    stop_words = stop_words - negations
+
+    tokens = [t for t in tokens if t not in stop_words and len(t) > 1]
+    return " ".join(tokens)
+
+
+# After: frozen stopword set built once
+stop_words = load_stopwords("rq3").words
+
+
+def clean_text_frozen(text):
+    tokens = tokenize(text)
+    tokens = [t for t in tokens if t not in stop_words and len(t) > 1]
+    return " ".join(tokens)
+
+
+def best_time(clean_fn, texts):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            clean_fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    texts = [t for chunk in read_review_chunks(input_csv, 10000, True) for t in chunk]
+
+    # Same output either way
+    assert [clean_text_rebuild(t) for t in texts] == [clean_text_frozen(t) for t in texts]
+
+    before = best_time(clean_text_rebuild, texts)
+    after = best_time(clean_text_frozen, texts)
+
+    print(f"Reviews: {len(texts)} (best of {repeat})")
+    print(f"Rebuilt per call: {before / len(texts) * 1e6:8.1f} us/review")
+    print(f"Frozen, prebuilt: {after / len(texts) * 1e6:8.1f} us/review")
+    print(f"Speedup: {before / after:.1f}x")
@@ -0,0 +1,93 @@
+# Benchmark: file size and load time of the project's tables as CSV, Parquet
+# and Feather. Each table is converted once into a temporary directory, then
+# read in full, with the columns a stage actually uses, and in chunks.
+# --scale N repeats the rows N times (with distinct text) to approximate a
+# larger scrape.
+#
+# Usage: python benchmarks/bench_table_io.py [--scale 20] [--repeat 3]
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from table_io import FORMATS, iter_table_chunks, read_table, write_table
+
+# (table, columns read by the stage that consumes it)
+TABLES = [
+    ("data/raw/reviews.csv", ["Review_Title", "Review_Content", "Rating"]),
+    ("data/rq1_rq2_lda/rq1_2_cleaned_reviews.csv", ["clean_text"]),
+    ("data/rq3/rq3_cleaned_reviews.csv", ["clean_text"]),
+    ("data/rq1_rq2_lda/rq2_doc_topic_distribution.csv",
+     lambda col: col.startswith("Topic_")),
+]
+
+
+def best_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def scaled_copy(df, i):
+    # Make text distinct per copy so Parquet's dictionary encoding does not
+    # collapse the repeated rows
+    if i == 0:
+        return df
+    df = df.copy()
+    for col in df.columns:
+        if pd.api.types.is_string_dtype(df[col]):
+            df[col] = df[col].where(df[col].isna(), df[col] + f" {i}")
+    return df
+
+
+def consume_chunks(path, columns):
+    for _ in iter_table_chunks(path, 5000, columns=columns):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=int, default=20,
+                        help="repeat every table's rows this many times")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="timing runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for source, columns in TABLES:
+            if not os.path.exists(source):
+                print(f"Skipping {source} (not found)")
+                continue
+            df = pd.read_csv(source)
+            df = pd.concat([scaled_copy(df, i) for i in range(args.scale)],
+                           ignore_index=True)
+            stem = os.path.splitext(os.path.basename(source))[0]
+
+            for fmt in FORMATS:
+                path = os.path.join(tmp, f"{stem}.{fmt}")
+                write_table(df, path)
+                rows.append({
+                    "Table": stem,
+                    "Format": fmt,
+                    "Rows": len(df),
+                    "Size_MB": round(os.path.getsize(path) / 2**20, 2),
+                    "Read_All_s": round(best_time(lambda: read_table(path), args.repeat), 4),
+                    "Read_Projected_s": round(best_time(
+                        lambda: read_table(path, columns=columns), args.repeat), 4),
+                    "Read_Chunked_s": round(best_time(
+                        lambda: consume_chunks(path, columns), args.repeat), 4),
+                })
+
+    print(pd.DataFrame(rows).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
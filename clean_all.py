@@ -0,0 +1,101 @@
+# Single-pass cleaning for RQ1 & RQ2 and RQ3
+#
+# Reads reviews.csv once, merges and lowercases each review once, and cleans
+# it for both analyses: rq1_2_cleaned_reviews.csv (every review, lemmatized)
+# and rq3_cleaned_reviews.csv (rated reviews only, negations kept). The two
+# files are identical to the ones written by lda_rq1_2_clean.py and
+# rq3_clean.py.
+from cleaning import add_engine_arguments, clean_reviews
+from corpus_format import corpus_dir_for
+from lemma_cache import DEFAULT_MAXSIZE, LemmaCache, cache_path_for
+from nltk_resources import ensure_nltk_data
+from stopword_config import DEFAULT_CONFIG
+from tokenizer import tokenize_lowered
+import argparse
+import re
+import lda_rq1_2_clean
+import rq3_clean
+
+_NON_ALNUM = re.compile(r"[^a-zA-Z0-9\s]")
+
+
+# Stopwords and lemmatizer for both cleaners (loaded once per process)
+def load_resources(cache_size=DEFAULT_MAXSIZE, cache_path=None,
+                   stopword_config=DEFAULT_CONFIG):
+    lda_rq1_2_clean.load_resources(cache_size, cache_path, stopword_config)
+    rq3_clean.load_resources(stopword_config)
+
+
+# Clean one review for RQ1 & RQ2 and, if it has a rating, for RQ3
+def clean_text(review):
+    text, rated = review
+    lowered = text.lower()
+
+    # RQ1 & RQ2 strip punctuation before lowercasing; lowercasing first is
+    # only equivalent when no non-ASCII character lowercases to ASCII
+    if text.isascii():
+        words = _NON_ALNUM.sub("", lowered).split()
+    else:
+        words = _NON_ALNUM.sub("", text).lower().split()
+    rq1_2_text = lda_rq1_2_clean.clean_words(words)
+
+    rq3_text = rq3_clean.clean_tokens(tokenize_lowered(lowered)) if rated else None
+    return rq1_2_text, rq3_text
+
+
+if __name__ == "__main__":
+    parser = add_engine_arguments(argparse.ArgumentParser())
+    parser.add_argument(
+        "--input", default=lda_rq1_2_clean.input_csv,
+        help="raw reviews CSV"
+    )
+    parser.add_argument(
+        "--rq1-2-output", default=lda_rq1_2_clean.output_csv,
+        help="cleaned reviews CSV for RQ1 & RQ2"
+    )
+    parser.add_argument(
+        "--rq3-output", default=rq3_clean.output_csv,
+        help="cleaned reviews CSV for RQ3"
+    )
+    parser.add_argument(
+        "--stopwords", default=DEFAULT_CONFIG,
+        help="stopword configuration file"
+    )
+    parser.add_argument(
+        "--lemma-cache-size", type=int, default=DEFAULT_MAXSIZE,
+        help="maximum number of cached token -> lemma entries"
+    )
+    parser.add_argument(
+        "--save-lemma-cache", action="store_true",
+        help="reload and save the lemma cache next to the RQ1 & RQ2 output"
+    )
+    args = parser.parse_args()
+    outputs = [args.rq1_2_output, args.rq3_output]
+
+    cache_path = cache_path_for(args.rq1_2_output) if args.save_lemma_cache else None
+    lemma_store = LemmaCache(None, args.lemma_cache_size)
+    if cache_path is not None:
+        lemma_store.load(cache_path)
+
+    # NLTK resources
+    ensure_nltk_data("stopwords", "wordnet", "omw-1.4")
+
+    # Build and save both cleaned corpora
+    rq1_2_total, rq3_total = clean_reviews(
+        args.input, outputs, clean_text,
+        initializer=load_resources,
+        initargs=(args.lemma_cache_size, cache_path, args.stopwords),
+        workers=args.workers,
+        chunksize=args.chunksize,
+        corpus_dir=[corpus_dir_for(path) for path in outputs] if args.corpus else None,
+        state_fn=lda_rq1_2_clean.drain_lemma_cache,
+        merge_state=lambda delta: lemma_store.update(delta["entries"]),
+        with_rated=True,
+    )
+
+    print(f"Cleaned {rq1_2_total} reviews and saved to {args.rq1_2_output}")
+    print(f"Cleaned {rq3_total} rated reviews and saved to {args.rq3_output}")
+
+    if cache_path is not None:
+        lemma_store.save(cache_path)
+        print(f"Saved {len(lemma_store)} cached lemmas to {cache_path}")
@@ -0,0 +1,166 @@
+# Shared cleaning engine for lda_rq1_2_clean.py, rq3_clean.py and clean_all.py
+#
+# Reads reviews.csv in chunks and cleans each chunk either in-process
+# (workers=1) or on a process pool. Chunks are written back in input order,
+# so the output is identical to a serial run.
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from corpus_format import CorpusWriter
+from table_io import TableWriter, iter_table_chunks
+import pandas as pd
+
+TEXT_COLUMNS = ["Review_Title", "Review_Content"]
+
+# Per-process cleaning function and state hook, set by _init_worker
+_worker_clean_fn = None
+_worker_state_fn = None
+
+
+def add_engine_arguments(parser):
+    """Add --workers / --chunksize options to a cleaner's argument parser"""
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="number of cleaning processes (1 = run in this process)"
+    )
+    parser.add_argument(
+        "--chunksize", type=int, default=5000,
+        help="number of reviews read and cleaned per chunk"
+    )
+    parser.add_argument(
+        "--corpus", action="store_true",
+        help="also save an integer-encoded corpus next to the cleaned CSV"
+    )
+    return parser
+
+
+def read_review_chunks(input_csv, chunksize, require_rating=False,
+                       with_rated=False):
+    """
+    Yield merged title + content text for each chunk of reviews.csv, or
+    (text, has_rating) pairs if with_rated is set
+    """
+    usecols = TEXT_COLUMNS + (["Rating"] if require_rating or with_rated else [])
+    reader = iter_table_chunks(
+        input_csv,
+        chunksize,
+        columns=usecols,
+        dtype={col: str for col in TEXT_COLUMNS},
+    )
+    for chunk in reader:
+        # Remove rows without rating
+        if require_rating:
+            chunk = chunk.dropna(subset=["Rating"])
+
+        # Merge title and content
+        texts = (
+            chunk["Review_Title"].fillna("") + " "
+            + chunk["Review_Content"].fillna("")
+        ).tolist()
+        if with_rated:
+            yield list(zip(texts, chunk["Rating"].notna().tolist()))
+        else:
+            yield texts
+
+
+def _init_worker(clean_fn, initializer, initargs, state_fn):
+    # Load stopwords / lemmatizer once per process
+    global _worker_clean_fn, _worker_state_fn
+    if initializer is not None:
+        initializer(*initargs)
+    _worker_clean_fn = clean_fn
+    _worker_state_fn = state_fn
+
+
+def _clean_chunk(texts):
+    cleaned = [_worker_clean_fn(text) for text in texts]
+    state = _worker_state_fn() if _worker_state_fn is not None else None
+    return cleaned, state
+
+
+def _write_chunk(cleaned, writer):
+    writer.write(pd.DataFrame({"clean_text": pd.Series(cleaned, dtype=object)}))
+
+
+def clean_reviews(input_csv, output_csv, clean_fn, initializer=None,
+                  initargs=(), workers=1, chunksize=5000,
+                  require_rating=False, encoding="utf-8",
+                  state_fn=None, merge_state=None, corpus_dir=None,
+                  with_rated=False):
+    """
+    Clean every review in input_csv with clean_fn and write a single
+    clean_text column to output_csv (CSV, Parquet or Feather, see table_io.py).
+    Returns the number of reviews cleaned.
+
+    output_csv may also be a list of paths, in which case clean_fn returns
+    one cleaned text per output (None leaves the review out of that output),
+    corpus_dir is a matching list or None, and a list of counts is returned.
+    With with_rated, clean_fn receives (text, has_rating) pairs.
+
+    clean_fn, initializer and state_fn must be importable module-level
+    functions so they can be sent to worker processes. If state_fn is given
+    it is called in the worker after each chunk and its result is passed to
+    merge_state in this process (e.g. to collect worker-side caches).
+    If corpus_dir is given the cleaned text is also saved there as an
+    integer-encoded corpus (see corpus_format.py).
+    """
+    chunks = read_review_chunks(input_csv, chunksize, require_rating, with_rated)
+    multi = not isinstance(output_csv, str)
+    outputs = list(output_csv) if multi else [output_csv]
+    corpus_dirs = (
+        list(corpus_dir) if multi and corpus_dir is not None
+        else [corpus_dir] * len(outputs)
+    )
+    corpora = [
+        CorpusWriter(path) if path is not None else None for path in corpus_dirs
+    ]
+    writers = [TableWriter(path, encoding) for path in outputs]
+    totals = [0] * len(outputs)
+
+    def collect(result):
+        cleaned, state = result
+        if multi:
+            # One column per output; None leaves a review out of that output
+            columns = [[] for _ in outputs]
+            for texts in cleaned:
+                for column, text in zip(columns, texts):
+                    if text is not None:
+                        column.append(text)
+        else:
+            columns = [cleaned]
+        for i, column in enumerate(columns):
+            _write_chunk(column, writers[i])
+            totals[i] += len(column)
+            if corpora[i] is not None:
+                corpora[i].add_texts(column)
+        if merge_state is not None:
+            merge_state(state)
+
+    if workers <= 1:
+        _init_worker(clean_fn, initializer, initargs, state_fn)
+        for texts in chunks:
+            collect(_clean_chunk(texts))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(clean_fn, initializer, initargs, state_fn),
+        ) as pool:
+            # Keep a bounded window of chunks in flight, collected in order
+            pending = deque()
+            for texts in chunks:
+                pending.append(pool.submit(_clean_chunk, texts))
+                if len(pending) >= 2 * workers:
+                    collect(pending.popleft().result())
+            while pending:
+                collect(pending.popleft().result())
+
+    # Empty input still gets a header, as with a serial to_csv
+    for writer in writers:
+        if writer.first:
+            _write_chunk([], writer)
+        writer.close()
+    for corpus in corpora:
+        if corpus is not None:
+            corpus.close()
+
+    return totals if multi else totals[0]
@@ -0,0 +1,84 @@
+# Topic concentration metrics for RQ2
+#
+# Computes Gini, entropy, mean probability and dominant-topic counts for every
+# topic at once from a doc x topic probability matrix (rows sum to 1). The
+# matrix may be a memory-mapped .npy file: row-wise statistics are
+# accumulated over row chunks and Gini sorts a block of topic columns at a
+# time, so only `chunksize` rows or `column_block` columns are in memory.
+#
+# Usage: python concentration.py doc_topics.npy
+import sys
+import numpy as np
+import pandas as pd
+
+
+def _row_stats(matrix, chunksize):
+    num_docs, num_topics = matrix.shape
+    totals = np.zeros(num_topics, dtype=np.float64)
+    plogp = np.zeros(num_topics, dtype=np.float64)
+    dominant_counts = np.zeros(num_topics, dtype=np.int64)
+
+    for start in range(0, num_docs, chunksize):
+        chunk = np.asarray(matrix[start:start + chunksize], dtype=np.float64)
+        totals += chunk.sum(axis=0)
+        safe = np.where(chunk > 0, chunk, 1.0)
+        plogp += (chunk * np.log2(safe)).sum(axis=0)
+        dominant_counts += np.bincount(chunk.argmax(axis=1), minlength=num_topics)
+
+    return totals, -plogp, dominant_counts
+
+
+def _gini(matrix, column_block):
+    num_docs, num_topics = matrix.shape
+    # Sum of cumulative sums of a sorted column = sum((n - i) * x_sorted[i])
+    weights = np.arange(num_docs, 0, -1, dtype=np.float64)
+    gini = np.zeros(num_topics, dtype=np.float64)
+
+    for start in range(0, num_topics, column_block):
+        block = np.sort(
+            np.asarray(matrix[:, start:start + column_block], dtype=np.float64),
+            axis=0,
+        )
+        total = block.sum(axis=0)
+        cum_sum = weights @ block
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = (num_docs + 1 - 2 * cum_sum / total) / num_docs
+        gini[start:start + column_block] = np.where(total > 0, values, 0)
+
+    return gini
+
+
+def concentration_metrics(matrix, chunksize=100000, column_block=None):
+    """
+    DataFrame indexed by topic with Gini, Entropy, Avg_Probability (0-1)
+    and Num_of_Reviews (documents whose dominant topic it is)
+    """
+    num_docs, num_topics = matrix.shape
+    if column_block is None:
+        # Keep a sorted block at roughly chunksize x num_topics values
+        column_block = max(1, min(num_topics, chunksize * num_topics // max(num_docs, 1)))
+
+    totals, entropy, dominant_counts = _row_stats(matrix, chunksize)
+    return pd.DataFrame({
+        "Num_of_Reviews": dominant_counts,
+        "Avg_Probability": totals / max(num_docs, 1),
+        "Gini": _gini(matrix, column_block),
+        "Entropy": entropy,
+    })
+
+
+def concentration_level(gini):
+    if gini > 0.8:
+        return "Very High"
+    elif gini > 0.6:
+        return "High"
+    elif gini > 0.4:
+        return "Medium"
+    return "Low"
+
+
+if __name__ == "__main__":
+    doc_topics = np.load(sys.argv[1], mmap_mode="r")
+    metrics = concentration_metrics(doc_topics)
+    metrics["Concentration_Level"] = metrics["Gini"].map(concentration_level)
+    print(metrics.round(3).to_string())
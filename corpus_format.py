@@ -0,0 +1,141 @@
+# Integer-encoded corpus shared between the cleaning and modelling stages
+#
+# A corpus is a directory of four .npy files:
+#   vocab_bytes.npy    uint8, UTF-8 token strings back to back
+#   vocab_offsets.npy  int64, token id i is vocab_bytes[o[i]:o[i + 1]]
+#   tokens.npy         flat uint32 token ids of every document, back to back
+#   offsets.npy        int64, document d is tokens[offsets[d]:offsets[d + 1]]
+# The token arrays can be memory-mapped, so reloading takes milliseconds and
+# no stage has to re-split CSV text. The vocabulary is stored as one byte
+# string rather than a fixed-width string array, which would pad every
+# token to the longest one.
+import os
+import numpy as np
+
+VOCAB_BYTES_FILE = "vocab_bytes.npy"
+VOCAB_OFFSETS_FILE = "vocab_offsets.npy"
+TOKENS_FILE = "tokens.npy"
+OFFSETS_FILE = "offsets.npy"
+# Written before the vocabulary was packed; still readable
+LEGACY_VOCAB_FILE = "vocab.npy"
+
+
+def pack_vocab(words):
+    """(uint8 UTF-8 blob, int64 offsets) of a list of strings"""
+    encoded = [word.encode("utf-8") for word in words]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(word) for word in encoded], out=offsets[1:])
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return blob, offsets
+
+
+def unpack_vocab(blob, offsets):
+    """Object array of the strings packed by pack_vocab"""
+    data = np.asarray(blob).tobytes()
+    bounds = np.asarray(offsets).tolist()
+    words = np.empty(len(bounds) - 1, dtype=object)
+    words[:] = [data[start:end].decode("utf-8")
+                for start, end in zip(bounds[:-1], bounds[1:])]
+    return words
+
+
+def load_vocab(path):
+    if not os.path.exists(os.path.join(path, VOCAB_BYTES_FILE)):
+        return np.load(os.path.join(path, LEGACY_VOCAB_FILE)).astype(object)
+    return unpack_vocab(
+        np.load(os.path.join(path, VOCAB_BYTES_FILE)),
+        np.load(os.path.join(path, VOCAB_OFFSETS_FILE)),
+    )
+
+
+def corpus_dir_for(output_csv):
+    """Corpus directory kept next to a cleaned CSV, e.g. rq3_cleaned_reviews_corpus"""
+    return os.path.splitext(output_csv)[0] + "_corpus"
+
+
+class EncodedCorpus:
+    """Read-only view of a saved corpus"""
+
+    def __init__(self, vocab, tokens, offsets):
+        self.vocab = vocab
+        self.tokens = tokens
+        self.offsets = offsets
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        mode = "r" if mmap else None
+        return cls(
+            load_vocab(path),
+            np.load(os.path.join(path, TOKENS_FILE), mmap_mode=mode),
+            np.load(os.path.join(path, OFFSETS_FILE), mmap_mode=mode),
+        )
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def doc_ids(self, i):
+        """Token ids of document i"""
+        return self.tokens[self.offsets[i]:self.offsets[i + 1]]
+
+    def doc(self, i):
+        """Token strings of document i"""
+        return self.vocab[self.doc_ids(i)].tolist()
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.doc(i)
+
+    def token_lists(self):
+        # Decode the whole corpus in one vectorized lookup, then slice
+        words = self.vocab[np.asarray(self.tokens)].tolist()
+        offsets = np.asarray(self.offsets).tolist()
+        return [words[offsets[i]:offsets[i + 1]] for i in range(len(self))]
+
+
+class CorpusWriter:
+    """Encode documents chunk by chunk and save them as an EncodedCorpus"""
+
+    def __init__(self, path):
+        self.path = path
+        self.vocab = {}
+        self.chunks = []
+        self.lengths = []
+
+    def add(self, token_lists):
+        vocab = self.vocab
+        ids = []
+        for tokens in token_lists:
+            for token in tokens:
+                token_id = vocab.get(token)
+                if token_id is None:
+                    token_id = vocab[token] = len(vocab)
+                ids.append(token_id)
+            self.lengths.append(len(tokens))
+        self.chunks.append(np.array(ids, dtype=np.uint32))
+
+    def add_texts(self, texts):
+        """Add cleaned, space-joined documents"""
+        self.add([text.split() for text in texts])
+
+    def close(self):
+        os.makedirs(self.path, exist_ok=True)
+        offsets = np.zeros(len(self.lengths) + 1, dtype=np.int64)
+        np.cumsum(self.lengths, out=offsets[1:])
+        tokens = (
+            np.concatenate(self.chunks) if self.chunks
+            else np.zeros(0, dtype=np.uint32)
+        )
+        words = list(self.vocab)
+        vocab_bytes, vocab_offsets = pack_vocab(words)
+
+        np.save(os.path.join(self.path, VOCAB_BYTES_FILE), vocab_bytes)
+        np.save(os.path.join(self.path, VOCAB_OFFSETS_FILE), vocab_offsets)
+        np.save(os.path.join(self.path, TOKENS_FILE), tokens)
+        np.save(os.path.join(self.path, OFFSETS_FILE), offsets)
+        # Fixed-width vocabulary left by an older run
+        legacy = os.path.join(self.path, LEGACY_VOCAB_FILE)
+        if os.path.exists(legacy):
+            os.remove(legacy)
+        vocab = np.empty(len(words), dtype=object)
+        vocab[:] = words
+        return EncodedCorpus(vocab, tokens, offsets)
@@ -0,0 +1,225 @@
+# Incremental RQ1 & RQ2 update for newly scraped reviews
+#
+# Cleans only the rows of reviews.csv not seen before (keyed by movie_id and
+# Review_Index), runs them through the saved phraser and dictionary, updates
+# the saved LDA model online and appends their rows to the cleaned corpus and
+# rq2_doc_topic_distribution.csv. Time is proportional to the new reviews.
+#
+# An update appends to three tables and replaces the model. Before writing,
+# it records how far each table reached in a run marker; the new model is
+# saved next to the old one and swapped in, and the marker is removed last.
+# If a run dies in between, the next run finds the marker and rolls the
+# tables and model back, so the same reviews are never added twice.
+#
+# Bootstrap once after a full run:
+#   python lda_rq1_2.py --save-model rq1_2_model
+#   python lda_incremental.py --init
+import argparse
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+import lda_rq1_2_clean
+from lda_pipeline import load_model, save_model
+from table_io import CSV, append_table, iter_table_chunks, read_table, table_format, write_table
+from topic_inference import infer_doc_topics
+
+KEY_COLUMNS = ["movie_id", "Review_Index"]
+state_csv = "rq1_2_incremental_state.csv"
+run_marker = "rq1_2_incremental_run.json"
+output_doc_topics = "rq2_doc_topic_distribution.csv"
+
+
+def load_seen_keys(path):
+    if not os.path.exists(path):
+        return None
+    seen = pd.read_csv(path, dtype=str)
+    return set(zip(seen["movie_id"], seen["Review_Index"]))
+
+
+def read_new_reviews(input_csv, seen, chunksize=10000):
+    """
+    Keys and merged title + content of reviews not in `seen`. Reviews
+    without a movie_id or Review_Index cannot be tracked and are skipped.
+    """
+    new_keys = []
+    new_texts = []
+    missing = 0
+    reader = iter_table_chunks(
+        input_csv,
+        chunksize,
+        columns=KEY_COLUMNS + ["Review_Title", "Review_Content"],
+        dtype=str,
+    )
+    for chunk in reader:
+        has_key = chunk[KEY_COLUMNS].notna().all(axis=1)
+        missing += int((~has_key).sum())
+        chunk = chunk[has_key]
+
+        # Columnar files keep numeric keys; the state file stores strings
+        keys = list(zip(chunk["movie_id"].astype(str),
+                        chunk["Review_Index"].astype(str)))
+        is_new = np.fromiter((key not in seen for key in keys), dtype=bool,
+                             count=len(keys))
+        if not is_new.any():
+            continue
+        chunk = chunk[is_new]
+        new_keys.extend(key for key, new in zip(keys, is_new) if new)
+
+        # Merge title and content
+        new_texts.extend((
+            chunk["Review_Title"].fillna("") + " " + chunk["Review_Content"].fillna("")
+        ).tolist())
+    if missing:
+        print(f"Skipped {missing} reviews without {' / '.join(KEY_COLUMNS)}")
+    return new_keys, new_texts
+
+
+def append_keys(path, keys):
+    pd.DataFrame(keys, columns=KEY_COLUMNS).to_csv(
+        path, mode="a", header=not os.path.exists(path), index=False
+    )
+
+
+def table_mark(path):
+    """
+    Where an appended table ends: its size in bytes for CSV (appended in
+    place), its row count otherwise, None if it does not exist yet
+    """
+    if not os.path.exists(path):
+        return None
+    if table_format(path) == CSV:
+        return os.path.getsize(path)
+    return len(read_table(path))
+
+
+def rollback_table(path, mark):
+    """Cut a table back to a table_mark"""
+    if mark is None:
+        if os.path.exists(path):
+            os.remove(path)
+    elif table_format(path) == CSV:
+        os.truncate(path, mark)
+    else:
+        write_table(read_table(path).head(mark), path)
+
+
+def begin_run(marker, tables):
+    """Record the end of each table before anything is written"""
+    tmp = marker + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({path: table_mark(path) for path in tables}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, marker)
+
+
+def recover(marker, model_dir):
+    """Undo a run that did not finish (its marker is still there)"""
+    if not os.path.exists(marker):
+        # Left by a run that committed but died before deleting it; a later
+        # rollback must not restore it over the committed model
+        shutil.rmtree(model_dir + ".old", ignore_errors=True)
+        return
+    with open(marker, encoding="utf-8") as f:
+        marks = json.load(f)
+    for path, mark in marks.items():
+        rollback_table(path, mark)
+    if os.path.exists(model_dir + ".old"):
+        # The new model may already be in place: restore the old one
+        shutil.rmtree(model_dir, ignore_errors=True)
+        os.replace(model_dir + ".old", model_dir)
+    shutil.rmtree(model_dir + ".new", ignore_errors=True)
+    os.remove(marker)
+    print("Rolled back an unfinished update; its reviews are added again")
+
+
+def replace_model(model_dir, bigram_mod, dictionary, lda, num_docs):
+    """Save the model next to model_dir, then swap it in"""
+    shutil.rmtree(model_dir + ".new", ignore_errors=True)
+    save_model(model_dir + ".new", bigram_mod, dictionary, lda, num_docs)
+    os.replace(model_dir, model_dir + ".old")
+    os.replace(model_dir + ".new", model_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--reviews", default=lda_rq1_2_clean.input_csv,
+        help="raw reviews.csv, possibly with newly appended reviews"
+    )
+    parser.add_argument(
+        "--cleaned", default=lda_rq1_2_clean.output_csv,
+        help="cleaned reviews table the new reviews are appended to"
+    )
+    parser.add_argument(
+        "--doc-topics", default=output_doc_topics,
+        help="doc x topic table the new reviews are appended to"
+    )
+    parser.add_argument(
+        "--model-dir", default="rq1_2_model",
+        help="model saved by lda_rq1_2.py --save-model"
+    )
+    parser.add_argument(
+        "--init", action="store_true",
+        help="mark every review currently in --reviews as already modelled"
+    )
+    parser.add_argument(
+        "--passes", type=int, default=1,
+        help="online update passes over the new reviews"
+    )
+    args = parser.parse_args()
+
+    if args.init:
+        if os.path.exists(state_csv):
+            os.remove(state_csv)
+        keys, _ = read_new_reviews(args.reviews, set())
+        append_keys(state_csv, keys)
+        print(f"Marked {len(keys)} reviews as modelled in {state_csv}")
+        return
+
+    recover(run_marker, args.model_dir)
+    seen = load_seen_keys(state_csv)
+    if seen is None:
+        raise SystemExit(
+            f"{state_csv} not found: run lda_rq1_2.py --save-model "
+            f"{args.model_dir} and then lda_incremental.py --init first"
+        )
+
+    new_keys, new_texts = read_new_reviews(args.reviews, seen)
+    if not new_keys:
+        print("No new reviews")
+        return
+
+    # Clean only the new reviews
+    lda_rq1_2_clean.load_resources()
+    cleaned = [lda_rq1_2_clean.clean_text(text) for text in new_texts]
+
+    # Saved phraser and dictionary (new words outside the dictionary are dropped)
+    bigram_mod, dictionary, lda, num_docs = load_model(args.model_dir)
+    new_bow = [dictionary.doc2bow(bigram_mod[text.split()]) for text in cleaned]
+
+    # Online update of the existing model
+    lda.update(new_bow, passes=args.passes)
+
+    # Topic distributions of the new reviews only
+    doc_topics = infer_doc_topics(lda, new_bow)
+    columns = [f"Topic_{i}_%" for i in range(lda.num_topics)]
+    df_new = pd.DataFrame(doc_topics * 100, columns=columns)
+    df_new.insert(0, "Review_Index", np.arange(num_docs, num_docs + len(new_bow)))
+
+    # Write everything, then commit by removing the run marker
+    begin_run(run_marker, [args.cleaned, args.doc_topics, state_csv])
+    append_table(pd.DataFrame({"clean_text": cleaned}), args.cleaned)
+    append_table(df_new, args.doc_topics)
+    replace_model(args.model_dir, bigram_mod, dictionary, lda, num_docs + len(new_bow))
+    append_keys(state_csv, new_keys)
+    os.remove(run_marker)
+    shutil.rmtree(args.model_dir + ".old")
+
+    print(f"Added {len(new_bow)} reviews (total {num_docs + len(new_bow)})")
+
+
+if __name__ == "__main__":
+    main()
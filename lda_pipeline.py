@@ -0,0 +1,219 @@
+# Phrases / Dictionary / LDA steps of lda_rq1_2.py, shared with the
+# benchmark and sweep scripts
+import json
+import os
+import pickle
+from gensim import corpora
+from gensim.models import LdaModel, LdaMulticore
+from gensim.models.phrases import FrozenPhrases, Phrases, Phraser
+from artifact_cache import make_key
+from step_timer import timed
+
+# Hyperparameters used for RQ1 & RQ2
+DEFAULT_CONFIG = {
+    "num_topics": 20,
+    "passes": 10,
+    "min_count": 3,
+    "threshold": 5,
+    "no_below": 5,
+    "no_above": 0.5,
+    "random_state": 42,
+}
+
+
+def build_phraser(tokenized_corpus, config=DEFAULT_CONFIG):
+    """Train bigram model"""
+    bigram = Phrases(
+        tokenized_corpus,
+        min_count=config["min_count"],
+        threshold=config["threshold"]
+    )
+    return Phraser(bigram)
+
+
+def build_dictionary(corpus_with_bigrams, config=DEFAULT_CONFIG):
+    """Build dictionary and remove extreme terms"""
+    dictionary = corpora.Dictionary(corpus_with_bigrams)
+    dictionary.filter_extremes(
+        no_below=config["no_below"],
+        no_above=config["no_above"]
+    )
+    return dictionary
+
+
+def build_corpus(tokenized_corpus, config=DEFAULT_CONFIG, timer=None):
+    """
+    Returns (bigram_mod, corpus_with_bigrams, dictionary, doc_term_matrix).
+    With a StepTimer, the phrases, dictionary and bow steps are timed.
+    """
+    with timed(timer, "phrases"):
+        bigram_mod = build_phraser(tokenized_corpus, config)
+        corpus_with_bigrams = [bigram_mod[doc] for doc in tokenized_corpus]
+    with timed(timer, "dictionary"):
+        dictionary = build_dictionary(corpus_with_bigrams, config)
+    with timed(timer, "bow"):
+        doc_term_matrix = [dictionary.doc2bow(doc) for doc in corpus_with_bigrams]
+    return bigram_mod, corpus_with_bigrams, dictionary, doc_term_matrix
+
+
+def train_lda(doc_term_matrix, dictionary, config=DEFAULT_CONFIG,
+              trainer="single", workers=None, chunksize=2000):
+    """
+    Train LDA on a single core (alpha/eta learned with "auto"), or with
+    LdaMulticore. LdaMulticore cannot learn alpha, so that mode uses a
+    symmetric alpha and learns eta only.
+    """
+    if trainer == "single":
+        return LdaModel(
+            doc_term_matrix,
+            num_topics=config["num_topics"],
+            id2word=dictionary,
+            random_state=config["random_state"],
+            passes=config["passes"],
+            chunksize=chunksize,
+            alpha="auto",
+            eta="auto"
+        )
+    if trainer == "multicore":
+        return LdaMulticore(
+            doc_term_matrix,
+            num_topics=config["num_topics"],
+            id2word=dictionary,
+            workers=workers,
+            random_state=config["random_state"],
+            passes=config["passes"],
+            chunksize=chunksize,
+            alpha="symmetric",
+            eta="auto"
+        )
+    raise ValueError(f"Unknown LDA trainer: {trainer!r}")
+
+
+# Saved model for incremental updates (see lda_incremental.py)
+def save_model(directory, bigram_mod, dictionary, lda, num_docs):
+    os.makedirs(directory, exist_ok=True)
+    bigram_mod.save(os.path.join(directory, "phraser"))
+    dictionary.save(os.path.join(directory, "dictionary"))
+    lda.save(os.path.join(directory, "lda"))
+    # Written last: a directory with model.json holds a complete model
+    with open(os.path.join(directory, "model.json"), "w") as f:
+        json.dump({"num_docs": int(num_docs)}, f)
+
+
+def load_model(directory):
+    """Returns (bigram_mod, dictionary, lda, num_docs)"""
+    with open(os.path.join(directory, "model.json")) as f:
+        info = json.load(f)
+    return (
+        FrozenPhrases.load(os.path.join(directory, "phraser")),
+        corpora.Dictionary.load(os.path.join(directory, "dictionary")),
+        LdaModel.load(os.path.join(directory, "lda")),
+        info["num_docs"],
+    )
+
+
+# Cached pipeline
+def _save_gensim(name):
+    return lambda obj, directory: obj.save(os.path.join(directory, name))
+
+
+def _save_pickle(name):
+    def save(obj, directory):
+        with open(os.path.join(directory, name), "wb") as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return save
+
+
+def _load_pickle(name):
+    def load(directory):
+        with open(os.path.join(directory, name), "rb") as f:
+            return pickle.load(f)
+    return load
+
+
+def phraser_key(input_hash, config=DEFAULT_CONFIG):
+    return make_key("phraser", input_hash, config["min_count"], config["threshold"])
+
+
+def dictionary_key(input_hash, config=DEFAULT_CONFIG):
+    return make_key("dictionary", phraser_key(input_hash, config),
+                    config["no_below"], config["no_above"])
+
+
+def model_key(input_hash, config=DEFAULT_CONFIG, trainer="single",
+              workers=None, chunksize=2000):
+    return make_key(
+        "lda", dictionary_key(input_hash, config),
+        config["num_topics"], config["passes"], config["random_state"],
+        trainer, workers if trainer == "multicore" else None, chunksize,
+    )
+
+
+def build_cached_corpus(cache, input_hash, load_tokens, config=DEFAULT_CONFIG):
+    """
+    Phraser, dictionary and BOW corpus, reused from `cache` when the input
+    contents (input_hash) and the relevant hyperparameters match.
+    load_tokens() returns the tokenized corpus and is only called on a miss.
+    Returns (bigram_mod, dictionary, doc_term_matrix).
+    """
+    state = {}
+
+    def tokens():
+        if "tokens" not in state:
+            state["tokens"] = load_tokens()
+        return state["tokens"]
+
+    def bigram_docs():
+        if "bigram_docs" not in state:
+            state["bigram_docs"] = [bigram_mod[doc] for doc in tokens()]
+        return state["bigram_docs"]
+
+    bigram_mod = cache.get_or_build(
+        phraser_key(input_hash, config),
+        lambda: build_phraser(tokens(), config),
+        _save_gensim("phraser"),
+        lambda directory: FrozenPhrases.load(os.path.join(directory, "phraser")),
+    )
+
+    dict_key = dictionary_key(input_hash, config)
+    dictionary = cache.get_or_build(
+        dict_key,
+        lambda: build_dictionary(bigram_docs(), config),
+        _save_gensim("dictionary"),
+        lambda directory: corpora.Dictionary.load(os.path.join(directory, "dictionary")),
+    )
+
+    doc_term_matrix = cache.get_or_build(
+        make_key("bow", dict_key),
+        lambda: [dictionary.doc2bow(doc) for doc in bigram_docs()],
+        _save_pickle("bow.pkl"),
+        _load_pickle("bow.pkl"),
+    )
+    return bigram_mod, dictionary, doc_term_matrix
+
+
+def train_cached(cache, input_hash, doc_term_matrix, dictionary,
+                 config=DEFAULT_CONFIG, trainer="single", workers=None,
+                 chunksize=2000):
+    """LDA model for the cached corpus, trained only on a cache miss"""
+    return cache.get_or_build(
+        model_key(input_hash, config, trainer, workers, chunksize),
+        lambda: train_lda(doc_term_matrix, dictionary, config,
+                          trainer=trainer, workers=workers, chunksize=chunksize),
+        _save_gensim("lda"),
+        lambda directory: LdaModel.load(os.path.join(directory, "lda")),
+    )
+
+
+def build_cached(cache, input_hash, load_tokens, config=DEFAULT_CONFIG,
+                 trainer="single", workers=None, chunksize=2000):
+    """
+    Cached phraser, dictionary, BOW corpus and LDA model.
+    Returns (bigram_mod, dictionary, doc_term_matrix, lda).
+    """
+    bigram_mod, dictionary, doc_term_matrix = build_cached_corpus(
+        cache, input_hash, load_tokens, config
+    )
+    lda = train_cached(cache, input_hash, doc_term_matrix, dictionary, config,
+                       trainer, workers, chunksize)
+    return bigram_mod, dictionary, doc_term_matrix, lda
@@ -1,129 +1,229 @@
-from gensim import corpora
-from gensim.models import LdaModel
-from gensim.models.phrases import Phrases, Phraser
+from artifact_cache import ArtifactCache, hash_inputs, make_key
+from concentration import concentration_level, concentration_metrics
+from corpus_format import EncodedCorpus
+from table_io import read_table, write_table
+from lda_pipeline import (
+    DEFAULT_CONFIG, build_cached_corpus, build_corpus, model_key, save_model,
+    train_cached, train_lda
+)
+from step_timer import StepTimer, timed
+from topic_inference import infer_doc_topics, infer_doc_topics_per_doc
+import argparse
+import os
 import pandas as pd
 import numpy as np
 
-num_topics = 20
 cleaned_csv = "rq1_2_cleaned_reviews.csv"
 output_doc_topics = "rq2_doc_topic_distribution.csv"
 output_combined = "rq1_2_summary_concentration.csv"
 
-# Load cleaned text
-df_clean = pd.read_csv(cleaned_csv)
-
-# Tokenise text
-tokenized_corpus = [
-    text.split() for text in df_clean["clean_text"].fillna("").tolist()
-]
-
-# Train bigram model
-bigram = Phrases(tokenized_corpus, min_count=3, threshold=5)
-bigram_mod = Phraser(bigram)
-
-# Apply bigrams
-corpus_with_bigrams = [bigram_mod[doc] for doc in tokenized_corpus]
-
 
-# Build dictionary and document-term matrix
-dictionary = corpora.Dictionary(corpus_with_bigrams)
+def load_tokenized_corpus(corpus_dir=None, input_csv=cleaned_csv):
+    if corpus_dir:
+        # Load pre-tokenised corpus
+        return EncodedCorpus.load(corpus_dir).token_lists()
+
+    # Load cleaned text
+    df_clean = read_table(input_csv, columns=["clean_text"])
+
+    # Tokenise text
+    return [
+        text.split() for text in df_clean["clean_text"].fillna("").tolist()
+    ]
+
+
+def summarise_topics(lda, doc_topics):
+    """Combine topic summary and concentration"""
+    metrics = concentration_metrics(doc_topics)
+    total_reviews = len(doc_topics)
+    combined_data = []
+
+    for topic_id, row in metrics.iterrows():
+        keywords = ", ".join(
+            [w for w, _ in lda.show_topic(topic_id, topn=6)]
+        )
+        count = int(row["Num_of_Reviews"])
+        g = round(row["Gini"], 3)
+
+        combined_data.append({
+            "Topic_ID": topic_id,
+            "Keywords": keywords,
+            "Num_of_Reviews": count,
+            "Percentage": round(count / total_reviews * 100, 2),
+            "Avg_Probability": round(row["Avg_Probability"] * 100, 2),
+            "Gini": g,
+            "Entropy": round(row["Entropy"], 3),
+            "Concentration_Level": concentration_level(g)
+        })
 
-# Remove extreme terms
-dictionary.filter_extremes(no_below=5, no_above=0.5)
+    return (
+        pd.DataFrame(combined_data)
+        .sort_values("Num_of_Reviews", ascending=False)
+    )
 
-doc_term_matrix = [
-    dictionary.doc2bow(doc) for doc in corpus_with_bigrams
-]
 
-# Train LDA model
-lda = LdaModel(
-    doc_term_matrix,
-    num_topics=num_topics,
-    id2word=dictionary,
-    random_state=42,
-    passes=10,
-    alpha="auto",
-    eta="auto"
-)
+def infer_topics(lda, doc_term_matrix, args):
+    if args.inference == "batched":
+        return infer_doc_topics(lda, doc_term_matrix, args.inference_chunksize)
+    return infer_doc_topics_per_doc(lda, doc_term_matrix)
 
-# Per-document topic distribution
-all_doc_topics = []
-dominant_topics = []
 
-for idx, doc_bow in enumerate(doc_term_matrix):
-    topic_dist = sorted(
-        lda.get_document_topics(doc_bow, minimum_probability=0),
-        key=lambda x: x[0]
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input", default=cleaned_csv, help="cleaned reviews CSV")
+    parser.add_argument(
+        "--doc-topics", default=output_doc_topics,
+        help="output CSV of per-review topic percentages"
     )
-    topic_percent = [prob * 100 for _, prob in topic_dist]
-    all_doc_topics.append([idx] + topic_percent)
-    dominant_topics.append(
-        np.argmax([prob for _, prob in topic_dist])
+    parser.add_argument(
+        "--summary", default=output_combined,
+        help="output CSV of topic keywords and concentration"
     )
-
-columns = ["Review_Index"] + [
-    f"Topic_{i}_%" for i in range(num_topics)
-]
-
-df_doc_topics = pd.DataFrame(all_doc_topics, columns=columns)
-df_doc_topics.to_csv(output_doc_topics, index=False)
-
-
-# Concentration metrics
-def gini(probs):
-    probs = np.sort(probs)
-    cum = np.cumsum(probs)
-    return (
-        (len(probs) + 1 - 2 * np.sum(cum) / cum[-1]) / len(probs)
-        if cum[-1] > 0 else 0
+    parser.add_argument(
+        "--corpus", default=None,
+        help="integer-encoded corpus directory to read instead of the cleaned CSV"
     )
-
-
-def entropy(probs):
-    probs = probs[probs > 0]
-    return -np.sum(probs * np.log2(probs))
-
-
-topic_matrix = df_doc_topics.iloc[:, 1:].values / 100
-topic_counts = np.bincount(dominant_topics, minlength=num_topics)
-total_reviews = len(dominant_topics)
-
-# Combine topic summary and concentration
-combined_data = []
-
-for topic_id in range(num_topics):
-    probs = topic_matrix[:, topic_id]
-    keywords = ", ".join(
-        [w for w, _ in lda.show_topic(topic_id, topn=6)]
+    parser.add_argument(
+        "--num-topics", type=int, default=DEFAULT_CONFIG["num_topics"],
+        help="number of LDA topics (see lda_sweep.py for choosing it)"
     )
-    count = topic_counts[topic_id]
-    percent = round(count / total_reviews * 100, 2)
-    g = round(gini(probs), 3)
-    e = round(entropy(probs), 3)
-
-    if g > 0.8:
-        level = "Very High"
-    elif g > 0.6:
-        level = "High"
-    elif g > 0.4:
-        level = "Medium"
+    parser.add_argument(
+        "--passes", type=int, default=DEFAULT_CONFIG["passes"],
+        help="training passes over the corpus"
+    )
+    parser.add_argument(
+        "--trainer", choices=["single", "multicore"], default="single",
+        help="single-core LdaModel (alpha/eta auto) or LdaMulticore"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="multicore trainer: worker processes (default: cores - 1)"
+    )
+    parser.add_argument(
+        "--chunksize", type=int, default=2000,
+        help="documents per training chunk"
+    )
+    parser.add_argument(
+        "--inference", choices=["batched", "per-doc"], default="batched",
+        help="infer document topics in chunks, or one document at a time"
+    )
+    parser.add_argument(
+        "--inference-chunksize", type=int, default=2000,
+        help="documents per inference chunk in batched mode"
+    )
+    parser.add_argument(
+        "--save-matrix", default=None, metavar="FILE",
+        help="also save the float32 doc x topic matrix as .npy (see concentration.py)"
+    )
+    parser.add_argument(
+        "--save-model", default=None, metavar="DIR",
+        help="save the phraser, dictionary and model for lda_incremental.py"
+    )
+    parser.add_argument(
+        "--timings", default=None, metavar="FILE",
+        help="save each step's wall time and peak memory as JSON"
+    )
+    parser.add_argument(
+        "--cache-dir", default=".lda_cache",
+        help="artifact cache for the phraser, dictionary, corpus and model"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="always rebuild every artifact"
+    )
+    parser.add_argument(
+        "--cache-max-mb", type=float, default=None,
+        help="evict least recently used cache entries above this size"
+    )
+    parser.add_argument(
+        "--cache-max-age-days", type=float, default=None,
+        help="evict cache entries unused for this many days"
+    )
+    args = parser.parse_args()
+    config = dict(DEFAULT_CONFIG, num_topics=args.num_topics, passes=args.passes)
+    timer = StepTimer() if args.timings else None
+
+    if args.no_cache:
+        with timed(timer, "load"):
+            tokenized_corpus = load_tokenized_corpus(args.corpus, args.input)
+
+        # Bigrams, dictionary and document-term matrix
+        bigram_mod, _, dictionary, doc_term_matrix = build_corpus(
+            tokenized_corpus, config, timer
+        )
+
+        # Train LDA model
+        with timed(timer, "train"):
+            lda = train_lda(
+                doc_term_matrix, dictionary, config,
+                trainer=args.trainer,
+                workers=args.workers,
+                chunksize=args.chunksize,
+            )
+
+        # Per-document topic distribution (doc x topic matrix)
+        with timed(timer, "infer"):
+            doc_topics = infer_topics(lda, doc_term_matrix, args)
     else:
-        level = "Low"
-
-    combined_data.append({
-        "Topic_ID": topic_id,
-        "Keywords": keywords,
-        "Num_of_Reviews": count,
-        "Percentage": percent,
-        "Avg_Probability": round(np.mean(probs) * 100, 2),
-        "Gini": g,
-        "Entropy": e,
-        "Concentration_Level": level
-    })
-
-df_combined = (
-    pd.DataFrame(combined_data)
-    .sort_values("Num_of_Reviews", ascending=False)
-)
-
-df_combined.to_csv(output_combined, index=False)
+        cache = ArtifactCache(
+            args.cache_dir,
+            max_bytes=args.cache_max_mb * 2**20 if args.cache_max_mb else None,
+            max_age=args.cache_max_age_days * 86400 if args.cache_max_age_days else None,
+        )
+        input_hash = hash_inputs(args.corpus or args.input)
+
+        # Bigrams, dictionary and document-term matrix
+        # (loaded from the cache, or built from the tokens on a miss)
+        with timed(timer, "load"):
+            bigram_mod, dictionary, doc_term_matrix = build_cached_corpus(
+                cache, input_hash, lambda: load_tokenized_corpus(args.corpus, args.input), config
+            )
+
+        # LDA model
+        with timed(timer, "train"):
+            lda = train_cached(
+                cache, input_hash, doc_term_matrix, dictionary, config,
+                trainer=args.trainer,
+                workers=args.workers,
+                chunksize=args.chunksize,
+            )
+
+        # Per-document topic distribution (doc x topic matrix)
+        with timed(timer, "infer"):
+            doc_topics = cache.get_or_build(
+                make_key(
+                    "doc_topics",
+                    model_key(input_hash, config, args.trainer,
+                              args.workers, args.chunksize),
+                    args.inference,
+                    args.inference_chunksize if args.inference == "batched" else None,
+                ),
+                lambda: infer_topics(lda, doc_term_matrix, args),
+                lambda obj, directory: np.save(os.path.join(directory, "doc_topics.npy"), obj),
+                lambda directory: np.load(os.path.join(directory, "doc_topics.npy")),
+            )
+        cache.evict()
+        print(f"Artifact cache: {cache.hits} hits, {cache.misses} misses")
+
+    columns = [f"Topic_{i}_%" for i in range(args.num_topics)]
+
+    with timed(timer, "write"):
+        df_doc_topics = pd.DataFrame(doc_topics * 100, columns=columns)
+        df_doc_topics.insert(0, "Review_Index", np.arange(len(doc_topics)))
+        write_table(df_doc_topics, args.doc_topics)
+
+        if args.save_matrix:
+            np.save(args.save_matrix, doc_topics)
+
+        df_combined = summarise_topics(lda, doc_topics)
+        write_table(df_combined, args.summary)
+
+    if args.save_model:
+        save_model(args.save_model, bigram_mod, dictionary, lda, len(doc_topics))
+
+    if timer is not None:
+        timer.save(args.timings)
+
+
+if __name__ == "__main__":
+    main()
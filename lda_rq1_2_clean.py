@@ -1,48 +1,97 @@
 # Reference: https://www.datacamp.com/tutorial/what-is-topic-modeling
 
 from nltk.stem import WordNetLemmatizer
-from nltk.corpus import stopwords
-import pandas as pd
-import nltk
+from cleaning import add_engine_arguments, clean_reviews
+from corpus_format import corpus_dir_for
+from lemma_cache import DEFAULT_MAXSIZE, LemmaCache, cache_path_for
+from nltk_resources import ensure_nltk_data
+from stopword_config import DEFAULT_CONFIG, load_stopwords
+import argparse
 import re
 
-# NLTK resources
-nltk.download("stopwords")
-nltk.download("wordnet")
-nltk.download("omw-1.4")
+input_csv = "reviews/reviews.csv"
+output_csv = "rq1_2_cleaned_reviews.csv"
 
-# Load raw reviews
-df = pd.read_csv("reviews/reviews.csv")
+stop_words = None
+lemmatize = None
 
-# Merge title and content
-df["text"] = df["Review_Title"].fillna("") + " " + df["Review_Content"].fillna("")
 
-# Stopwords for RQ1 & RQ2
-stop_words = set(stopwords.words("english"))
-stop_words.update([
-    "like", "one", "really", "even", "good", "great", "best", "feel",
-    "movie", "film", "zootopia", "disney",
-    "also", "would", "make", "u", "it", "well", "get", "think", "say",
-    "character", "story", "animation", "animal", "time", "world", "see", "love"
-])
+# Stopwords and cached lemmatizer for RQ1 & RQ2 (loaded once per process)
+def load_resources(cache_size=DEFAULT_MAXSIZE, cache_path=None,
+                   stopword_config=DEFAULT_CONFIG):
+    global stop_words, lemmatize
+    stop_words = load_stopwords("rq1_2", stopword_config).words
+    lemmatize = LemmaCache(WordNetLemmatizer().lemmatize, cache_size)
+    if cache_path is not None:
+        lemmatize.load(cache_path)
 
-lemmatizer = WordNetLemmatizer()
+
+# Lemma cache entries and hit/miss counts since the last chunk
+def drain_lemma_cache():
+    return lemmatize.drain()
+
+
+# Remove stopwords and lemmatize
+def clean_words(words):
+    words = [lemmatize(w) for w in words if w not in stop_words]
+    return " ".join(words)
 
 
 # Clean text for topic modelling
 def clean_text(doc):
     doc = re.sub(r"[^a-zA-Z0-9\s]", "", doc)
     doc = doc.lower()
-    words = doc.split()
-    words = [lemmatizer.lemmatize(w) for w in words if w not in stop_words]
-    return " ".join(words)
+    return clean_words(doc.split())
+
+
+if __name__ == "__main__":
+    parser = add_engine_arguments(argparse.ArgumentParser())
+    parser.add_argument("--input", default=input_csv, help="raw reviews CSV")
+    parser.add_argument("--output", default=output_csv, help="cleaned reviews CSV")
+    parser.add_argument(
+        "--stopwords", default=DEFAULT_CONFIG,
+        help="stopword configuration file"
+    )
+    parser.add_argument(
+        "--lemma-cache-size", type=int, default=DEFAULT_MAXSIZE,
+        help="maximum number of cached token -> lemma entries"
+    )
+    parser.add_argument(
+        "--save-lemma-cache", action="store_true",
+        help="reload and save the lemma cache next to the cleaned output"
+    )
+    args = parser.parse_args()
+
+    cache_path = cache_path_for(args.output) if args.save_lemma_cache else None
+    lemma_store = LemmaCache(None, args.lemma_cache_size)
+    if cache_path is not None:
+        lemma_store.load(cache_path)
+    lookups = {"hits": 0, "misses": 0}
+
+    # Collect worker-side lemma cache entries and counters
+    def merge_lemma_cache(delta):
+        lemma_store.update(delta["entries"])
+        lookups["hits"] += delta["hits"]
+        lookups["misses"] += delta["misses"]
 
+    # NLTK resources
+    ensure_nltk_data("stopwords", "wordnet", "omw-1.4")
 
-# Build cleaned corpus
-df["clean_text"] = df["text"].dropna().apply(clean_text)
+    # Build and save cleaned corpus
+    total = clean_reviews(
+        args.input, args.output, clean_text,
+        initializer=load_resources,
+        initargs=(args.lemma_cache_size, cache_path, args.stopwords),
+        workers=args.workers,
+        chunksize=args.chunksize,
+        corpus_dir=corpus_dir_for(args.output) if args.corpus else None,
+        state_fn=drain_lemma_cache,
+        merge_state=merge_lemma_cache,
+    )
 
-# Save cleaned text
-df_clean = pd.DataFrame({"clean_text": df["clean_text"]})
-df_clean.to_csv("rq1_2_cleaned_reviews.csv", index=False)
+    print(f"Cleaned {total} reviews and saved to {args.output}")
+    print(f"Lemma cache: {lookups['hits']} hits, {lookups['misses']} misses")
 
-print(f"Cleaned {len(df)} reviews and saved to rq1_2_cleaned_reviews.csv")
+    if cache_path is not None:
+        lemma_store.save(cache_path)
+        print(f"Saved {len(lemma_store)} cached lemmas to {cache_path}")
@@ -0,0 +1,134 @@
+# Topic-count sweep for RQ1 & RQ2
+#
+# Trains one LDA model per K in parallel worker processes that share a single
+# prebuilt phraser / dictionary / BOW corpus, scores each model on coherence
+# and perplexity, and writes one comparison table. Trained models go into the
+# same artifact cache as lda_rq1_2.py, so the chosen K can then be run with
+# `python lda_rq1_2.py --num-topics K` without retraining.
+from artifact_cache import ArtifactCache, hash_inputs
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from gensim.models import CoherenceModel
+from lda_pipeline import DEFAULT_CONFIG, build_cached_corpus, train_cached
+from lda_rq1_2 import cleaned_csv, load_tokenized_corpus
+from table_io import write_table
+import argparse
+import os
+import time
+import numpy as np
+import pandas as pd
+
+output_sweep = "rq1_2_topic_sweep.csv"
+
+# Shared corpus, set once per worker process
+_shared = {}
+
+
+def _init_worker(cache_dir, input_hash, dictionary, doc_term_matrix, texts):
+    _shared.update(
+        cache=ArtifactCache(cache_dir),
+        input_hash=input_hash,
+        dictionary=dictionary,
+        doc_term_matrix=doc_term_matrix,
+        texts=texts,
+    )
+
+
+def evaluate_k(num_topics, passes):
+    """Train (or load) the model for one K and score it"""
+    config = dict(DEFAULT_CONFIG, num_topics=num_topics, passes=passes)
+    dictionary = _shared["dictionary"]
+    doc_term_matrix = _shared["doc_term_matrix"]
+
+    start = time.perf_counter()
+    lda = train_cached(_shared["cache"], _shared["input_hash"],
+                       doc_term_matrix, dictionary, config)
+    train_time = time.perf_counter() - start
+
+    c_v = CoherenceModel(model=lda, texts=_shared["texts"], dictionary=dictionary,
+                         coherence="c_v", processes=1).get_coherence()
+    u_mass = CoherenceModel(model=lda, corpus=doc_term_matrix, dictionary=dictionary,
+                            coherence="u_mass").get_coherence()
+    # Per-word likelihood bound on the training corpus
+    bound = lda.log_perplexity(doc_term_matrix)
+
+    return {
+        "Num_Topics": num_topics,
+        "Coherence_c_v": round(c_v, 4),
+        "Coherence_u_mass": round(u_mass, 4),
+        "Log_Perplexity": round(bound, 4),
+        "Perplexity": round(float(np.exp2(-bound)), 2),
+        "Train_Time_s": round(train_time, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input", default=cleaned_csv, help="cleaned reviews CSV")
+    parser.add_argument(
+        "--output", default=output_sweep,
+        help="output CSV of coherence and perplexity per topic count"
+    )
+    parser.add_argument(
+        "--corpus", default=None,
+        help="integer-encoded corpus directory to read instead of the cleaned CSV"
+    )
+    parser.add_argument(
+        "--k", type=int, nargs="+", default=None,
+        help="topic counts to compare, e.g. --k 10 20 30"
+    )
+    parser.add_argument(
+        "--range", type=int, nargs=3, metavar=("START", "STOP", "STEP"),
+        default=[5, 40, 5],
+        help="inclusive range of topic counts (used when --k is not given)"
+    )
+    parser.add_argument(
+        "--passes", type=int, default=DEFAULT_CONFIG["passes"],
+        help="training passes per model"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count(),
+        help="models trained in parallel"
+    )
+    parser.add_argument(
+        "--cache-dir", default=".lda_cache",
+        help="artifact cache shared with lda_rq1_2.py"
+    )
+    args = parser.parse_args()
+
+    start, stop, step = args.range
+    ks = sorted(set(args.k or range(start, stop + 1, step)))
+
+    # Build (or load) the shared dictionary and corpus once
+    cache = ArtifactCache(args.cache_dir)
+    input_hash = hash_inputs(args.corpus or args.input)
+    tokenized_corpus = load_tokenized_corpus(args.corpus, args.input)
+    bigram_mod, dictionary, doc_term_matrix = build_cached_corpus(
+        cache, input_hash, lambda: tokenized_corpus
+    )
+    texts = [bigram_mod[doc] for doc in tokenized_corpus]
+
+    rows = []
+    sweep_start = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=min(args.workers, len(ks)),
+        initializer=_init_worker,
+        initargs=(args.cache_dir, input_hash, dictionary, doc_term_matrix, texts),
+    ) as pool:
+        # Largest K first: the slowest models start straight away
+        futures = [pool.submit(evaluate_k, k, args.passes) for k in reversed(ks)]
+        for future in as_completed(futures):
+            row = future.result()
+            print(f"K={row['Num_Topics']}: c_v={row['Coherence_c_v']}, "
+                  f"perplexity={row['Perplexity']} ({row['Train_Time_s']}s)")
+            rows.append(row)
+
+    df_sweep = pd.DataFrame(rows).sort_values("Num_Topics")
+    write_table(df_sweep, args.output)
+
+    best = df_sweep.loc[df_sweep["Coherence_c_v"].idxmax(), "Num_Topics"]
+    print(f"\nSwept {len(ks)} topic counts in {time.perf_counter() - sweep_start:.1f}s")
+    print(f"Highest c_v coherence: K={best} (saved to {args.output})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# Memoized token -> lemma cache shared by the cleaners
+#
+# Review vocabularies are Zipfian, so most lemmatize() calls repeat a small
+# set of words. LemmaCache wraps any lemmatize function with a bounded LRU
+# and can be saved to / reloaded from a JSON file between runs.
+from collections import OrderedDict
+import json
+import os
+
+DEFAULT_MAXSIZE = 200000
+
+
+def cache_path_for(output_csv, name="lemma_cache.json"):
+    """Cache file kept next to a cleaned output, e.g. rq1_2_lemma_cache.json"""
+    stem = os.path.splitext(os.path.basename(output_csv))[0]
+    prefix = stem.replace("cleaned_reviews", "").rstrip("_")
+    filename = f"{prefix}_{name}" if prefix else name
+    return os.path.join(os.path.dirname(output_csv), filename)
+
+
+class LemmaCache:
+    """Bounded LRU cache in front of a lemmatize function"""
+
+    def __init__(self, lemmatize, maxsize=DEFAULT_MAXSIZE):
+        self.lemmatize = lemmatize
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Entries and counters not yet handed out by drain()
+        self._new = {}
+        self._drained_hits = 0
+        self._drained_misses = 0
+
+    def __call__(self, word):
+        entries = self.entries
+        lemma = entries.get(word)
+        if lemma is not None:
+            entries.move_to_end(word)
+            self.hits += 1
+            return lemma
+
+        self.misses += 1
+        lemma = self.lemmatize(word)
+        self._store(word, lemma)
+        self._new[word] = lemma
+        return lemma
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _store(self, word, lemma):
+        entries = self.entries
+        entries[word] = lemma
+        entries.move_to_end(word)
+        if self.maxsize is not None and len(entries) > self.maxsize:
+            entries.popitem(last=False)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def update(self, new_entries):
+        """Add entries (e.g. from a worker process) without counting lookups"""
+        for word, lemma in new_entries.items():
+            self._store(word, lemma)
+
+    def drain(self):
+        """Return entries and hit/miss counts added since the last drain"""
+        delta = {
+            "entries": self._new,
+            "hits": self.hits - self._drained_hits,
+            "misses": self.misses - self._drained_misses,
+        }
+        self._new = {}
+        self._drained_hits = self.hits
+        self._drained_misses = self.misses
+        return delta
+
+    def load(self, path):
+        """Load a saved cache if it exists, returning the number of entries"""
+        if not os.path.exists(path):
+            return 0
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+        self.update(dict(saved["entries"]))
+        return len(saved["entries"])
+
+    def save(self, path):
+        """Save entries in LRU order (least recently used first)"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"maxsize": self.maxsize, "entries": list(self.entries.items())},
+                f,
+                ensure_ascii=False,
+            )
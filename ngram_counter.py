@@ -0,0 +1,116 @@
+# Streaming n-gram counters for rq3_ngram_analysis.py
+#
+# Counts are updated one review at a time, so memory holds the distinct
+# n-grams (exact mode) or a fixed number of counters (sketch mode) instead of
+# every n-gram occurrence in the corpus.
+from collections import Counter
+from heapq import heapify, heappop, heappush
+
+
+# Custom n-gram generator
+def generate_N_grams(tokens, ngram=1):
+    if ngram == 1:
+        return tokens
+    return zip(*[tokens[i:] for i in range(ngram)])
+
+
+class ExactNGramCounter:
+    """Exact n-gram frequencies, updated per review"""
+
+    def __init__(self, n):
+        self.n = n
+        self.counts = Counter()
+        self.total = 0
+
+    def update(self, tokens):
+        self.counts.update(generate_N_grams(tokens, self.n))
+        self.total += max(len(tokens) - self.n + 1, 0)
+
+    def most_common(self, k):
+        """[(ngram, count, error)] with error always 0"""
+        return [(gram, count, 0) for gram, count in self.counts.most_common(k)]
+
+
+class SpaceSavingCounter:
+    """
+    Approximate top-k n-grams with a fixed number of counters (Space-Saving,
+    Metwally et al. 2005).
+
+    Each reported count overestimates the true frequency by at most its
+    error, and every n-gram occurring more than total / capacity times is
+    guaranteed to be tracked.
+    """
+
+    def __init__(self, n, capacity=100000):
+        self.n = n
+        self.capacity = capacity
+        self.total = 0
+        # ngram -> [count, error]
+        self.entries = {}
+        # Min-heap of (count, seq, ngram); stale entries are skipped lazily
+        self._heap = []
+        self._seq = 0
+
+    def _push(self, gram, count):
+        self._seq += 1
+        heappush(self._heap, (count, self._seq, gram))
+
+    def _pop_min(self):
+        entries = self.entries
+        while True:
+            count, _, gram = heappop(self._heap)
+            entry = entries.get(gram)
+            if entry is not None and entry[0] == count:
+                return gram, count
+
+    def _compact(self):
+        # Drop stale heap entries once they outnumber live ones
+        self._heap = [
+            (count, seq, gram)
+            for seq, (gram, (count, _)) in enumerate(self.entries.items())
+        ]
+        self._seq = len(self._heap)
+        heapify(self._heap)
+
+    def update(self, tokens):
+        entries = self.entries
+        local = Counter(generate_N_grams(tokens, self.n))
+        for gram, weight in local.items():
+            self.total += weight
+            entry = entries.get(gram)
+            if entry is not None:
+                entry[0] += weight
+            elif len(entries) < self.capacity:
+                entry = entries[gram] = [weight, 0]
+            else:
+                # Replace the smallest counter, inheriting its count as error
+                evicted, min_count = self._pop_min()
+                del entries[evicted]
+                entry = entries[gram] = [min_count + weight, min_count]
+            self._push(gram, entry[0])
+
+        if len(self._heap) > 4 * self.capacity:
+            self._compact()
+
+    def most_common(self, k):
+        """[(ngram, estimated count, max overestimate)]"""
+        ranked = sorted(self.entries.items(), key=lambda item: -item[1][0])
+        return [(gram, count, error) for gram, (count, error) in ranked[:k]]
+
+    def guaranteed_top(self, k):
+        """Number of leading most_common(k) entries whose rank is certain"""
+        ranked = sorted((count for count, _ in self.entries.values()), reverse=True)
+        top = self.most_common(k)
+        for i, (_, count, error) in enumerate(top):
+            next_count = ranked[i + 1] if i + 1 < len(ranked) else 0
+            if count - error < next_count:
+                return i
+        return len(top)
+
+
+def make_counter(n, mode="exact", capacity=100000):
+    if mode == "exact":
+        return ExactNGramCounter(n)
+    if mode == "sketch":
+        return SpaceSavingCounter(n, capacity)
+    raise ValueError(f"Unknown counting mode: {mode!r}")
@@ -0,0 +1,172 @@
+# Sparse document x n-gram count matrices for RQ3
+#
+# Tokens are integer-encoded once; n-grams of each order become integer codes
+# over the token ids, so counting is a handful of numpy operations instead of
+# per-review zip slicing. Rows are reviews and columns are n-grams, so
+# column sums give corpus frequencies and row subsets give per-group
+# frequencies (e.g. positive vs negative reviews) without another pass.
+import re
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+_RATING = re.compile(r"(\d+)\s*/\s*10")
+
+
+def encode_tokens(token_lists):
+    """
+    Integer-encode a corpus. Returns (ids, offsets, vocab) where ids is a
+    flat array of token ids, document d spans ids[offsets[d]:offsets[d + 1]],
+    and ids are numbered in order of first occurrence.
+    """
+    lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64,
+                          count=len(token_lists))
+    offsets = np.zeros(len(token_lists) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+
+    flat = [token for tokens in token_lists for token in tokens]
+    ids, vocab = pd.factorize(pd.Series(flat, dtype=object), sort=False)
+    return ids.astype(np.int64), offsets, np.asarray(vocab, dtype=object)
+
+
+class NGramMatrix:
+    """Document x n-gram count matrix for one n-gram order"""
+
+    def __init__(self, n, matrix, gram_ids, vocab):
+        self.n = n
+        self.matrix = matrix
+        # Token ids making up each column, shape (n_features, n)
+        self.gram_ids = gram_ids
+        self.vocab = vocab
+
+    def labels(self, columns):
+        return [" ".join(self.vocab[self.gram_ids[c]]) for c in columns]
+
+    def frequencies(self, rows=None):
+        """Column sums, optionally over a subset of documents"""
+        matrix = self.matrix if rows is None else self.matrix[rows]
+        return np.asarray(matrix.sum(axis=0)).ravel()
+
+    def most_common(self, k, rows=None):
+        """[(ngram, count)] ordered like collections.Counter.most_common"""
+        freq = self.frequencies(rows)
+        # Columns are in first-occurrence order, so a stable sort breaks ties
+        # the same way Counter does
+        top = np.argsort(-freq, kind="stable")[:k]
+        top = top[freq[top] > 0]
+        return list(zip(self.labels(top), freq[top].tolist()))
+
+
+def build_ngram_matrix(ids, offsets, vocab, n, n_features=None):
+    """
+    Count n-grams of order n per document. Features are indexed by n-gram
+    (in first-occurrence order), or hashed into n_features columns if given.
+    """
+    n_docs = len(offsets) - 1
+    doc_of_token = np.repeat(np.arange(n_docs), np.diff(offsets))
+
+    # n-gram starting positions that stay inside one document
+    starts = np.arange(max(len(ids) - n + 1, 0))
+    if n > 1:
+        starts = starts[doc_of_token[starts] == doc_of_token[starts + n - 1]]
+
+    grams = np.stack([ids[starts + i] for i in range(n)], axis=1)
+    if n_features is not None or float(max(len(vocab), 1)) ** n < 2.0 ** 64:
+        # One integer code per n-gram (wraps around only in hashed mode)
+        codes = np.zeros(len(starts), dtype=np.uint64)
+        base = np.uint64(max(len(vocab), 1))
+        for i in range(n):
+            codes = codes * base + grams[:, i].astype(np.uint64)
+    else:
+        codes = grams
+
+    if n_features is not None:
+        # Multiplicative (Fibonacci) mixing before bucketing
+        mixed = codes * np.uint64(0x9E3779B97F4A7C15)
+        columns = ((mixed >> np.uint64(16)) % np.uint64(n_features)).astype(np.int64)
+        # Representative n-gram per bucket: its first occurrence
+        buckets, first = np.unique(columns, return_index=True)
+        gram_ids = np.zeros((n_features, n), dtype=grams.dtype)
+        gram_ids[buckets] = grams[first]
+    else:
+        uniq, first, inverse = np.unique(
+            codes, return_index=True, return_inverse=True, axis=0
+        )
+        # Renumber columns by first occurrence
+        order = np.argsort(first, kind="stable")
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        columns = rank[inverse.ravel()]
+        gram_ids = grams[first[order]]
+        n_features = len(uniq)
+
+    matrix = sparse.csr_matrix(
+        (np.ones(len(columns), dtype=np.int32), (doc_of_token[starts], columns)),
+        shape=(n_docs, n_features),
+    )
+    matrix.sum_duplicates()
+    return NGramMatrix(n, matrix, gram_ids, vocab)
+
+
+def build_ngram_matrices(token_lists, orders=(1, 2, 3), n_features=None):
+    ids, offsets, vocab = encode_tokens(token_lists)
+    return {
+        n: build_ngram_matrix(ids, offsets, vocab, n, n_features)
+        for n in orders
+    }
+
+
+def parse_ratings(ratings):
+    """'8/10' -> 8.0, anything else (e.g. 'No rating') -> NaN"""
+    values = []
+    for rating in ratings:
+        match = _RATING.search(str(rating))
+        values.append(float(match.group(1)) if match else np.nan)
+    return np.array(values)
+
+
+def align_ratings(raw, keys=None):
+    """
+    Ratings (see parse_ratings) of the cleaned reviews, one per document.
+    raw is the raw reviews table. If keys holds the cleaned table's
+    Review_Index / movie_id columns, ratings are matched on them; otherwise
+    the documents are taken to be raw's rated reviews in order, as
+    rq3_clean.py writes them.
+    """
+    on = [] if keys is None else list(keys.columns)
+    if on and all(col in raw.columns for col in on):
+        if raw.duplicated(subset=on).any():
+            raise ValueError(f"{', '.join(on)} do not identify raw reviews uniquely")
+        matched = keys.merge(raw[on + ["Rating"]], on=on, how="left")
+        return parse_ratings(matched["Rating"])
+
+    rated = raw.dropna(subset=["Rating"])
+    if keys is not None and len(rated) != len(keys):
+        raise ValueError(
+            f"{len(rated)} rated reviews do not line up with "
+            f"{len(keys)} cleaned reviews"
+        )
+    return parse_ratings(rated["Rating"])
+
+
+def rating_split(ngram_matrix, ratings, k=100, positive_min=7, negative_max=4):
+    """Top-k n-grams of positive and negative reviews side by side"""
+    positive = np.flatnonzero(ratings >= positive_min)
+    negative = np.flatnonzero(ratings <= negative_max)
+    pos_freq = ngram_matrix.frequencies(positive)
+    neg_freq = ngram_matrix.frequencies(negative)
+
+    # Union of each group's top-k, ranked by overall frequency
+    top = np.union1d(
+        np.argsort(-pos_freq, kind="stable")[:k],
+        np.argsort(-neg_freq, kind="stable")[:k],
+    )
+    top = top[np.argsort(-(pos_freq[top] + neg_freq[top]), kind="stable")]
+
+    return pd.DataFrame({
+        "NGram": ngram_matrix.labels(top),
+        "Positive_Frequency": pos_freq[top],
+        "Negative_Frequency": neg_freq[top],
+        "Positive_Per_Review": np.round(pos_freq[top] / max(len(positive), 1), 4),
+        "Negative_Per_Review": np.round(neg_freq[top] / max(len(negative), 1), 4),
+    })
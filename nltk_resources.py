@@ -0,0 +1,37 @@
+# NLTK data used by the cleaners, downloaded only when it is not installed
+#
+# nltk.download contacts the NLTK index even for packages that are already
+# installed, so every cleaner run needed the network. Installed packages are
+# now found with nltk.data.find first. With NLTK_OFFLINE set (as the
+# benchmarks do) a missing package is an error instead of a download.
+import os
+import nltk
+
+# Package id -> resource path looked up with nltk.data.find
+RESOURCES = {
+    "stopwords": "corpora/stopwords",
+    "wordnet": "corpora/wordnet",
+    "omw-1.4": "corpora/omw-1.4",
+}
+
+
+def missing_nltk_data(*packages):
+    """Packages that nltk.data.find cannot locate"""
+    missing = []
+    for package in packages:
+        try:
+            nltk.data.find(RESOURCES.get(package, package))
+        except LookupError:
+            missing.append(package)
+    return missing
+
+
+def ensure_nltk_data(*packages):
+    """Download the packages that are not installed yet"""
+    for package in missing_nltk_data(*packages):
+        if os.environ.get("NLTK_OFFLINE"):
+            raise LookupError(
+                f"NLTK package {package!r} is not installed and NLTK_OFFLINE is set; "
+                f"run nltk.download({package!r}) once with network access"
+            )
+        nltk.download(package)
@@ -0,0 +1,305 @@
+# Single entry point for the whole analysis
+#
+# Each stage runs one of the scripts with explicit paths. Stages are linked
+# through their declared inputs and outputs:
+#
+#   data/raw/reviews.csv -> rq1_2_clean -> rq1_2_lda -> rq2
+#                        -> rq3_clean   -> rq3_ngrams
+#
+# With --shared-clean a single "clean" stage (clean_all.py) replaces the two
+# cleaning stages.
+#
+# A stage is skipped when all of its outputs exist, are newer than its inputs
+# (data, config and the code that produces them) and were built with the same
+# command line. Stages whose dependencies have finished run concurrently, so
+# the RQ1/2 and RQ3 branches run side by side.
+#
+# Usage: python pipeline.py [--raw data/raw/reviews.csv] [--force] [stage ...]
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = ".pipeline_state.json"
+
+
+@dataclass
+class Stage:
+    name: str
+    script: str
+    args: list
+    inputs: list
+    outputs: list
+    # Local modules the script imports, besides the script itself
+    code: list = field(default_factory=list)
+
+    def command(self):
+        return [sys.executable, os.path.join(ROOT, self.script), *self.args]
+
+    def code_paths(self):
+        return [os.path.join(ROOT, path) for path in [self.script, *self.code]]
+
+
+def build_stages(args):
+    raw = args.raw
+    lda_dir = os.path.join(args.data_dir, "rq1_rq2_lda")
+    rq3_dir = os.path.join(args.data_dir, "rq3")
+    # Intermediate tables use --format; summaries stay CSV
+    rq1_2_cleaned = os.path.join(lda_dir, f"rq1_2_cleaned_reviews.{args.format}")
+    doc_topics = os.path.join(lda_dir, f"rq2_doc_topic_distribution.{args.format}")
+    summary = os.path.join(lda_dir, "rq1_2_summary_concentration.csv")
+    thresholds = os.path.join(lda_dir, "rq2_threshold_summary.csv")
+    rq3_cleaned = os.path.join(rq3_dir, f"rq3_cleaned_reviews.{args.format}")
+    engine = ["--workers", str(args.workers)]
+    cleaning_code = ["cleaning.py", "corpus_format.py", "nltk_resources.py",
+                     "stopword_config.py"]
+
+    if args.shared_clean:
+        # One pass over the raw reviews for both branches
+        cleaners = [
+            Stage(
+                "clean", "clean_all.py",
+                ["--input", raw, "--rq1-2-output", rq1_2_cleaned,
+                 "--rq3-output", rq3_cleaned, "--stopwords", args.stopwords,
+                 *engine],
+                inputs=[raw, args.stopwords],
+                outputs=[rq1_2_cleaned, rq3_cleaned],
+                code=cleaning_code + ["lemma_cache.py", "tokenizer.py",
+                                      "lda_rq1_2_clean.py", "rq3_clean.py"],
+            ),
+        ]
+    else:
+        cleaners = [
+            Stage(
+                "rq1_2_clean", "lda_rq1_2_clean.py",
+                ["--input", raw, "--output", rq1_2_cleaned,
+                 "--stopwords", args.stopwords, *engine],
+                inputs=[raw, args.stopwords],
+                outputs=[rq1_2_cleaned],
+                code=cleaning_code + ["lemma_cache.py"],
+            ),
+            Stage(
+                "rq3_clean", "rq3_clean.py",
+                ["--input", raw, "--output", rq3_cleaned,
+                 "--stopwords", args.stopwords, *engine],
+                inputs=[raw, args.stopwords],
+                outputs=[rq3_cleaned],
+                code=cleaning_code + ["tokenizer.py"],
+            ),
+        ]
+
+    return cleaners + [
+        Stage(
+            "rq1_2_lda", "lda_rq1_2.py",
+            ["--input", rq1_2_cleaned, "--doc-topics", doc_topics,
+             "--summary", summary, "--num-topics", str(args.num_topics)],
+            inputs=[rq1_2_cleaned],
+            outputs=[doc_topics, summary],
+            code=["artifact_cache.py", "concentration.py", "corpus_format.py",
+                  "lda_pipeline.py", "step_timer.py", "topic_inference.py"],
+        ),
+        Stage(
+            "rq2", "rq2.py",
+            ["--input", doc_topics, "--output", thresholds],
+            inputs=[doc_topics],
+            outputs=[thresholds],
+        ),
+        Stage(
+            "rq3_ngrams", "rq3_ngram_analysis.py",
+            ["--input", rq3_cleaned, "--output-dir", rq3_dir],
+            inputs=[rq3_cleaned],
+            outputs=[os.path.join(rq3_dir, f"rq3_{n}_results.csv")
+                     for n in ("unigram", "bigram", "trigram")],
+            code=["corpus_format.py", "ngram_counter.py", "ngram_matrix.py",
+                  "tokenizer.py"],
+        ),
+    ]
+
+
+def dependencies(stages):
+    """{stage name: names of the stages producing its inputs}"""
+    producers = {path: stage.name for stage in stages for path in stage.outputs}
+    return {
+        stage.name: {producers[path] for path in stage.inputs if path in producers}
+        for stage in stages
+    }
+
+
+def select(stages, deps, targets):
+    """Targets plus everything upstream of them, in declaration order"""
+    if not targets:
+        return stages
+    names = {stage.name for stage in stages}
+    unknown = set(targets) - names
+    if unknown:
+        raise SystemExit(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+    wanted = set()
+    todo = list(targets)
+    while todo:
+        name = todo.pop()
+        if name not in wanted:
+            wanted.add(name)
+            todo.extend(deps[name])
+    return [stage for stage in stages if stage.name in wanted]
+
+
+def is_fresh(stage, state):
+    """Outputs exist, are newer than inputs and code, and match the command"""
+    if state.get(stage.name) != stage.command()[1:]:
+        return False
+    try:
+        oldest_output = min(os.path.getmtime(path) for path in stage.outputs)
+        newest_input = max(
+            os.path.getmtime(path) for path in stage.inputs + stage.code_paths()
+        )
+    except OSError:
+        return False
+    return oldest_output >= newest_input
+
+
+def run_stage(stage):
+    for path in stage.outputs:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    start = time.perf_counter()
+    result = subprocess.run(stage.command(), capture_output=True, text=True)
+    return result, time.perf_counter() - start
+
+
+def load_state(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(path, state):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+def run(stages, deps, state, state_path, force=False, dry_run=False, jobs=2):
+    """Run stages as their dependencies finish; returns names of failed stages"""
+    pending = {stage.name: stage for stage in stages}
+    failed = set()
+    # Stages run (or due to run) in this invocation; their dependants rerun too
+    rebuilt = set()
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                upstream = deps[name] & set(pending.keys() | running.values())
+                if upstream:
+                    continue
+                del pending[name]
+                if deps[name] & failed:
+                    print(f"[{name}] not run: upstream stage failed")
+                    failed.add(name)
+                elif not (force or deps[name] & rebuilt) and is_fresh(stage, state):
+                    print(f"[{name}] up to date")
+                elif dry_run:
+                    print(f"[{name}] would run: {' '.join(stage.command()[1:])}")
+                    rebuilt.add(name)
+                else:
+                    print(f"[{name}] running")
+                    rebuilt.add(name)
+                    running[pool.submit(run_stage, stage)] = name
+
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                stage = next(s for s in stages if s.name == name)
+                result, elapsed = future.result()
+                output = (result.stdout + result.stderr).strip()
+                if output:
+                    print("\n".join(f"[{name}] {line}" for line in output.splitlines()))
+                missing = [path for path in stage.outputs if not os.path.exists(path)]
+                if result.returncode != 0 or missing:
+                    print(f"[{name}] failed after {elapsed:.1f}s")
+                    state.pop(name, None)
+                    failed.add(name)
+                else:
+                    print(f"[{name}] done in {elapsed:.1f}s")
+                    state[name] = stage.command()[1:]
+                save_state(state_path, state)
+
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "stages", nargs="*",
+        help="stages to bring up to date, with their upstream stages (default: all)"
+    )
+    parser.add_argument(
+        "--raw", default=os.path.join("data", "raw", "reviews.csv"),
+        help="raw reviews table written by the scraper (.csv, .parquet or .feather)"
+    )
+    parser.add_argument(
+        "--data-dir", default="data",
+        help="root of the rq1_rq2_lda/ and rq3/ output directories"
+    )
+    parser.add_argument(
+        "--format", choices=["csv", "parquet", "feather"], default="csv",
+        help="file format of the cleaned reviews and doc x topic tables"
+    )
+    parser.add_argument(
+        "--stopwords", default=os.path.join(ROOT, "stopwords.json"),
+        help="stopword configuration file"
+    )
+    parser.add_argument(
+        "--num-topics", type=int, default=20,
+        help="number of LDA topics"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="worker processes for each cleaning stage"
+    )
+    parser.add_argument(
+        "--shared-clean", action="store_true",
+        help="clean for both branches in one pass with clean_all.py"
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=2,
+        help="stages run at the same time"
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="rerun stages even if their outputs are up to date"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="only report which stages would run"
+    )
+    args = parser.parse_args()
+
+    stages = build_stages(args)
+    deps = dependencies(stages)
+    stages = select(stages, deps, args.stages)
+
+    if not os.path.exists(args.raw):
+        raise SystemExit(f"{args.raw} not found: run the scraper or pass --raw")
+
+    state_path = os.path.join(args.data_dir, STATE_FILE)
+    state = load_state(state_path)
+
+    start = time.perf_counter()
+    failed = run(stages, deps, state, state_path,
+                 force=args.force, dry_run=args.dry_run, jobs=args.jobs)
+    print(f"Pipeline finished in {time.perf_counter() - start:.1f}s")
+    if failed:
+        raise SystemExit(f"Failed: {', '.join(sorted(failed))}")
+
+
+if __name__ == "__main__":
+    main()
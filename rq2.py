@@ -1,38 +1,67 @@
+import argparse
+import numpy as np
 import pandas as pd
+from table_io import read_table, write_table
 
 # Input file
 input_csv = "rq2_doc_topic_distribution.csv"
 
-# Load topic distribution data
-df = pd.read_csv(input_csv)
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    "--input", default=input_csv,
+    help="doc x topic distribution CSV written by lda_rq1_2.py"
+)
+parser.add_argument(
+    "--thresholds", type=float, nargs="+", default=[80.0],
+    help="dominant-topic thresholds in percent, e.g. 50 60 70 80 90"
+)
+parser.add_argument(
+    "--output", default=None,
+    help="optional CSV for the single/multi-topic split at each threshold"
+)
+args = parser.parse_args()
 
-# Threshold for dominant topic
-threshold = 80.0
+# Load topic percentage columns only
+df = read_table(args.input, columns=lambda col: col.startswith("Topic_"))
+topic_matrix = df.to_numpy(dtype=np.float64)
 
-# Counters
-single_topic_count = 0
-multi_topic_count = 0
+# Largest topic share per review (ignoring NaN), compared with every
+# threshold at once
+thresholds = np.asarray(args.thresholds, dtype=np.float64)
+if topic_matrix.shape[1]:
+    max_share = np.fmax.reduce(topic_matrix, axis=1)
+else:
+    max_share = np.zeros(len(df))
+single_counts = (max_share[:, None] >= thresholds[None, :]).sum(axis=0)
 
-for idx, row in df.iterrows():
-    # Topic percentage columns
-    topic_cols = [col for col in df.columns if col.startswith("Topic_")]
-    percentages = row[topic_cols].values
+total_reviews = len(df)
+rows = []
 
-    # Check dominant topic
-    if any(p >= threshold for p in percentages):
-        single_topic_count += 1
-    else:
-        multi_topic_count += 1
+for threshold, single_topic_count in zip(thresholds, single_counts):
+    single_topic_count = int(single_topic_count)
+    multi_topic_count = total_reviews - single_topic_count
+    single_topic_ratio = single_topic_count / total_reviews * 100
+    multi_topic_ratio = multi_topic_count / total_reviews * 100
 
-total_reviews = len(df)
-single_topic_ratio = single_topic_count / total_reviews * 100
-multi_topic_ratio = multi_topic_count / total_reviews * 100
+    if len(thresholds) > 1:
+        print(f"\n=== Threshold: {threshold:g}% ===")
+    print(f"Total reviews: {total_reviews}")
+    print(f"Single-topic reviews: {single_topic_count} ({single_topic_ratio:.2f}%)")
+    print(f"Multi-topic reviews: {multi_topic_count} ({multi_topic_ratio:.2f}%)")
 
-print(f"Total reviews: {total_reviews}")
-print(f"Single-topic reviews: {single_topic_count} ({single_topic_ratio:.2f}%)")
-print(f"Multi-topic reviews: {multi_topic_count} ({multi_topic_ratio:.2f}%)")
+    if single_topic_count > multi_topic_count:
+        print("\nConclusion: Reviews mainly focus on a single topic")
+    else:
+        print("\nConclusion: Reviews mainly cover multiple topics")
 
-if single_topic_count > multi_topic_count:
-    print("\nConclusion: Reviews mainly focus on a single topic")
-else:
-    print("\nConclusion: Reviews mainly cover multiple topics")
+    rows.append({
+        "Threshold": threshold,
+        "Total_Reviews": total_reviews,
+        "Single_Topic_Reviews": single_topic_count,
+        "Single_Topic_%": round(single_topic_ratio, 2),
+        "Multi_Topic_Reviews": multi_topic_count,
+        "Multi_Topic_%": round(multi_topic_ratio, 2),
+    })
+
+if args.output:
+    write_table(pd.DataFrame(rows), args.output)
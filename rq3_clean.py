@@ -1,47 +1,54 @@
 # Reference: https://www.analyticsvidhya.com/blog/2018/02/the-different-methods-deal-text-data-predictive-python/
-import pandas as pd
-import re
-import nltk
-from nltk.corpus import stopwords
-
-# Tokenizer and stopwords
-nltk.download("punkt")
-nltk.download("stopwords")
+from cleaning import add_engine_arguments, clean_reviews
+from corpus_format import corpus_dir_for
+from nltk_resources import ensure_nltk_data
+from stopword_config import DEFAULT_CONFIG, load_stopwords
+from tokenizer import tokenize
+import argparse
 
 input_csv = "reviews.csv"
 output_csv = "rq3_cleaned_reviews.csv"
 
+stop_words = None
 
-# Clean text for RQ3 (retain negation and evaluative words)
-def clean_text(text):
-    text = text.lower()
-    text = re.sub(r"[^\w\s]", " ", text)
-    tokens = nltk.word_tokenize(text)
 
-    stop_words = set(stopwords.words("english"))
-    negations = {"not", "no", "nor"}
-    stop_words = stop_words - negations
+# Stopwords for RQ3, negations kept (loaded once per process)
+def load_resources(stopword_config=DEFAULT_CONFIG):
+    global stop_words
+    stop_words = load_stopwords("rq3", stopword_config).words
 
+
+# Remove stopwords (negations are kept) and single characters
+def clean_tokens(tokens):
     tokens = [t for t in tokens if t not in stop_words and len(t) > 1]
     return " ".join(tokens)
 
 
-# Load raw review data
-df = pd.read_csv(input_csv)
-
-# Remove rows without rating
-df = df.dropna(subset=["Rating"])
-
-# Merge title and content
-df["merged_text"] = (
-    df["Review_Title"].fillna("") + " " + df["Review_Content"].fillna("")
-)
-
-# Apply RQ3-specific cleaning
-df["clean_text"] = df["merged_text"].apply(clean_text)
-
-# Keep required fields only
-output_df = df[["clean_text"]]
-
-# Save cleaned data
-output_df.to_csv(output_csv, index=False, encoding="utf-8")
+# Clean text for RQ3 (retain negation and evaluative words)
+def clean_text(text):
+    return clean_tokens(tokenize(text))
+
+
+if __name__ == "__main__":
+    parser = add_engine_arguments(argparse.ArgumentParser())
+    parser.add_argument("--input", default=input_csv, help="raw reviews CSV")
+    parser.add_argument("--output", default=output_csv, help="cleaned reviews CSV")
+    parser.add_argument(
+        "--stopwords", default=DEFAULT_CONFIG,
+        help="stopword configuration file"
+    )
+    args = parser.parse_args()
+
+    # Stopwords
+    ensure_nltk_data("stopwords")
+
+    # Apply RQ3-specific cleaning to rated reviews and save
+    clean_reviews(
+        args.input, args.output, clean_text,
+        initializer=load_resources,
+        initargs=(args.stopwords,),
+        workers=args.workers,
+        chunksize=args.chunksize,
+        corpus_dir=corpus_dir_for(args.output) if args.corpus else None,
+        require_rating=True,
+    )
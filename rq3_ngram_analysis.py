@@ -1,69 +1,142 @@
+import argparse
+import os
+import numpy as np
 import pandas as pd
-import nltk
-from collections import Counter
-
-# Tokenizer resource
-nltk.download('punkt')
+from corpus_format import EncodedCorpus
+from ngram_counter import make_counter
+from ngram_matrix import (
+    align_ratings, build_ngram_matrices, build_ngram_matrix, rating_split
+)
+from table_io import iter_table_chunks, read_table, write_table
+from tokenizer import iter_token_lists
 
 input_csv = "rq3_cleaned_reviews.csv"
 output_unigram_csv = "rq3_unigram_results.csv"
 output_bigram_csv = "rq3_bigram_results.csv"
 output_trigram_csv = "rq3_trigram_results.csv"
 
+# Columns that identify a review in the raw and cleaned tables
+KEY_COLUMNS = ["movie_id", "Review_Index"]
 
-# Custom n-gram generator
-def generate_N_grams(tokens, ngram=1):
-    temp = zip(*[tokens[i:] for i in range(ngram)])
-    return list(temp)
-
-
-# Load cleaned review text
-df = pd.read_csv(input_csv)
-
-all_unigrams = []
-all_bigrams = []
-all_trigrams = []
-
-for text in df["clean_text"]:
-    if pd.isna(text):
-        continue
-    text = str(text)
-
-    # Tokenise text
-    tokens = nltk.word_tokenize(text.lower())
-
-    # Unigrams
-    all_unigrams.extend(tokens)
-
-    # Bigrams
-    all_bigrams.extend(generate_N_grams(tokens, 2))
-
-    # Trigrams
-    all_trigrams.extend(generate_N_grams(tokens, 3))
-
-
-# Count frequencies
-unigram_freq = Counter(all_unigrams)
-bigram_freq = Counter(all_bigrams)
-trigram_freq = Counter(all_trigrams)
-
-# Convert to DataFrame
-unigram_df = pd.DataFrame(
-    unigram_freq.most_common(100),
-    columns=["Unigram", "Frequency"]
+parser = argparse.ArgumentParser()
+parser.add_argument("--input", default=input_csv, help="cleaned reviews CSV")
+parser.add_argument(
+    "--output-dir", default=".",
+    help="directory for the rq3_*_results.csv files"
 )
-
-bigram_df = pd.DataFrame(
-    [(" ".join(bi), freq) for bi, freq in bigram_freq.most_common(100)],
-    columns=["Bigram", "Frequency"]
+parser.add_argument(
+    "--backend", choices=["counter", "matrix"], default="counter",
+    help="per-review counters, or sparse document x n-gram matrices"
 )
-
-trigram_df = pd.DataFrame(
-    [(" ".join(tri), freq) for tri, freq in trigram_freq.most_common(100)],
-    columns=["Trigram", "Frequency"]
+parser.add_argument(
+    "--corpus", default=None,
+    help="integer-encoded corpus directory to read instead of the cleaned CSV"
+)
+parser.add_argument(
+    "--hash-features", type=int, default=None,
+    help="matrix backend: hash n-grams into this many columns (approximate, "
+         "colliding n-grams share a column)"
+)
+parser.add_argument(
+    "--ratings", default=None,
+    help="matrix backend: raw reviews.csv used to split n-grams by rating"
+)
+parser.add_argument(
+    "--mode", choices=["exact", "sketch"], default="exact",
+    help="exact counts, or an approximate Space-Saving top-k sketch"
+)
+parser.add_argument(
+    "--capacity", type=int, default=100000,
+    help="counters kept per n-gram order in sketch mode"
+)
+parser.add_argument(
+    "--chunksize", type=int, default=10000,
+    help="number of cleaned reviews read per chunk"
 )
+args = parser.parse_args()
+os.makedirs(args.output_dir, exist_ok=True)
+
+corpus = EncodedCorpus.load(args.corpus) if args.corpus else None
+
+if args.backend == "matrix":
+    # Document x n-gram count matrices for n = 1..3
+    if corpus is not None:
+        ids = np.asarray(corpus.tokens, dtype=np.int64)
+        matrices = {
+            n: build_ngram_matrix(ids, corpus.offsets, corpus.vocab, n,
+                                  args.hash_features)
+            for n in (1, 2, 3)
+        }
+        keys = pd.DataFrame(index=range(len(corpus)))
+    else:
+        cleaned = read_table(
+            args.input, columns=lambda col: col in KEY_COLUMNS + ["clean_text"]
+        )
+        # Reviews left empty by cleaning become empty rows, so there is one
+        # row per cleaned review; they add nothing to the column sums
+        token_lists = list(iter_token_lists(cleaned["clean_text"], keep_missing=True))
+        matrices = build_ngram_matrices(token_lists, n_features=args.hash_features)
+        keys = cleaned.drop(columns="clean_text")
+    unigram_freq, bigram_freq, trigram_freq = matrices[1], matrices[2], matrices[3]
+
+    if args.ratings:
+        raw = read_table(args.ratings, columns=lambda col: col in KEY_COLUMNS + ["Rating"])
+        try:
+            ratings = align_ratings(raw, keys)
+        except ValueError as e:
+            raise ValueError(f"{args.ratings}: {e}") from None
+        for name, matrix in [("unigram", unigram_freq), ("bigram", bigram_freq),
+                             ("trigram", trigram_freq)]:
+            write_table(
+                rating_split(matrix, ratings),
+                os.path.join(args.output_dir, f"rq3_{name}_by_rating.csv"),
+            )
+else:
+    unigram_freq = make_counter(1, args.mode, args.capacity)
+    bigram_freq = make_counter(2, args.mode, args.capacity)
+    trigram_freq = make_counter(3, args.mode, args.capacity)
+
+    # Stream cleaned review text and count n-grams per review
+    if corpus is not None:
+        token_stream = iter(corpus)
+    else:
+        token_stream = (
+            tokens
+            for chunk in iter_table_chunks(args.input, args.chunksize,
+                                           columns=["clean_text"])
+            for tokens in iter_token_lists(chunk["clean_text"])
+        )
+    for tokens in token_stream:
+        unigram_freq.update(tokens)
+        bigram_freq.update(tokens)
+        trigram_freq.update(tokens)
+
+
+# Convert to DataFrame (sketch mode adds the maximum overestimate per count)
+def to_frame(counter, column, join):
+    if args.backend == "matrix":
+        rows = [(gram, freq, 0) for gram, freq in counter.most_common(100)]
+    else:
+        rows = [
+            (" ".join(gram) if join else gram, freq, error)
+            for gram, freq, error in counter.most_common(100)
+        ]
+    df = pd.DataFrame(rows, columns=[column, "Frequency", "Max_Error"])
+    if args.backend == "matrix" or args.mode == "exact":
+        df = df.drop(columns="Max_Error")
+    return df
+
+
+unigram_df = to_frame(unigram_freq, "Unigram", join=False)
+bigram_df = to_frame(bigram_freq, "Bigram", join=True)
+trigram_df = to_frame(trigram_freq, "Trigram", join=True)
+
+if args.backend == "counter" and args.mode == "sketch":
+    for name, counter in [("Unigram", unigram_freq), ("Bigram", bigram_freq),
+                          ("Trigram", trigram_freq)]:
+        print(f"{name}: top {counter.guaranteed_top(100)} of 100 ranks guaranteed")
 
 # Save results
-unigram_df.to_csv(output_unigram_csv, index=False, encoding="utf-8")
-bigram_df.to_csv(output_bigram_csv, index=False, encoding="utf-8")
-trigram_df.to_csv(output_trigram_csv, index=False, encoding="utf-8")
+for df, path in [(unigram_df, output_unigram_csv), (bigram_df, output_bigram_csv),
+                 (trigram_df, output_trigram_csv)]:
+    write_table(df, os.path.join(args.output_dir, path))
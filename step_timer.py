@@ -0,0 +1,55 @@
+# Wall time and peak memory of named steps within one process
+# (lda_rq1_2.py --timings, benchmarks/bench_pipeline.py)
+from contextlib import contextmanager, nullcontext
+import json
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def maxrss_mb(maxrss):
+    """A ru_maxrss value in MB (it is in KB on Linux, bytes on macOS)"""
+    scale = 1 if sys.platform == "darwin" else 1024
+    return round(maxrss * scale / 2**20, 1)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (None if unknown)"""
+    if resource is None:
+        return None
+    return maxrss_mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+class StepTimer:
+    """
+    Records each step's wall time and the process's peak RSS when the step
+    ended. Peak RSS is a high-water mark, so a step's value includes
+    everything allocated by earlier steps that was still alive.
+    """
+
+    def __init__(self):
+        self.steps = {}
+
+    @contextmanager
+    def step(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps[name] = {
+                "seconds": round(time.perf_counter() - start, 4),
+                "peak_rss_mb": peak_rss_mb(),
+            }
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.steps, f, indent=2)
+
+
+def timed(timer, name):
+    """timer.step(name), or a no-op context without a timer"""
+    return timer.step(name) if timer is not None else nullcontext()
@@ -0,0 +1,47 @@
+# Stopword configuration shared by the RQ1/2 and RQ3 cleaners
+#
+# Each RQ's additions to the NLTK stopword list (RQ1/2 domain words) and
+# words to keep (RQ3 negations) live in stopwords.json. The resulting set is
+# built once per process and frozen for fast membership tests.
+from dataclasses import dataclass
+from functools import lru_cache
+import json
+import os
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stopwords.json")
+
+
+@dataclass(frozen=True)
+class StopwordConfig:
+    """Stopwords for one research question"""
+    name: str
+    added: frozenset
+    kept: frozenset
+    words: frozenset
+
+    def __contains__(self, word):
+        return word in self.words
+
+    def __len__(self):
+        return len(self.words)
+
+
+@lru_cache(maxsize=None)
+def load_stopwords(name, path=DEFAULT_CONFIG):
+    """Build the frozen stopword set for `name` ("rq1_2" or "rq3")"""
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    if name not in config:
+        raise KeyError(f"No stopword configuration named {name!r} in {path}")
+    entry = config[name]
+
+    words = set()
+    if entry.get("base"):
+        from nltk.corpus import stopwords
+        words.update(stopwords.words(entry["base"]))
+
+    added = frozenset(entry.get("add", []))
+    kept = frozenset(entry.get("keep", []))
+    words = (words | added) - kept
+
+    return StopwordConfig(name, added, kept, frozenset(words))
@@ -0,0 +1,175 @@
+# Table I/O shared by the scraper and every analysis stage
+#
+# The format follows the file extension: .csv (UTF-8, as before), .parquet /
+# .pq or .feather / .arrow. Columnar files keep review text typed and
+# compressed and can be read column by column, so a stage that needs two
+# columns never parses the others. Parquet and Feather need pyarrow, which
+# is imported only when such a file is used.
+import os
+import pandas as pd
+
+CSV = "csv"
+PARQUET = "parquet"
+FEATHER = "feather"
+FORMATS = (CSV, PARQUET, FEATHER)
+
+_EXTENSIONS = {
+    ".csv": CSV,
+    ".parquet": PARQUET,
+    ".pq": PARQUET,
+    ".feather": FEATHER,
+    ".arrow": FEATHER,
+}
+
+
+def table_format(path):
+    return _EXTENSIONS.get(os.path.splitext(path)[1].lower(), CSV)
+
+
+def with_format(path, fmt):
+    """path with its extension replaced to match fmt"""
+    return os.path.splitext(path)[0] + "." + fmt
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.feather
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "pyarrow is required to read or write Parquet/Feather files"
+        ) from e
+    return pyarrow
+
+
+def _schema_names(path, fmt):
+    pa = _pyarrow()
+    if fmt == PARQUET:
+        return pa.parquet.ParquetFile(path).schema_arrow.names
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).schema.names
+
+
+def _project(path, fmt, columns):
+    # Resolve a usecols-style callable into column names
+    if callable(columns):
+        return [name for name in _schema_names(path, fmt) if columns(name)]
+    return columns
+
+
+def read_table(path, columns=None, dtype=None):
+    """
+    Read a table, optionally only `columns` (a list of names or a callable
+    selecting names, like read_csv's usecols). dtype applies to CSV only;
+    columnar files keep the types they were written with.
+    """
+    fmt = table_format(path)
+    if fmt == CSV:
+        return pd.read_csv(path, usecols=columns, dtype=dtype)
+    columns = _project(path, fmt, columns)
+    if fmt == PARQUET:
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_feather(path, columns=columns)
+
+
+def iter_table_chunks(path, chunksize, columns=None, dtype=None):
+    """Yield DataFrames of at most chunksize rows (see read_table)"""
+    fmt = table_format(path)
+    if fmt == CSV:
+        yield from pd.read_csv(path, usecols=columns, dtype=dtype,
+                               chunksize=chunksize)
+        return
+
+    pa = _pyarrow()
+    columns = _project(path, fmt, columns)
+    if fmt == PARQUET:
+        batches = pa.parquet.ParquetFile(path).iter_batches(
+            batch_size=chunksize, columns=columns
+        )
+    else:
+        # Memory-mapped, so slicing into batches does not load the file
+        table = pa.feather.read_table(path, columns=columns, memory_map=True)
+        batches = table.to_batches(max_chunksize=chunksize)
+    for batch in batches:
+        yield batch.to_pandas()
+
+
+def write_table(df, path):
+    fmt = table_format(path)
+    if fmt == CSV:
+        df.to_csv(path, index=False, encoding="utf-8")
+    elif fmt == PARQUET:
+        _pyarrow()
+        df.to_parquet(path, index=False)
+    else:
+        _pyarrow()
+        df.reset_index(drop=True).to_feather(path)
+
+
+def append_table(df, path):
+    """
+    Append rows to a table, creating it if needed. CSV is appended in place;
+    Parquet and Feather files are rewritten.
+    """
+    if not os.path.exists(path):
+        write_table(df, path)
+    elif table_format(path) == CSV:
+        df.to_csv(path, mode="a", header=False, index=False, encoding="utf-8")
+    else:
+        existing = read_table(path)
+        write_table(pd.concat([existing, df], ignore_index=True), path)
+
+
+class TableWriter:
+    """Write a table chunk by chunk without holding it in memory"""
+
+    def __init__(self, path, encoding="utf-8"):
+        self.path = path
+        self.encoding = encoding
+        self.format = table_format(path)
+        self.first = True
+        self._writer = None
+        self._schema = None
+
+    def write(self, df):
+        if self.format == CSV:
+            df.to_csv(
+                self.path,
+                mode="w" if self.first else "a",
+                header=self.first,
+                index=False,
+                encoding=self.encoding,
+            )
+            self.first = False
+            return
+
+        pa = _pyarrow()
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            # Columns that are empty in the first chunk default to strings
+            self._schema = pa.schema([
+                field.with_type(pa.string()) if pa.types.is_null(field.type)
+                else field
+                for field in table.schema
+            ]).remove_metadata()
+            if self.format == PARQUET:
+                self._writer = pa.parquet.ParquetWriter(self.path, self._schema)
+            else:
+                self._writer = pa.ipc.new_file(
+                    self.path, self._schema,
+                    options=pa.ipc.IpcWriteOptions(compression="lz4"),
+                )
+        self._writer.write_table(table.cast(self._schema))
+        self.first = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,50 @@
+# Round trip and on-disk size of the integer-encoded corpus (corpus_format.py)
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from corpus_format import (
+    OFFSETS_FILE, TOKENS_FILE, VOCAB_BYTES_FILE, VOCAB_OFFSETS_FILE,
+    CorpusWriter, EncodedCorpus,
+)
+
+CLEANED = os.path.join(ROOT, "data", "rq1_rq2_lda", "rq1_2_cleaned_reviews.csv")
+
+
+def test_round_trip(tmp_path):
+    docs = [["café", "naïve", "x" * 300], [], ["café", "日本語"]]
+    writer = CorpusWriter(str(tmp_path))
+    writer.add(docs[:2])
+    writer.add(docs[2:])
+    written = writer.close()
+
+    for corpus in (written, EncodedCorpus.load(str(tmp_path))):
+        assert len(corpus) == 3
+        assert list(corpus) == docs
+        assert corpus.token_lists() == docs
+
+
+def test_vocab_not_padded(tmp_path):
+    texts = pd.read_csv(CLEANED)["clean_text"].fillna("").astype(str)
+    writer = CorpusWriter(str(tmp_path))
+    writer.add_texts(texts)
+    writer.close()
+
+    def size(name):
+        return os.path.getsize(tmp_path / name)
+
+    # The vocabulary costs its UTF-8 bytes plus one offset per word (and the
+    # .npy headers), not len(vocab) x the longest token
+    utf8_bytes = sum(len(word.encode("utf-8")) for word in writer.vocab)
+    assert size(VOCAB_BYTES_FILE) <= utf8_bytes + 256
+    assert size(VOCAB_OFFSETS_FILE) <= 8 * (len(writer.vocab) + 1) + 256
+    assert size(VOCAB_BYTES_FILE) + size(VOCAB_OFFSETS_FILE) < size(TOKENS_FILE)
+
+    corpus = EncodedCorpus.load(str(tmp_path))
+    assert corpus.token_lists() == [text.split() for text in texts]
+    assert size(OFFSETS_FILE) == 8 * (len(texts) + 1) + 128
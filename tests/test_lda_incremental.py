@@ -0,0 +1,93 @@
+# Key handling and crash recovery of lda_incremental.py
+import os
+import sys
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import lda_incremental
+from table_io import append_table, read_table, write_table
+
+
+def test_reviews_without_keys_skipped(tmp_path):
+    path = tmp_path / "reviews.csv"
+    pd.DataFrame({
+        "Review_Index": pd.array([1, None, 3, 4], dtype="Int64"),
+        "Review_Title": ["a", "b", "c", "d"],
+        "Review_Content": ["one", "two", "three", "four"],
+        "movie_id": pd.array([1, 1, None, 1], dtype="Int64"),
+    }).to_csv(path, index=False)
+
+    keys, texts = lda_incremental.read_new_reviews(str(path), set())
+    assert keys == [("1", "1"), ("1", "4")]
+    assert texts == ["a one", "d four"]
+    assert lda_incremental.read_new_reviews(str(path), set(keys)) == ([], [])
+
+
+def test_unfinished_run_rolled_back(tmp_path):
+    cleaned = str(tmp_path / "cleaned.csv")
+    doc_topics = str(tmp_path / "doc_topics.parquet")
+    state = str(tmp_path / "state.csv")
+    new_table = str(tmp_path / "new.csv")
+    marker = str(tmp_path / "run.json")
+    model_dir = str(tmp_path / "model")
+
+    write_table(pd.DataFrame({"clean_text": ["good film", "bad plot"]}), cleaned)
+    write_table(pd.DataFrame({"Review_Index": [0, 1], "Topic_0_%": [50.0, 60.0]}), doc_topics)
+    lda_incremental.append_keys(state, [("1", "1"), ("1", "2")])
+    os.makedirs(model_dir)
+    with open(os.path.join(model_dir, "model.json"), "w") as f:
+        f.write('{"num_docs": 2}')
+    before = {path: read_table(path) for path in (cleaned, doc_topics, state)}
+
+    # A run that died after swapping in its model, before removing the marker
+    lda_incremental.begin_run(marker, [cleaned, doc_topics, state, new_table])
+    append_table(pd.DataFrame({"clean_text": ["new review"]}), cleaned)
+    append_table(pd.DataFrame({"Review_Index": [2], "Topic_0_%": [70.0]}), doc_topics)
+    append_table(pd.DataFrame({"clean_text": ["x"]}), new_table)
+    lda_incremental.append_keys(state, [("1", "3")])
+    os.replace(model_dir, model_dir + ".old")
+    os.makedirs(model_dir)
+
+    lda_incremental.recover(marker, model_dir)
+    for path, df in before.items():
+        pd.testing.assert_frame_equal(read_table(path), df)
+    assert not os.path.exists(new_table)
+    assert not os.path.exists(marker)
+    assert os.listdir(model_dir) == ["model.json"]
+    assert not os.path.exists(model_dir + ".old")
+
+    # Nothing to do without a marker
+    lda_incremental.recover(marker, model_dir)
+
+
+def test_stale_old_model_not_restored(tmp_path):
+    cleaned = str(tmp_path / "cleaned.csv")
+    marker = str(tmp_path / "run.json")
+    model_dir = str(tmp_path / "model")
+    write_table(pd.DataFrame({"clean_text": ["good film"]}), cleaned)
+
+    def save(directory, num_docs):
+        os.makedirs(directory)
+        with open(os.path.join(directory, "model.json"), "w") as f:
+            f.write(f'{{"num_docs": {num_docs}}}')
+
+    def num_docs():
+        with open(os.path.join(model_dir, "model.json")) as f:
+            return f.read()
+
+    # A run committed model 2 (marker removed) but died before deleting model 1
+    save(model_dir, 2)
+    save(model_dir + ".old", 1)
+
+    # The next run starts, then dies before swapping in its model
+    lda_incremental.recover(marker, model_dir)
+    lda_incremental.begin_run(marker, [cleaned])
+    append_table(pd.DataFrame({"clean_text": ["new review"]}), cleaned)
+
+    lda_incremental.recover(marker, model_dir)
+    assert num_docs() == '{"num_docs": 2}'
+    assert not os.path.exists(model_dir + ".old")
+    assert len(read_table(cleaned)) == 1
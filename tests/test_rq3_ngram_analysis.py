@@ -0,0 +1,64 @@
+# rq3_ngram_analysis.py --backend matrix --ratings on the committed RQ3 data
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ngram_matrix import align_ratings
+from tokenizer import iter_token_lists
+
+CLEANED = os.path.join(ROOT, "data", "rq3", "rq3_cleaned_reviews.csv")
+RAW = os.path.join(ROOT, "data", "raw", "reviews.csv")
+
+
+def run_analysis(output_dir, *args):
+    subprocess.run(
+        [sys.executable, os.path.join(ROOT, "rq3_ngram_analysis.py"),
+         "--input", CLEANED, "--output-dir", str(output_dir), *args],
+        check=True, capture_output=True, text=True,
+    )
+
+
+def test_missing_reviews_kept_as_empty_rows():
+    texts = ["good film", float("nan"), None, "bad"]
+    assert list(iter_token_lists(texts)) == [["good", "film"], ["bad"]]
+    assert list(iter_token_lists(texts, keep_missing=True)) == [
+        ["good", "film"], [], [], ["bad"]
+    ]
+
+
+def test_align_ratings():
+    raw = pd.DataFrame({"Review_Index": [1, 2, 3, 4],
+                        "Rating": ["8/10", None, "2/10", "5/10"]})
+    # By key, including a review whose rating is missing
+    keys = pd.DataFrame({"Review_Index": [4, 1, 2]})
+    np.testing.assert_array_equal(align_ratings(raw, keys), [5, 8, np.nan])
+    # By position over the rated reviews
+    np.testing.assert_array_equal(
+        align_ratings(raw, pd.DataFrame(index=range(3))), [8, 2, 5]
+    )
+    with pytest.raises(ValueError):
+        align_ratings(raw, pd.DataFrame(index=range(2)))
+
+
+def test_ratings_split_on_committed_data(tmp_path):
+    matrix_dir, counter_dir = tmp_path / "matrix", tmp_path / "counter"
+    run_analysis(matrix_dir, "--backend", "matrix", "--ratings", RAW)
+    run_analysis(counter_dir)
+
+    for name in ("unigram", "bigram", "trigram"):
+        # Empty rows leave the global top 100 unchanged
+        pd.testing.assert_frame_equal(
+            pd.read_csv(matrix_dir / f"rq3_{name}_results.csv"),
+            pd.read_csv(counter_dir / f"rq3_{name}_results.csv"),
+        )
+        split = pd.read_csv(matrix_dir / f"rq3_{name}_by_rating.csv")
+        assert len(split) >= 100
+        assert split["Positive_Frequency"].sum() > 0
+        assert split["Negative_Frequency"].sum() > 0
@@ -0,0 +1,185 @@
+# HTTP backend and job mode of IMDB_Scraper/scraper.py against the saved
+# review pages in IMDB_Scraper/fixtures, served on an ephemeral local port
+import functools
+import http.server
+import os
+import sys
+import threading
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "IMDB_Scraper"))
+
+import scraper
+
+FIXTURES = os.path.join(ROOT, "IMDB_Scraper", "fixtures")
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=FIXTURES)
+    handler.log_message = lambda *args: None
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def rate_limiter():
+    return scraper.RateLimiter(min_interval=0, jitter=0)
+
+
+@pytest.fixture
+def session():
+    session = scraper.HttpSession(timeout=5, retries=0)
+    yield session
+    session.quit()
+
+
+def fetch(session, base_url, title_id, rate_limiter, **kwargs):
+    url = scraper.review_url(title_id, base_url)
+    return scraper.get_review_data_http(session, url, 1, rate_limiter, **kwargs)
+
+
+def test_single_page(session, base_url, rate_limiter):
+    data = fetch(session, base_url, "tt0000001", rate_limiter)
+    titles, contents, spoilers, ratings, page_title = data
+    assert len(data) == 5
+    assert page_title == "Fixture Movie One (2016) - User reviews - IMDb"
+    assert titles == ["A clever buddy-cop story", "Fun, if a little long", "Not for me",
+                      "Best animated film in years", "Predictable"]
+    assert len(contents) == len(spoilers) == len(ratings) == 5
+    assert all(contents)
+    assert all(rating == "No rating" or rating.endswith("/10") for rating in ratings)
+
+
+def test_load_more_pages_deduplicated(session, base_url, rate_limiter):
+    stats = {}
+    titles, _, _, _, page_title = fetch(session, base_url, "tt0000002", rate_limiter, stats=stats)
+    assert page_title.startswith("Fixture Movie Two")
+    # index.html, _ajax/page2.html and _ajax/page3.html; "Solid sequel" is
+    # repeated on page 2 and kept once
+    assert stats["Round_Trips"] == 3
+    assert titles == ["Solid sequel", "Surprisingly moving", "Lazy cash grab", "Great for kids"]
+
+
+def test_max_pages(session, base_url, rate_limiter):
+    titles = fetch(session, base_url, "tt0000002", rate_limiter, max_pages=1)[0]
+    assert titles == ["Solid sequel", "Surprisingly moving"]
+
+
+def test_review_hash_ignores_whitespace():
+    # Browser .text keeps line breaks, lxml text_content() does not
+    assert (scraper.review_hash(" Great  film\n", "Line one.\nLine two.")
+            == scraper.review_hash("Great film", "Line one. Line two."))
+
+
+def test_job_mode(tmp_path, base_url, rate_limiter):
+    title_ids = ["tt0000001", "tt0000002", "tt9999999"]
+    stats_df = scraper.scrape_titles(
+        title_ids, scraper.HttpSession, sessions=2, base_url=base_url,
+        folder_name=str(tmp_path), rate_limiter=rate_limiter,
+        fetch=scraper.get_review_data_http,
+    )
+
+    # One file set per title, movie_id following the order of title_ids
+    for movie_id, title_id, count in [(1, "tt0000001", 5), (2, "tt0000002", 4)]:
+        reviews = pd.read_csv(tmp_path / title_id / "reviews.csv")
+        assert len(reviews) == count
+        assert reviews["Review_Index"].tolist() == list(range(1, count + 1))
+        assert set(reviews["movie_id"]) == {movie_id}
+        stats = pd.read_csv(tmp_path / title_id / "stats.csv")
+        assert stats.loc[0, "Total_Reviews"] == count
+    assert not (tmp_path / "tt9999999" / "reviews.csv").exists()
+
+    # Combined stats, one row per title including the failure
+    combined = pd.read_csv(tmp_path / "stats.csv")
+    assert combined["Title_ID"].tolist() == title_ids
+    assert combined["Movie_ID"].tolist() == [1, 2, 3]
+    assert combined["Status"].tolist()[:2] == ["ok", "ok"]
+    assert combined["Status"][2].startswith("error")
+    assert combined["Total_Reviews"].tolist()[:2] == [5, 4]
+    assert combined["New_Reviews"].tolist()[:2] == [5, 4]
+    assert stats_df["Status"].tolist() == combined["Status"].tolist()
+
+
+def scrape_jobs(tmp_path, base_url, rate_limiter, title_ids):
+    return scraper.scrape_titles(
+        title_ids, scraper.HttpSession, sessions=1, base_url=base_url,
+        folder_name=str(tmp_path), rate_limiter=rate_limiter,
+        fetch=scraper.get_review_data_http,
+    )
+
+
+def test_failed_extraction_retried(tmp_path, base_url, rate_limiter, monkeypatch):
+    extract_review = scraper.extract_review
+
+    def failing(review, *args):
+        fields = extract_review(review, *args)
+        if fields[0] == "Not for me":
+            raise ValueError("extraction failed")
+        return fields
+
+    monkeypatch.setattr(scraper, "extract_review", failing)
+    scrape_jobs(tmp_path, base_url, rate_limiter, ["tt0000001"])
+    reviews = pd.read_csv(tmp_path / "tt0000001" / "reviews.csv")
+    assert len(reviews) == 4
+    assert "Error" not in reviews["Rating"].tolist()
+
+    # Not in the hash index, so the next run extracts it
+    monkeypatch.setattr(scraper, "extract_review", extract_review)
+    stats_df = scrape_jobs(tmp_path, base_url, rate_limiter, ["tt0000001"])
+    assert stats_df["New_Reviews"].tolist() == [1]
+    reviews = pd.read_csv(tmp_path / "tt0000001" / "reviews.csv")
+    assert reviews["Review_Title"].tolist()[-1] == "Not for me"
+    assert len(reviews) == 5
+
+
+def test_rescrape_stops_at_saved_reviews(tmp_path, base_url, rate_limiter):
+    scrape_jobs(tmp_path, base_url, rate_limiter, ["tt0000002"])
+
+    # Page 1 holds only saved reviews, so the continuation pages are not fetched
+    stats_df = scrape_jobs(tmp_path, base_url, rate_limiter, ["tt0000002"])
+    assert stats_df["New_Reviews"].tolist() == [0]
+    assert stats_df["Round_Trips"].tolist() == [1]
+    assert stats_df["Total_Reviews"].tolist() == [4]
+
+    # Unless asked to rescan everything
+    checkpoint = scraper.ReviewCheckpoint(str(tmp_path / "tt0000002"), 2)
+    stats = {}
+    with checkpoint:
+        fetch(scraper.HttpSession(retries=0), base_url, "tt0000002", rate_limiter,
+              checkpoint=checkpoint, stats=stats, stop_at_known=False)
+    assert stats["Round_Trips"] == 3
+    assert checkpoint.count == 4
+
+
+def test_movie_id_kept_across_job_lists(tmp_path, base_url, rate_limiter):
+    def run(title_ids, **kwargs):
+        return scraper.scrape_titles(
+            title_ids, scraper.HttpSession, sessions=1, base_url=base_url,
+            folder_name=str(tmp_path), rate_limiter=rate_limiter,
+            fetch=functools.partial(scraper.get_review_data_http, **kwargs),
+        )
+
+    # First only page 1 of tt0000002, then the rest of it at another position
+    run(["tt0000002"], max_pages=1)
+    stats_df = run(["tt0000001", "tt0000002"], stop_at_known=False)
+    assert dict(zip(stats_df["Title_ID"], stats_df["Movie_ID"])) == {
+        "tt0000002": 1, "tt0000001": 2,
+    }
+    assert stats_df.set_index("Title_ID").loc["tt0000002", "New_Reviews"] == 2
+
+    reviews = pd.read_csv(tmp_path / "tt0000002" / "reviews.csv")
+    assert len(reviews) == 4
+    assert set(reviews["movie_id"]) == {1}
+    assert set(pd.read_csv(tmp_path / "tt0000001" / "reviews.csv")["movie_id"]) == {2}
+
+    # Without movie_ids.csv the IDs are read back from the saved reviews
+    os.remove(tmp_path / "movie_ids.csv")
+    ids = scraper.assign_movie_ids(str(tmp_path), ["tt0000003", "tt0000001", "tt0000002"])
+    assert ids == {"tt0000003": 3, "tt0000001": 2, "tt0000002": 1}
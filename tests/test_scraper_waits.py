@@ -0,0 +1,169 @@
+# Waits of IMDB_Scraper/scraper.py (cookie banner, spoiler reveal): against a
+# scripted driver whose page changes after a number of polls, and against the
+# delayed tt0000003 fixture in Chrome when a chromedriver is available
+import functools
+import http.server
+import os
+import shutil
+import sys
+import threading
+import time
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "IMDB_Scraper"))
+
+import scraper
+
+FIXTURES = os.path.join(ROOT, "IMDB_Scraper", "fixtures")
+DRIVER_PATH = os.environ.get("CHROMEDRIVER") or shutil.which("chromedriver") or os.path.join(
+    ROOT, "IMDB_Scraper", "ChromeDrive", "chromedriver", "chromedriver")
+NEVER = float("inf")
+
+
+class FakeButton:
+    def __init__(self, page):
+        self.page = page
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def click(self):
+        self.page.clicks += 1
+        self.page.banner_gone_at = self.page.polls + self.page.banner_delay
+
+
+class ScriptedDriver:
+    """
+    Page whose cookie banner shows up after banner_after polls and goes
+    banner_delay polls after its click; clicked spoilers show their text
+    after reveal_after polls. A poll is one find_element or hidden-spoiler
+    count, i.e. one call of a wait condition.
+    """
+
+    def __init__(self, banner_after=NEVER, banner_delay=0, spoilers=0, reveal_after=0):
+        self.polls = 0
+        self.clicks = 0
+        self.banner_after = banner_after
+        self.banner_delay = banner_delay
+        self.banner_gone_at = NEVER
+        self.spoilers = spoilers
+        self.reveal_after = reveal_after
+        self.reveal_at = NEVER
+
+    def find_element(self, by, value):
+        assert value == scraper.COOKIE_BUTTON_SELECTOR
+        self.polls += 1
+        if self.banner_after <= self.polls < self.banner_gone_at:
+            return FakeButton(self)
+        raise NoSuchElementException(value)
+
+    def execute_script(self, script, *args):
+        if script == scraper.EXPAND_SPOILERS_SCRIPT:
+            self.reveal_at = self.polls + self.reveal_after
+            return {'found': self.spoilers, 'clicked': self.spoilers, 'failed': 0}
+        assert script == scraper.HIDDEN_SPOILER_COUNT_SCRIPT
+        self.polls += 1
+        return 0 if self.polls > self.reveal_at else self.spoilers
+
+
+@pytest.fixture(autouse=True)
+def fast_polls(monkeypatch):
+    # Short poll interval so that N polls take a fraction of a second
+    wait_until = scraper.wait_until
+    monkeypatch.setattr(scraper, "wait_until",
+                        lambda driver, condition, timeout=10: wait_until(driver, condition, timeout, poll=0.01))
+
+
+def timed_call(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def test_accept_cookies_waits_for_late_banner():
+    driver = ScriptedDriver(banner_after=5, banner_delay=4)
+    accepted, _ = timed_call(scraper.accept_cookies, driver, timeout=5, wait_timeout=5)
+    assert accepted
+    assert driver.clicks == 1
+    # Polled until the banner was gone, not just until the click
+    assert driver.polls >= driver.banner_gone_at
+    assert driver.cookies_accepted
+
+    # Consent lasts for the session: no more waiting on this driver
+    polls = driver.polls
+    assert not scraper.accept_cookies(driver, timeout=5)
+    assert driver.polls == polls
+
+
+def test_accept_cookies_gives_up_after_timeout():
+    driver = ScriptedDriver()
+    accepted, elapsed = timed_call(scraper.accept_cookies, driver, timeout=0.3)
+    assert not accepted
+    assert driver.clicks == 0
+    assert driver.polls > 1
+    assert 0.3 <= elapsed < 2
+    assert not getattr(driver, "cookies_accepted", False)
+
+
+def test_spoiler_wait_until_revealed():
+    driver = ScriptedDriver(spoilers=3, reveal_after=5)
+    counts, _ = timed_call(scraper.expand_all_spoilers_batch, driver, timeout=5)
+    assert counts == {'found': 3, 'expanded': 3, 'failed': 0}
+    assert driver.polls > driver.reveal_at
+
+
+def test_spoiler_wait_timeout_counts_failed():
+    driver = ScriptedDriver(spoilers=3, reveal_after=NEVER)
+    counts, elapsed = timed_call(scraper.expand_all_spoilers_batch, driver, timeout=0.3)
+    assert counts == {'found': 3, 'expanded': 0, 'failed': 3}
+    assert 0.3 <= elapsed < 2
+
+
+def test_no_spoiler_wait_without_clicks():
+    driver = ScriptedDriver(spoilers=0)
+    counts, _ = timed_call(scraper.expand_all_spoilers_batch, driver, timeout=5)
+    assert counts == {'found': 0, 'expanded': 0, 'failed': 0}
+    assert driver.polls == 0
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=FIXTURES)
+    handler.log_message = lambda *args: None
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def chrome():
+    if not os.path.isfile(DRIVER_PATH):
+        pytest.skip("chromedriver not found (set CHROMEDRIVER)")
+    try:
+        driver = scraper.make_driver(DRIVER_PATH, headless=True)
+    except Exception as e:
+        pytest.skip(f"Chrome could not be started: {e}")
+    yield driver
+    driver.quit()
+
+
+def test_delayed_page_in_chrome(chrome, base_url):
+    # tt0000003 adds its banner and reveals spoilers 1.5 s after each action
+    chrome.get(scraper.review_url("tt0000003", base_url))
+    assert scraper.accept_cookies(chrome, timeout=5, wait_timeout=5)
+    assert not chrome.find_elements("css selector", scraper.COOKIE_BUTTON_SELECTOR)
+    assert scraper.expand_all_spoilers_batch(chrome, timeout=5) == {'found': 1, 'expanded': 1, 'failed': 0}
+
+
+def test_delayed_page_timeouts_in_chrome(chrome, base_url):
+    chrome.get(scraper.review_url("tt0000003", base_url) + "?delay=3000")
+    assert not scraper.accept_cookies(chrome, timeout=0.5)
+    assert scraper.expand_all_spoilers_batch(chrome, timeout=0.5) == {'found': 1, 'expanded': 0, 'failed': 1}
@@ -0,0 +1,49 @@
+# tokenizer.py against nltk.word_tokenize on the cleaned RQ3 corpus and the
+# raw reviews (preserve_line=True: no Punkt sentence split, as in the tokens
+# the cleaners produce)
+import os
+import re
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+nltk = pytest.importorskip("nltk")
+
+from table_io import read_table
+from tokenizer import split_clean, tokenize
+
+CLEANED = os.path.join(ROOT, "data", "rq3", "rq3_cleaned_reviews.csv")
+RAW = os.path.join(ROOT, "data", "raw", "reviews.csv")
+
+
+def read_texts(path, column):
+    if not os.path.exists(path):
+        pytest.skip(f"{path} not found")
+    return [str(text) for text in read_table(path, columns=[column])[column].dropna()]
+
+
+def mismatches(texts, tokenize_fn, prepare):
+    return [text for text in texts
+            if tokenize_fn(text) != nltk.word_tokenize(prepare(text), preserve_line=True)]
+
+
+def test_cleaned_reviews_match_word_tokenize():
+    texts = read_texts(CLEANED, "clean_text")
+    assert texts
+    assert mismatches(texts, split_clean, str.lower) == []
+    assert mismatches(texts, tokenize, str.lower) == []
+
+
+def test_raw_reviews_match_word_tokenize():
+    texts = read_texts(RAW, "Review_Content")
+    assert texts
+    assert mismatches(texts, tokenize, lambda text: re.sub(r"[^\w\s]", " ", text.lower())) == []
+
+
+def test_contractions_split_like_treebank():
+    text = "I cannot wait, gonna watch it again! Wanna come?"
+    assert tokenize(text) == nltk.word_tokenize(re.sub(r"[^\w\s]", " ", text.lower()), preserve_line=True)
+    assert tokenize(text)[1:3] == ["can", "not"]
@@ -0,0 +1,65 @@
+# Fast tokenizer for RQ3 (no Punkt / nltk.word_tokenize dependency)
+#
+# rq3_clean.py strips everything except word characters and whitespace
+# before tokenizing. On such text nltk.word_tokenize reduces to a whitespace
+# split plus the Treebank contraction rules that match whole words
+# ("cannot" -> "can not", "gonna" -> "gon na", ...), so a single \w+ scan
+# and a small lookup table give the same tokens.
+import re
+
+_WORD = re.compile(r"\w+")
+
+# Treebank CONTRACTIONS2 rules that can still fire on punctuation-free text
+_SPLIT_WORDS = {
+    "cannot": ("can", "not"),
+    "gimme": ("gim", "me"),
+    "gonna": ("gon", "na"),
+    "gotta": ("got", "ta"),
+    "lemme": ("lem", "me"),
+    "wanna": ("wan", "na"),
+}
+
+
+def _split_contractions(tokens):
+    if _SPLIT_WORDS.keys().isdisjoint(tokens):
+        return tokens
+
+    split = []
+    for token in tokens:
+        parts = _SPLIT_WORDS.get(token)
+        if parts is None:
+            split.append(token)
+        else:
+            split.extend(parts)
+    return split
+
+
+def tokenize(text):
+    """Lowercase and tokenize raw review text, matching
+    nltk.word_tokenize(re.sub(r"[^\\w\\s]", " ", text.lower()))"""
+    return tokenize_lowered(text.lower())
+
+
+def tokenize_lowered(text):
+    """tokenize() for text that is already lowercase"""
+    return _split_contractions(_WORD.findall(text))
+
+
+def split_clean(text):
+    """Tokens of an already cleaned, space-joined review, matching
+    nltk.word_tokenize(text.lower())"""
+    return _split_contractions(text.lower().split())
+
+
+def iter_token_lists(texts, tokenize_fn=split_clean, keep_missing=False):
+    """
+    Yield one token list per review, skipping missing values (reviews left
+    empty by cleaning), or yielding [] for them if keep_missing is set
+    """
+    for text in texts:
+        # Missing values (None / NaN)
+        if text is None or text != text:
+            if keep_missing:
+                yield []
+            continue
+        yield tokenize_fn(str(text))
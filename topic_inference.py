@@ -0,0 +1,25 @@
+# Batched document-topic inference for lda_rq1_2.py
+#
+# LdaModel.inference works on a whole chunk of documents at once, so the
+# doc x topic matrix can be filled chunk by chunk instead of calling
+# get_document_topics (and sorting its output) for every review.
+import numpy as np
+
+
+def infer_doc_topics(lda, corpus, chunksize=2000):
+    """Dense float32 doc x topic probability matrix for a BOW corpus"""
+    theta = np.empty((len(corpus), lda.num_topics), dtype=np.float32)
+    for start in range(0, len(corpus), chunksize):
+        chunk = corpus[start:start + chunksize]
+        gamma, _ = lda.inference(chunk)
+        theta[start:start + len(chunk)] = gamma / gamma.sum(axis=1, keepdims=True)
+    return theta
+
+
+def infer_doc_topics_per_doc(lda, corpus):
+    """Same matrix built one document at a time with get_document_topics"""
+    theta = np.zeros((len(corpus), lda.num_topics), dtype=np.float32)
+    for idx, doc_bow in enumerate(corpus):
+        for topic_id, prob in lda.get_document_topics(doc_bow, minimum_probability=0):
+            theta[idx, topic_id] = prob
+    return theta